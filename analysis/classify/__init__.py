@@ -0,0 +1,6 @@
+from classify.streaming import (
+    Evaluation,
+    StreamingClassifier,
+    evaluate_dense_baseline,
+    train_and_evaluate,
+)
@@ -0,0 +1,234 @@
+from dataclasses import dataclass
+import resource
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.naive_bayes import GaussianNB, MultinomialNB
+from sklearn.preprocessing import normalize
+
+ESTIMATORS = ("nb", "sgd")
+FEATURES = ("counts", "tfidf")
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class Evaluation:
+    name: str
+    train_rows: int
+    test_rows: int
+    accuracy: float
+    report: str
+    elapsed: float
+    peak_rss_mb: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: accuracy {self.accuracy:.3f} on "
+            f"{self.test_rows} test row(s), trained on {self.train_rows} "
+            f"in {self.elapsed:.1f}s, peak RSS {self.peak_rss_mb:.0f} MiB"
+        )
+
+
+def iter_chunks(
+    file_path: str,
+    text_field: str,
+    label_field: str,
+    chunk_size: int,
+    test_size: float,
+    seed: int = 0,
+) -> Iterator[tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Yields the texts and labels of a reviews CSV file `chunk_size` rows at a
+    time, along with which rows are held out for testing. The split only
+    depends on `seed`, so every pass over the file sees the same one.
+    """
+    rng = np.random.default_rng(seed)
+    for chunk in pd.read_csv(
+        file_path, usecols=[text_field, label_field], chunksize=chunk_size
+    ):
+        chunk = chunk.dropna(subset=[label_field])
+        chunk[text_field] = chunk[text_field].fillna("").astype(str)
+        # Labels are classes, even numeric ones, e.g. ratings, the same
+        # as in `get_classes`
+        chunk[label_field] = chunk[label_field].astype(str)
+        yield chunk, rng.random(len(chunk)) < test_size
+
+
+class StreamingClassifier:
+    """
+    Text classifier trained chunk by chunk without ever holding the corpus,
+    nor a dense feature matrix, in memory. Texts are hashed into
+    `n_features` sparse term counts, which need no vocabulary, optionally
+    weighted by inverse document frequencies counted beforehand, and fed to
+    an estimator that supports `partial_fit`.
+    """
+
+    def __init__(
+        self,
+        classes: list[str],
+        estimator: str = "nb",
+        features: str = "counts",
+        n_features: int = 2**20,
+    ) -> None:
+        self.classes = classes
+        self.features = features
+        # Signs would make some counts negative, which naive Bayes rejects
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm=None
+        )
+        self.estimator = (
+            MultinomialNB()
+            if estimator == "nb"
+            else SGDClassifier(loss="log_loss", random_state=0)
+        )
+        self._document_counts = np.zeros(n_features)
+        self._documents = 0
+        self.idf: np.ndarray | None = None
+
+    def transform(self, texts: pd.Series) -> sp.csr_matrix:
+        counts = self.vectorizer.transform(texts)
+        if self.features == "counts":
+            return counts
+        assert self.idf is not None, "Call fit_idf before transform"
+        return normalize(counts @ sp.diags(self.idf))
+
+    def count_documents(self, texts: pd.Series) -> None:
+        """
+        Counts the documents each term appears in, for `fit_idf`.
+        """
+        counts = self.vectorizer.transform(texts)
+        self._document_counts += np.bincount(
+            counts.indices, minlength=len(self._document_counts)
+        )
+        self._documents += counts.shape[0]
+
+    def fit_idf(self) -> None:
+        # Smoothed like TfidfVectorizer's defaults
+        self.idf = (
+            np.log((1 + self._documents) / (1 + self._document_counts)) + 1
+        )
+
+    def partial_fit(self, texts: pd.Series, labels: pd.Series) -> None:
+        self.estimator.partial_fit(
+            self.transform(texts), labels, classes=self.classes
+        )
+
+    def predict(self, texts: pd.Series) -> np.ndarray:
+        return self.estimator.predict(self.transform(texts))
+
+
+def get_classes(
+    file_path: str, label_field: str, chunk_size: int = 100000
+) -> list[str]:
+    classes: set[str] = set()
+    for chunk in pd.read_csv(
+        file_path, usecols=[label_field], chunksize=chunk_size
+    ):
+        classes.update(chunk[label_field].dropna().astype(str))
+    return sorted(classes)
+
+
+def train_and_evaluate(
+    file_path: str,
+    text_field: str,
+    label_field: str,
+    estimator: str = "nb",
+    features: str = "counts",
+    n_features: int = 2**20,
+    chunk_size: int = 10000,
+    test_size: float = 0.2,
+    seed: int = 0,
+) -> Evaluation:
+    """
+    Trains a `StreamingClassifier` on the rows of a reviews CSV file not
+    held out for testing, then evaluates it on the others, reading the file
+    `chunk_size` rows at a time. Memory stays flat however large the file.
+    """
+    started = time.perf_counter()
+    classifier = StreamingClassifier(
+        get_classes(file_path, label_field), estimator, features, n_features
+    )
+    if features == "tfidf":
+        for chunk, is_test in iter_chunks(
+            file_path, text_field, label_field, chunk_size, test_size, seed
+        ):
+            classifier.count_documents(chunk[text_field][~is_test])
+        classifier.fit_idf()
+
+    train_rows: int = 0
+    for chunk, is_test in iter_chunks(
+        file_path, text_field, label_field, chunk_size, test_size, seed
+    ):
+        train = chunk[~is_test]
+        if len(train):
+            classifier.partial_fit(train[text_field], train[label_field])
+            train_rows += len(train)
+
+    y_true: list[str] = []
+    y_pred: list[str] = []
+    for chunk, is_test in iter_chunks(
+        file_path, text_field, label_field, chunk_size, test_size, seed
+    ):
+        test = chunk[is_test]
+        if len(test):
+            y_true.extend(test[label_field])
+            y_pred.extend(classifier.predict(test[text_field]))
+
+    return Evaluation(
+        name=f"streaming {estimator} ({features})",
+        train_rows=train_rows,
+        test_rows=len(y_true),
+        accuracy=accuracy_score(y_true, y_pred),
+        report=classification_report(y_true, y_pred),
+        elapsed=time.perf_counter() - started,
+        peak_rss_mb=get_peak_rss_mb(),
+    )
+
+
+def evaluate_dense_baseline(
+    file_path: str,
+    text_field: str,
+    label_field: str,
+    max_rows: int | None = None,
+    test_size: float = 0.2,
+    seed: int = 0,
+) -> Evaluation:
+    """
+    The notebook's model, for comparison: a bag of words over the whole
+    vocabulary, turned dense and fed to `GaussianNB`. It needs rows times
+    vocabulary floats in memory, so only the first `max_rows` rows are used
+    when set, split the same way as `train_and_evaluate`.
+    """
+    started = time.perf_counter()
+    data = pd.read_csv(
+        file_path, usecols=[text_field, label_field], nrows=max_rows
+    ).dropna(subset=[label_field])
+    texts = data[text_field].fillna("").astype(str)
+    labels = data[label_field]
+    is_test = np.random.default_rng(seed).random(len(data)) < test_size
+
+    count_vect = CountVectorizer().fit(texts)
+    bow_train = count_vect.transform(texts[~is_test]).toarray()
+    bow_test = count_vect.transform(texts[is_test]).toarray()
+    model = GaussianNB().fit(bow_train, labels[~is_test])
+    predicted = model.predict(bow_test)
+
+    return Evaluation(
+        name="dense GaussianNB (counts)",
+        train_rows=len(bow_train),
+        test_rows=len(bow_test),
+        accuracy=accuracy_score(labels[is_test], predicted),
+        report=classification_report(labels[is_test], predicted),
+        elapsed=time.perf_counter() - started,
+        peak_rss_mb=get_peak_rss_mb(),
+    )
@@ -0,0 +1,67 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from text import Cleaner
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Clean review texts for analysis: remove user tags, "
+        "non-letters and stopwords, then lemmatize them",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "input",
+        type=str,
+        help="Path to reviews CSV file, as written by get_hotel_reviews.py",
+    )
+    arg_parser.add_argument(
+        "--output",
+        type=str,
+        help="Path to output CSV file, with the cleaned texts added as "
+        "<text-field>_cleaned",
+        default=f"output/reviews-cleaned-{int(time.time() * 1000)}.csv",
+    )
+    arg_parser.add_argument(
+        "--text-field",
+        type=str,
+        help="Column of the texts to clean",
+        default="review_text",
+    )
+    arg_parser.add_argument(
+        "--processes",
+        type=int,
+        help="Number of worker processes, defaults to the number of CPUs",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Number of texts handed to a worker process at once",
+        default=5000,
+    )
+    args = arg_parser.parse_args()
+
+    input_filename: str = args.input
+    output_filename: str = args.output
+
+    print(f"Reading from {input_filename}", file=sys.stderr)
+    print(f"Writing to {output_filename}", file=sys.stderr)
+
+    data = pd.read_csv(input_filename)
+    cleaner = Cleaner(processes=args.processes, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    cleaner.clean(data, args.text_field)
+    print(
+        f"Cleaned {len(data)} text(s) in "
+        f"{time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    data.to_csv(output_filename, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+from dataset.loader import (
+    Amenities,
+    iter_reviews,
+    join_hotels,
+    read_hotels,
+    read_reviews,
+)
@@ -0,0 +1,219 @@
+import ast
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+TRIP_TYPES = pd.CategoricalDtype(["Business", "Vacation"])
+TRIP_COMPANIONS = pd.CategoricalDtype(["Family", "Friends", "Couple", "Solo"])
+REVIEW_DTYPES = {
+    "hotel_name": "category",
+    "review_text": "string[pyarrow]",
+    "rating": "float32",
+    "trip_type": TRIP_TYPES,
+    "trip_companions": TRIP_COMPANIONS,
+}
+# Parquet files keep their own types, hotel names being dictionary encoded
+PARQUET_REVIEW_DTYPES = {
+    "trip_type": TRIP_TYPES,
+    "trip_companions": TRIP_COMPANIONS,
+}
+HOTEL_DTYPES = {
+    "name": "string[pyarrow]",
+    "address": "string[pyarrow]",
+    "images_count": "Int32",
+    "popular_amenities": "string[pyarrow]",
+    "source": "category",
+}
+# Amenities are written as Python lists, e.g. ['Pool', "Kids' club"]
+AMENITY_PATTERN = r"'([^'\\]*)'|\"([^\"\\]*)\""
+
+
+@dataclass
+class Amenities:
+    """
+    Popular amenities of every hotel as a sparse indicator matrix, one row
+    per hotel key and one column per amenity of `names`.
+    """
+
+    matrix: sp.csr_matrix
+    names: list[str]
+
+    def to_frame(self, prefix: str = "amenity") -> pd.DataFrame:
+        """
+        Returns the indicators as sparse `<prefix>_<name>` columns, like the
+        notebook's one-hot encoded amenities.
+        """
+        return pd.DataFrame.sparse.from_spmatrix(
+            self.matrix, columns=[f"{prefix}_{name}" for name in self.names]
+        )
+
+
+def is_parquet(file_path: str) -> bool:
+    return file_path.endswith(".parquet")
+
+
+def parse_amenities(popular_amenities: pd.Series) -> Amenities:
+    """
+    Parses the lists of amenities of `popular_amenities`, a column with a
+    row per hotel key, with regular expressions over the whole column
+    rather than `ast.literal_eval` on every cell.
+    """
+    matches = popular_amenities.astype(object).str.extractall(AMENITY_PATTERN)
+    rows = matches.index.get_level_values(0).to_numpy()
+    names = matches[0].fillna(matches[1]).to_numpy(dtype=object)
+
+    # Lists with escaped characters are left to the Python parser
+    escaped = np.flatnonzero(
+        popular_amenities.str.contains("\\", regex=False)
+        .fillna(False)
+        .to_numpy(dtype=bool)
+    )
+    if len(escaped):
+        keep = ~np.isin(rows, escaped)
+        escaped_rows: list[int] = []
+        escaped_names: list[str] = []
+        for row in escaped:
+            for name in ast.literal_eval(popular_amenities.iloc[row]):
+                escaped_rows.append(row)
+                escaped_names.append(name)
+        rows = np.concatenate([rows[keep], escaped_rows]).astype(np.int64)
+        names = np.concatenate([names[keep], escaped_names])
+
+    return get_amenities(rows, names, len(popular_amenities))
+
+
+def get_amenities(
+    rows: np.ndarray, names: np.ndarray, hotel_count: int
+) -> Amenities:
+    """
+    Builds the indicator matrix of `hotel_count` hotels from pairs of hotel
+    keys `rows` and amenity `names`.
+    """
+    codes, uniques = pd.factorize(names, sort=True)
+    matrix = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.uint8), (rows, codes)),
+        shape=(hotel_count, len(uniques)),
+    )
+    # Duplicates within a list would otherwise add up
+    matrix.data[:] = 1
+    return Amenities(matrix, list(uniques))
+
+
+def read_hotels(file_path: str) -> tuple[pd.DataFrame, Amenities]:
+    """
+    Reads hotel details written by `get_hotel_details.py`, as CSV or Parquet,
+    with one row per hotel name, numbered by an integer `hotel_key`, and
+    their popular amenities apart as a sparse indicator matrix.
+    """
+    if is_parquet(file_path):
+        # Missing counts would otherwise turn the column into floats
+        hotels = pd.read_parquet(file_path).astype({"images_count": "Int32"})
+    else:
+        hotels = pd.read_csv(
+            file_path,
+            usecols=lambda column: column in HOTEL_DTYPES,
+            dtype=HOTEL_DTYPES,
+        )
+    # Reviews only know hotels by name
+    hotels = hotels.drop_duplicates("name", ignore_index=True)
+    hotels.insert(0, "hotel_key", np.arange(len(hotels), dtype=np.int32))
+    popular_amenities = hotels.pop("popular_amenities")
+    if is_parquet(file_path):
+        # Already lists, one row per amenity once exploded
+        exploded = popular_amenities.explode().dropna()
+        amenities = get_amenities(
+            exploded.index.to_numpy(),
+            exploded.to_numpy(dtype=object),
+            len(hotels),
+        )
+    else:
+        amenities = parse_amenities(popular_amenities)
+    return hotels, amenities
+
+
+def get_hotel_dtype(hotels: pd.DataFrame) -> pd.CategoricalDtype:
+    """
+    Categorical of hotel names whose codes are the hotels' keys.
+    """
+    return pd.CategoricalDtype(hotels["name"].astype(object))
+
+
+def _to_typed_reviews(
+    reviews: pd.DataFrame, hotels: pd.DataFrame | None
+) -> pd.DataFrame:
+    if hotels is not None:
+        reviews["hotel_name"] = reviews["hotel_name"].astype(
+            get_hotel_dtype(hotels)
+        )
+        # Reviews of hotels missing from the details get -1
+        reviews.insert(
+            0,
+            "hotel_key",
+            reviews["hotel_name"].cat.codes.astype(np.int32),
+        )
+    return reviews
+
+
+def _get_review_csv_options(hotels: pd.DataFrame | None) -> dict:
+    dtypes = dict(REVIEW_DTYPES)
+    if hotels is not None:
+        dtypes["hotel_name"] = get_hotel_dtype(hotels)
+    return {
+        "dtype": dtypes,
+        "parse_dates": ["review_timestamp"],
+        "date_format": "%Y-%m-%d",
+    }
+
+
+def read_reviews(
+    file_path: str, hotels: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """
+    Reads reviews written by `get_hotel_reviews.py`, as CSV or Parquet, with
+    categorical hotel and trip fields and parsed dates. Given `hotels` from
+    `read_hotels`, reviews get the `hotel_key` of their hotel.
+    """
+    if is_parquet(file_path):
+        reviews = pd.read_parquet(file_path).astype(PARQUET_REVIEW_DTYPES)
+    else:
+        reviews = pd.read_csv(file_path, **_get_review_csv_options(hotels))
+    return _to_typed_reviews(reviews, hotels)
+
+
+def iter_reviews(
+    file_path: str,
+    chunk_size: int = 100000,
+    hotels: pd.DataFrame | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Same as `read_reviews`, `chunk_size` reviews at a time, for files larger
+    than memory. Hotel names only share categories across chunks, and can
+    only be concatenated as such, given `hotels`.
+    """
+    if is_parquet(file_path):
+        for batch in pq.ParquetFile(file_path).iter_batches(chunk_size):
+            reviews = batch.to_pandas().astype(PARQUET_REVIEW_DTYPES)
+            yield _to_typed_reviews(reviews, hotels)
+        return
+    for reviews in pd.read_csv(
+        file_path, chunksize=chunk_size, **_get_review_csv_options(hotels)
+    ):
+        yield _to_typed_reviews(reviews, hotels)
+
+
+def join_hotels(reviews: pd.DataFrame, hotels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Inner join of reviews and hotels on `hotel_key`. As keys are positions
+    in `hotels`, hotel columns are gathered by position instead of hashing
+    names.
+    """
+    reviews = reviews[reviews["hotel_key"] >= 0]
+    joined = hotels.iloc[reviews["hotel_key"].to_numpy()].drop(
+        columns="hotel_key"
+    )
+    joined.index = reviews.index
+    return pd.concat([reviews, joined], axis=1)
@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from sentiment import DEFAULT_MODEL, SentimentCache, SentimentScorer
+from sentiment.scorer import BACKENDS
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Classify the sentiment of review texts on CPU, only "
+        "scoring texts not found in the cache",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "input",
+        type=str,
+        help="Path to reviews CSV file",
+    )
+    arg_parser.add_argument(
+        "--output",
+        type=str,
+        help="Path to output CSV file, with the labels added as "
+        "<text-field>_sentiment",
+        default=f"output/reviews-sentiment-{int(time.time() * 1000)}.csv",
+    )
+    arg_parser.add_argument(
+        "--text-field",
+        type=str,
+        help="Column of the texts to classify",
+        default="review_text",
+    )
+    arg_parser.add_argument(
+        "--cache",
+        type=str,
+        help="Path to the cache of texts already scored",
+        default="output/sentiment.cache",
+    )
+    arg_parser.add_argument(
+        "--model",
+        type=str,
+        help="Sentiment model, a Hugging Face model id or a local directory",
+        default=DEFAULT_MODEL,
+    )
+    arg_parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="torch",
+        help="Whether to run the model with PyTorch or export it to ONNX "
+        "Runtime",
+    )
+    arg_parser.add_argument(
+        "--quantize",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to run the linear layers of the model on 8-bit integers",
+    )
+    arg_parser.add_argument(
+        "--threads",
+        type=int,
+        help="Number of CPU threads, defaults to the backend's own default",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of texts classified at once",
+        default=64,
+    )
+    arg_parser.add_argument(
+        "--max-length",
+        type=int,
+        help="Number of tokens texts are truncated to",
+        default=512,
+    )
+    args = arg_parser.parse_args()
+
+    input_filename: str = args.input
+    output_filename: str = args.output
+    text_field: str = args.text_field
+
+    print(f"Reading from {input_filename}", file=sys.stderr)
+    print(f"Writing to {output_filename}", file=sys.stderr)
+    print(f"Caching to {args.cache}", file=sys.stderr)
+
+    data = pd.read_csv(input_filename)
+    texts: list[str] = data[text_field].fillna("").astype(str).tolist()
+    with SentimentCache(
+        args.cache, args.model, args.backend, args.quantize, args.max_length
+    ) as cache:
+        scorer = SentimentScorer(
+            model=args.model,
+            backend=args.backend,
+            quantize=args.quantize,
+            threads=args.threads,
+            batch_size=args.batch_size,
+            max_length=args.max_length,
+            cache=cache,
+        )
+        started = time.perf_counter()
+        results = scorer.score(texts)
+    print(
+        f"Classified {len(texts)} text(s) in "
+        f"{time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    data[f"{text_field}_sentiment"] = [label for label, _ in results]
+    data.to_csv(output_filename, index=False)
+
+
+if __name__ == "__main__":
+    main()
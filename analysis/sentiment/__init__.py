@@ -0,0 +1,15 @@
+from typing import Any
+
+from sentiment.cache import SentimentCache
+
+# The scorer needs PyTorch and transformers, so it is only imported once
+# used, leaving the cache usable without them
+_SCORER_NAMES = ("DEFAULT_MODEL", "SentimentScorer")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SCORER_NAMES:
+        from sentiment import scorer
+
+        return getattr(scorer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
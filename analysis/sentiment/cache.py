@@ -0,0 +1,105 @@
+import hashlib
+import sqlite3
+from types import TracebackType
+from typing import Iterable, Self
+
+# Rows looked up per query, below SQLite's limit of bound parameters
+_LOOKUP_SIZE = 500
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_model_variant(backend: str, quantize: bool, max_length: int) -> str:
+    """
+    Names how a model is run, e.g. "onnx/int8/512", as the backend, 8-bit
+    quantization and truncation may each change its labels.
+    """
+    return f"{backend}/{'int8' if quantize else 'fp32'}/{max_length}"
+
+
+class SentimentCache:
+    """
+    On-disk record of the sentiment of every text scored so far, keyed on
+    the model, how it is run, see `get_model_variant`, and a hash of the
+    text, so that re-runs and newly appended reviews only pay for texts not
+    seen before.
+    """
+
+    _connection: sqlite3.Connection
+
+    def __init__(
+        self,
+        file_path: str,
+        model: str,
+        backend: str = "torch",
+        quantize: bool = False,
+        max_length: int = 512,
+    ) -> None:
+        self._connection = sqlite3.connect(file_path, timeout=30)
+        self._model = model
+        self._variant = get_model_variant(backend, quantize, max_length)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sentiments (
+                model TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (model, variant, text_hash)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def get_many(
+        self, text_hashes: list[str]
+    ) -> dict[str, tuple[str, float]]:
+        """
+        Returns the label and score of the texts of `text_hashes` that are
+        cached, by hash.
+        """
+        results: dict[str, tuple[str, float]] = {}
+        for start in range(0, len(text_hashes), _LOOKUP_SIZE):
+            chunk = text_hashes[start : start + _LOOKUP_SIZE]
+            rows = self._connection.execute(
+                "SELECT text_hash, label, score FROM sentiments "
+                "WHERE model = ? AND variant = ? AND text_hash IN "
+                f"({', '.join('?' * len(chunk))})",
+                (self._model, self._variant, *chunk),
+            )
+            for text_hash, label, score in rows:
+                results[text_hash] = (label, score)
+        return results
+
+    def put_many(self, results: Iterable[tuple[str, str, float]]) -> None:
+        """
+        Records `(text_hash, label, score)` results.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO sentiments "
+                "(model, variant, text_hash, label, score) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (model, variant, text_hash) DO NOTHING",
+                (
+                    (self._model, self._variant, text_hash, label, score)
+                    for text_hash, label, score in results
+                ),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
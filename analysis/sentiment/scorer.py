@@ -0,0 +1,153 @@
+import tempfile
+from typing import Any
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from sentiment.cache import SentimentCache, get_text_hash
+
+DEFAULT_MODEL = "lxyuan/distilbert-base-multilingual-cased-sentiments-student"
+BACKENDS = ("torch", "onnx")
+
+
+class SentimentScorer:
+    """
+    Classifies texts into the labels of a sentiment model on CPU. Texts are
+    sorted by length and each batch is only padded to its longest text,
+    rather than every text to `max_length`, and a text seen before, in the
+    same call or in `cache`, is never scored again.
+    With the `onnx` backend, the model is exported to ONNX Runtime, and with
+    `quantize`, its linear layers run on 8-bit integers.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        backend: str = "torch",
+        quantize: bool = False,
+        threads: int | None = None,
+        batch_size: int = 64,
+        max_length: int = 512,
+        cache: SentimentCache | None = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache = cache
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        if threads is not None:
+            torch.set_num_threads(threads)
+        self.model = self._load_model(model, backend, quantize, threads)
+        self.labels: dict[int, str] = self.model.config.id2label
+
+    @staticmethod
+    def _load_model(
+        model: str, backend: str, quantize: bool, threads: int | None
+    ) -> Any:
+        if backend == "onnx":
+            # Imported here as ONNX Runtime is only needed for this backend
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+
+            session_options = onnxruntime.SessionOptions()
+            if threads is not None:
+                session_options.intra_op_num_threads = threads
+            onnx_model = ORTModelForSequenceClassification.from_pretrained(
+                model,
+                export=True,
+                provider="CPUExecutionProvider",
+                session_options=session_options,
+            )
+            if not quantize:
+                return onnx_model
+
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import (
+                AutoQuantizationConfig,
+            )
+
+            # The session holds the model in memory once loaded, so the
+            # quantized files are only needed until then
+            with tempfile.TemporaryDirectory(
+                prefix="sentiment-onnx-"
+            ) as quantized_dir:
+                ORTQuantizer.from_pretrained(onnx_model).quantize(
+                    save_dir=quantized_dir,
+                    quantization_config=AutoQuantizationConfig.avx2(
+                        is_static=False
+                    ),
+                )
+                return ORTModelForSequenceClassification.from_pretrained(
+                    quantized_dir,
+                    provider="CPUExecutionProvider",
+                    session_options=session_options,
+                )
+
+        torch_model = AutoModelForSequenceClassification.from_pretrained(
+            model
+        ).eval()
+        if quantize:
+            return torch.ao.quantization.quantize_dynamic(
+                torch_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return torch_model
+
+    def _score_batch(
+        self, encodings: list[dict[str, list[int]]]
+    ) -> list[tuple[str, float]]:
+        inputs = self.tokenizer.pad(encodings, return_tensors="pt")
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+        scores, label_ids = torch.softmax(logits, dim=-1).max(dim=-1)
+        return [
+            (self.labels[label_id], score)
+            for label_id, score in zip(label_ids.tolist(), scores.tolist())
+        ]
+
+    def score(self, texts: list[str]) -> list[tuple[str, float]]:
+        """
+        Returns the label and score of every text of `texts`, in order.
+        """
+        text_hashes = [get_text_hash(text) for text in texts]
+        results: dict[str, tuple[str, float]] = (
+            self.cache.get_many(list(set(text_hashes)))
+            if self.cache is not None
+            else {}
+        )
+
+        new_texts: dict[str, str] = {}
+        for text_hash, text in zip(text_hashes, texts):
+            if text_hash not in results:
+                new_texts[text_hash] = text
+        if new_texts:
+            new_hashes = list(new_texts)
+            batch_encoding = self.tokenizer(
+                list(new_texts.values()),
+                truncation=True,
+                max_length=self.max_length,
+            )
+            encodings = [
+                {key: values[i] for key, values in batch_encoding.items()}
+                for i in range(len(new_hashes))
+            ]
+            # Batches of texts of similar lengths need little padding
+            order = sorted(
+                range(len(new_hashes)),
+                key=lambda i: len(encodings[i]["input_ids"]),
+            )
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start : start + self.batch_size]
+                batch_results = [
+                    (new_hashes[i], label, score)
+                    for i, (label, score) in zip(
+                        batch,
+                        self._score_batch([encodings[i] for i in batch]),
+                    )
+                ]
+                for text_hash, label, score in batch_results:
+                    results[text_hash] = (label, score)
+                # Recorded batch by batch, so an interrupted run keeps what
+                # it has scored
+                if self.cache is not None:
+                    self.cache.put_many(batch_results)
+
+        return [results[text_hash] for text_hash in text_hashes]
@@ -0,0 +1,7 @@
+from stats.association import (
+    compute_cat_corr,
+    correlation_ratio_matrix,
+    cramers_v_matrix,
+    theils_u_matrix,
+)
+from stats.corpus import CorpusStats
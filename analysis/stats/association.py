@@ -0,0 +1,243 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+@dataclass
+class Factorized:
+    """
+    Columns of a data frame as integer codes, one row per column, laid out
+    one after the other in a one-hot matrix of `offsets[-1]` columns.
+    Missing values have code -1, unless they are kept as a category.
+    """
+
+    codes: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_frame(
+        cls, data: pd.DataFrame, keep_na: bool = False
+    ) -> "Factorized":
+        codes = np.empty((data.shape[1], data.shape[0]), dtype=np.int64)
+        level_counts = np.zeros(data.shape[1], dtype=np.int64)
+        for i, column in enumerate(data.columns):
+            codes[i], uniques = pd.factorize(
+                data[column], use_na_sentinel=not keep_na
+            )
+            level_counts[i] = len(uniques)
+        offsets = np.concatenate([[0], np.cumsum(level_counts)])
+        return cls(codes, offsets)
+
+    @property
+    def level_columns(self) -> np.ndarray:
+        """
+        Index of the column of each level.
+        """
+        return np.repeat(np.arange(len(self.codes)), np.diff(self.offsets))
+
+    @property
+    def level_indicator(self) -> np.ndarray:
+        """
+        Levels by columns matrix, 1 where the level belongs to the column,
+        to sum level statistics up to column pairs with matrix products.
+        """
+        indicator = np.zeros((self.offsets[-1], len(self.codes)))
+        indicator[np.arange(self.offsets[-1]), self.level_columns] = 1
+        return indicator
+
+
+def get_one_hot(codes: np.ndarray, offsets: np.ndarray) -> sp.csr_matrix:
+    rows = np.broadcast_to(np.arange(codes.shape[1]), codes.shape)
+    levels = codes + offsets[:-1, None]
+    is_present = codes >= 0
+    return sp.csr_matrix(
+        (
+            np.ones(np.count_nonzero(is_present)),
+            (rows[is_present], levels[is_present]),
+        ),
+        shape=(codes.shape[1], offsets[-1]),
+    )
+
+
+def _get_contingency(
+    x_codes: np.ndarray,
+    x_offsets: np.ndarray,
+    y_codes: np.ndarray,
+    y_offsets: np.ndarray,
+) -> np.ndarray:
+    x_one_hot = get_one_hot(x_codes, x_offsets)
+    y_one_hot = get_one_hot(y_codes, y_offsets)
+    return (x_one_hot.T @ y_one_hot).toarray()
+
+
+def get_contingency(
+    x: Factorized,
+    y: Factorized,
+    processes: int | None = 1,
+    chunk_size: int = 100000,
+) -> np.ndarray:
+    """
+    Returns the contingency tables of every pair of columns of `x` and `y`
+    at once, as a single matrix of the levels of `x` by the levels of `y`
+    whose block at the levels of two columns is their contingency table.
+    With several `processes`, rows are counted by chunks of `chunk_size`
+    in parallel, as counts simply add up.
+    """
+    rows = x.codes.shape[1]
+    if processes == 1 or rows <= chunk_size:
+        return _get_contingency(x.codes, x.offsets, y.codes, y.offsets)
+    starts = range(0, rows, chunk_size)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return sum(
+            executor.map(
+                _get_contingency,
+                (x.codes[:, start : start + chunk_size] for start in starts),
+                (x.offsets for _ in starts),
+                (y.codes[:, start : start + chunk_size] for start in starts),
+                (y.offsets for _ in starts),
+            ),
+            np.zeros((x.offsets[-1], y.offsets[-1])),
+        )
+
+
+def cramers_v_matrix(
+    x_data: pd.DataFrame,
+    y_data: pd.DataFrame,
+    processes: int | None = 1,
+) -> pd.DataFrame:
+    """
+    Bias-corrected Cramér's V of every column of `x_data` against every
+    column of `y_data`, with the Yates correction for 2x2 tables like
+    `scipy.stats.chi2_contingency`. Rows missing either value are left out
+    of a pair, like `pd.crosstab` does.
+    """
+    x = Factorized.from_frame(x_data)
+    y = Factorized.from_frame(y_data)
+    counts = get_contingency(x, y, processes)
+    x_indicator, y_indicator = x.level_indicator, y.level_indicator
+    x_columns, y_columns = x.level_columns, y.level_columns
+
+    # Sums of every row and column of each table, per level
+    row_sums = (counts @ y_indicator)[:, y_columns]
+    col_sums = (x_indicator.T @ counts)[x_columns, :]
+    totals = x_indicator.T @ counts @ y_indicator
+    # Levels never seen along the other column are not part of the table
+    r = x_indicator.T @ (counts @ y_indicator > 0)
+    k = (x_indicator.T @ counts > 0) @ y_indicator
+    dof = (r - 1) * (k - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = row_sums * col_sums / totals[np.ix_(x_columns, y_columns)]
+        diff = expected - counts
+        is_corrected = (dof == 1)[np.ix_(x_columns, y_columns)]
+        observed = np.where(
+            is_corrected,
+            counts + np.sign(diff) * np.minimum(0.5, np.abs(diff)),
+            counts,
+        )
+        terms = np.where(
+            expected > 0, (observed - expected) ** 2 / expected, 0.0
+        )
+        chi2 = np.where(dof == 0, 0.0, x_indicator.T @ terms @ y_indicator)
+
+        n = totals
+        phi2corr = np.maximum(0, chi2 / n - dof / (n - 1))
+        rcorr = r - (r - 1) ** 2 / (n - 1)
+        kcorr = k - (k - 1) ** 2 / (n - 1)
+        values = np.sqrt(phi2corr / np.minimum(kcorr - 1, rcorr - 1))
+    return pd.DataFrame(values, index=x_data.columns, columns=y_data.columns)
+
+
+def theils_u_matrix(
+    x_data: pd.DataFrame,
+    y_data: pd.DataFrame,
+    processes: int | None = 1,
+) -> pd.DataFrame:
+    """
+    Theil's U, the uncertainty of each column of `x_data` explained by each
+    column of `y_data`, with missing values as a category of their own.
+    """
+    x = Factorized.from_frame(x_data, keep_na=True)
+    y = Factorized.from_frame(y_data, keep_na=True)
+    counts = get_contingency(x, y, processes)
+    x_indicator, y_indicator = x.level_indicator, y.level_indicator
+    n = len(x_data)
+
+    y_counts = counts.sum(axis=0) / len(x.codes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_xy = counts / n
+        conditional_terms = np.where(
+            counts > 0, p_xy * np.log(y_counts[None, :] / counts), 0.0
+        )
+        s_xy = x_indicator.T @ conditional_terms @ y_indicator
+
+        p_x = counts.sum(axis=1) / len(y.codes) / n
+        s_x = x_indicator.T @ np.where(p_x > 0, -p_x * np.log(p_x), 0.0)
+        values = np.where(
+            s_x[:, None] == 0, 1.0, (s_x[:, None] - s_xy) / s_x[:, None]
+        )
+    return pd.DataFrame(values, index=x_data.columns, columns=y_data.columns)
+
+
+def correlation_ratio_matrix(
+    categories: pd.DataFrame, measurements: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Correlation ratio η of every categorical column of `categories` against
+    every numerical column of `measurements`. Rows of a missing category
+    count towards the total variance only, as in the notebook.
+    """
+    x = Factorized.from_frame(categories)
+    one_hot = get_one_hot(x.codes, x.offsets)
+    x_indicator = x.level_indicator
+    y = measurements.to_numpy(dtype=np.float64)
+
+    level_counts = np.asarray(one_hot.sum(axis=0)).ravel()
+    level_sums = one_hot.T @ y
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level_means = level_sums / level_counts[:, None]
+        # Mean of the rows with a category, per pair
+        averages = (x_indicator.T @ level_sums) / (
+            x_indicator.T @ level_counts
+        )[:, None]
+        numerator = x_indicator.T @ (
+            level_counts[:, None]
+            * (level_means - averages[x.level_columns]) ** 2
+        )
+        mean = y.mean(axis=0)
+        denominator = ((y - mean) ** 2).sum(axis=0) + len(y) * (
+            averages - mean
+        ) ** 2
+        values = np.where(
+            numerator == 0, 0.0, np.sqrt(numerator / denominator)
+        )
+    return pd.DataFrame(
+        values, index=categories.columns, columns=measurements.columns
+    )
+
+
+def compute_cat_corr(
+    cat_data: pd.DataFrame,
+    num_data: pd.DataFrame | None = None,
+    corr_type: str = "cramers_v",
+    processes: int | None = 1,
+) -> pd.DataFrame:
+    """
+    Association of every column of `cat_data` against every column of
+    `num_data`, itself by default: Cramér's V, Theil's U, or with `mixed`
+    the correlation ratio to numerical columns. Drop-in replacement for the
+    notebook's function of the same name, computing the whole matrix from
+    one set of contingency tables rather than pair by pair.
+    """
+    if num_data is None:
+        num_data = cat_data
+    if corr_type == "cramers_v":
+        return cramers_v_matrix(cat_data, num_data, processes)
+    if corr_type == "theils_u":
+        return theils_u_matrix(cat_data, num_data, processes)
+    if corr_type == "mixed":
+        return correlation_ratio_matrix(cat_data, num_data)
+    raise ValueError(f"Unknown correlation type {corr_type}")
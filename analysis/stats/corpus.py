@@ -0,0 +1,279 @@
+from collections import Counter
+import hashlib
+import sqlite3
+from types import TracebackType
+from typing import Callable, Self
+
+import pandas as pd
+
+# Units review lengths are counted in
+TOKENS = "tokens"
+CHARACTERS = "characters"
+# Month of reviews without a date
+UNKNOWN_MONTH = ""
+
+
+def get_batch_hash(reviews: pd.DataFrame, field: str) -> str:
+    """
+    Hash of the columns of `reviews` that `CorpusStats.update` counts.
+    """
+    columns = reviews[["hotel_name", "review_timestamp", field]]
+    return hashlib.sha256(
+        pd.util.hash_pandas_object(columns, index=False).to_numpy().tobytes()
+    ).hexdigest()
+
+
+class CorpusStats:
+    """
+    On-disk word frequencies and length histograms of review texts, kept as
+    partial counts per hotel and month of review. Each batch of reviews adds
+    to the partial counts, and global or filtered figures are answered by
+    summing partials instead of scanning the texts again. Lengths are kept
+    exactly, so histograms can be binned any way afterwards.
+    Applied batches are recorded by source and content hash, so a batch
+    added again, e.g. when a file is read twice, is not counted twice.
+    """
+
+    _connection: sqlite3.Connection
+
+    def __init__(self, file_path: str) -> None:
+        self._connection = sqlite3.connect(file_path, timeout=30)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS token_counts (
+                field TEXT NOT NULL,
+                hotel_name TEXT NOT NULL,
+                month TEXT NOT NULL,
+                token TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (field, hotel_name, month, token)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS length_counts (
+                field TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                hotel_name TEXT NOT NULL,
+                month TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (field, unit, hotel_name, month, length)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS applied_batches (
+                field TEXT NOT NULL,
+                source TEXT NOT NULL,
+                batch_hash TEXT NOT NULL,
+                PRIMARY KEY (field, source, batch_hash)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def update(
+        self,
+        reviews: pd.DataFrame,
+        field: str = "review_text_cleaned",
+        tokenize: Callable[[str], list[str]] | None = None,
+        source: str = "",
+    ) -> bool:
+        """
+        Adds the texts of `field` in `reviews`, which also needs the
+        `hotel_name` and `review_timestamp` columns, to the partial counts.
+        Texts are split on whitespace unless `tokenize` is given, e.g. nltk's
+        `word_tokenize` for raw texts.
+        Returns False, counting nothing, if the same reviews from `source`,
+        e.g. the path of the file they were read from, were added before.
+        """
+        batch_hash = get_batch_hash(reviews, field)
+        texts = reviews[field].fillna("").astype(str)
+        tokens = texts.map(tokenize) if tokenize else texts.str.split()
+        partials = pd.DataFrame(
+            {
+                "hotel_name": reviews["hotel_name"]
+                .astype(object)
+                .fillna("")
+                .to_numpy(),
+                "month": pd.to_datetime(reviews["review_timestamp"])
+                .dt.strftime("%Y-%m")
+                .fillna(UNKNOWN_MONTH)
+                .to_numpy(),
+                "token": tokens.to_numpy(),
+                TOKENS: tokens.str.len().to_numpy(),
+                CHARACTERS: texts.str.len().to_numpy(),
+            }
+        )
+
+        token_counts = (
+            partials[["hotel_name", "month", "token"]]
+            .explode("token")
+            .dropna()
+            .groupby(["hotel_name", "month", "token"], observed=True)
+            .size()
+        )
+        with self._connection:
+            # Recorded along with the counts, so a batch is either applied
+            # and recorded, or neither
+            if not self._connection.execute(
+                "INSERT OR IGNORE INTO applied_batches "
+                "(field, source, batch_hash) VALUES (?, ?, ?)",
+                (field, source, batch_hash),
+            ).rowcount:
+                return False
+            self._connection.executemany(
+                "INSERT INTO token_counts "
+                "(field, hotel_name, month, token, count) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (field, hotel_name, month, token) "
+                "DO UPDATE SET count = count + excluded.count",
+                (
+                    (field, hotel_name, month, token, int(count))
+                    for (hotel_name, month, token), count in (
+                        token_counts.items()
+                    )
+                ),
+            )
+            for unit in (TOKENS, CHARACTERS):
+                length_counts = partials.groupby(
+                    ["hotel_name", "month", unit]
+                ).size()
+                self._connection.executemany(
+                    "INSERT INTO length_counts "
+                    "(field, unit, hotel_name, month, length, count) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (field, unit, hotel_name, month, length) "
+                    "DO UPDATE SET count = count + excluded.count",
+                    (
+                        (field, unit, hotel_name, month, int(length), int(n))
+                        for (hotel_name, month, length), n in (
+                            length_counts.items()
+                        )
+                    ),
+                )
+        return True
+
+    @staticmethod
+    def _get_filter(
+        field: str,
+        hotel_names: list[str] | None,
+        months: list[str] | None,
+    ) -> tuple[str, list[str]]:
+        clauses = ["field = ?"]
+        params = [field]
+        if hotel_names is not None:
+            clauses.append(
+                f"hotel_name IN ({', '.join('?' * len(hotel_names))})"
+            )
+            params.extend(hotel_names)
+        if months is not None:
+            clauses.append(f"month IN ({', '.join('?' * len(months))})")
+            params.extend(months)
+        return " AND ".join(clauses), params
+
+    def get_token_counts(
+        self,
+        field: str = "review_text_cleaned",
+        hotel_names: list[str] | None = None,
+        months: list[str] | None = None,
+        limit: int | None = None,
+    ) -> Counter[str]:
+        """
+        Returns how many times each token appears in the reviews of
+        `hotel_names` in `months` ("2023-05"), all of them by default, or
+        only the `limit` most common tokens, e.g. for a word cloud with
+        `WordCloud.generate_from_frequencies`.
+        """
+        where, params = self._get_filter(field, hotel_names, months)
+        query = (
+            f"SELECT token, SUM(count) AS total FROM token_counts "
+            f"WHERE {where} GROUP BY token ORDER BY total DESC"
+        )
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return Counter(dict(self._connection.execute(query, params)))
+
+    def most_common(
+        self,
+        n: int = 10,
+        field: str = "review_text_cleaned",
+        hotel_names: list[str] | None = None,
+        months: list[str] | None = None,
+    ) -> list[tuple[str, int]]:
+        return self.get_token_counts(
+            field, hotel_names, months, limit=n
+        ).most_common(n)
+
+    def get_length_counts(
+        self,
+        unit: str = TOKENS,
+        field: str = "review_text_cleaned",
+        hotel_names: list[str] | None = None,
+        months: list[str] | None = None,
+    ) -> pd.Series:
+        """
+        Returns the number of reviews of each length in `unit`, indexed by
+        length, e.g. for `plt.hist(counts.index, weights=counts, bins=50)`.
+        """
+        where, params = self._get_filter(field, hotel_names, months)
+        rows = self._connection.execute(
+            "SELECT length, SUM(count) FROM length_counts "
+            f"WHERE {where} AND unit = ? GROUP BY length ORDER BY length",
+            [*params, unit],
+        ).fetchall()
+        return pd.Series(
+            [count for _, count in rows],
+            index=pd.Index([length for length, _ in rows], name="length"),
+            name="count",
+            dtype="int64",
+        )
+
+    def merge(self, file_path: str) -> None:
+        """
+        Adds the partial counts of another store, e.g. one filled by another
+        process, to this one, along with the batches it has applied.
+        Raises ValueError, adding nothing, if any of those batches was
+        applied to this store already, e.g. when merging a store twice, as
+        counts of single batches cannot be told apart in a store.
+        """
+        self._connection.execute("ATTACH DATABASE ? AS other", (file_path,))
+        try:
+            with self._connection:
+                (overlapping,) = self._connection.execute(
+                    "SELECT COUNT(*) FROM other.applied_batches "
+                    "JOIN main.applied_batches "
+                    "USING (field, source, batch_hash)"
+                ).fetchone()
+                if overlapping:
+                    raise ValueError(
+                        f"{overlapping} batch(es) of {file_path} were "
+                        "already applied"
+                    )
+                self._connection.execute(
+                    "INSERT INTO token_counts "
+                    "SELECT * FROM other.token_counts WHERE true "
+                    "ON CONFLICT (field, hotel_name, month, token) "
+                    "DO UPDATE SET count = count + excluded.count"
+                )
+                self._connection.execute(
+                    "INSERT INTO length_counts "
+                    "SELECT * FROM other.length_counts WHERE true "
+                    "ON CONFLICT (field, unit, hotel_name, month, length) "
+                    "DO UPDATE SET count = count + excluded.count"
+                )
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO applied_batches "
+                    "SELECT * FROM other.applied_batches"
+                )
+        finally:
+            self._connection.execute("DETACH DATABASE other")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
@@ -0,0 +1,96 @@
+from collections import Counter
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as ss
+
+from stats import compute_cat_corr
+from stats.association import Factorized, get_contingency
+
+
+def cramers_v(x: pd.Series, y: pd.Series) -> float:
+    # Pair by pair, as in the notebook
+    confusion_matrix = pd.crosstab(x, y)
+    chi2 = ss.chi2_contingency(confusion_matrix)[0]
+    n = confusion_matrix.sum().sum()
+    r, k = confusion_matrix.shape
+    phi2corr = max(0, chi2 / n - (k - 1) * (r - 1) / (n - 1))
+    rcorr = r - (r - 1) ** 2 / (n - 1)
+    kcorr = k - (k - 1) ** 2 / (n - 1)
+    return math.sqrt(phi2corr / min(kcorr - 1, rcorr - 1))
+
+
+def theils_u(x: pd.Series, y: pd.Series) -> float:
+    y_counter = Counter(y)
+    xy_counter = Counter(zip(x, y))
+    s_xy = sum(
+        count / len(x) * math.log(y_counter[y_value] / count)
+        for (_, y_value), count in xy_counter.items()
+    )
+    s_x = ss.entropy(list(Counter(x).values()))
+    return 1.0 if s_x == 0 else (s_x - s_xy) / s_x
+
+
+def correlation_ratio(categories: pd.Series, measurements: pd.Series) -> float:
+    means = measurements.groupby(categories).agg(["mean", "size"])
+    mean = measurements.mean()
+    numerator = (means["size"] * (means["mean"] - mean) ** 2).sum()
+    denominator = ((measurements - mean) ** 2).sum()
+    return 0.0 if numerator == 0 else math.sqrt(numerator / denominator)
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    trip_type = rng.choice(["Business", "Vacation"], 300)
+    return pd.DataFrame(
+        {
+            "trip_type": trip_type,
+            # Depends on the trip type, so that some pairs are associated
+            "trip_companions": np.where(
+                trip_type == "Business",
+                rng.choice(["Solo", "Couple"], 300),
+                rng.choice(["Family", "Friends", "Couple"], 300),
+            ),
+            "rating": rng.choice(["1", "2", "3", "4", "5"], 300),
+        }
+    )
+
+
+def test_cramers_v_matches_pairwise(data):
+    matrix = compute_cat_corr(data)
+    for x in data.columns:
+        for y in data.columns:
+            assert matrix.loc[x, y] == pytest.approx(
+                cramers_v(data[x], data[y])
+            )
+
+
+def test_theils_u_matches_pairwise(data):
+    matrix = compute_cat_corr(data, corr_type="theils_u")
+    for x in data.columns:
+        for y in data.columns:
+            assert matrix.loc[x, y] == pytest.approx(theils_u(data[x], data[y]))
+
+
+def test_correlation_ratio_matches_pairwise(data):
+    measurements = pd.DataFrame({"score": data["rating"].astype(float)})
+    matrix = compute_cat_corr(data, measurements, corr_type="mixed")
+    for x in data.columns:
+        assert matrix.loc[x, "score"] == pytest.approx(
+            correlation_ratio(data[x], measurements["score"])
+        )
+
+
+def test_contingency_chunks_add_up(data):
+    x = Factorized.from_frame(data)
+    counts = get_contingency(x, x, processes=2, chunk_size=50)
+    assert np.array_equal(counts, get_contingency(x, x))
+    assert counts.sum() == len(data) * len(data.columns) ** 2
+
+
+def test_unknown_correlation_type(data):
+    with pytest.raises(ValueError):
+        compute_cat_corr(data, corr_type="pearson")
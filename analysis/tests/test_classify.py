@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from classify import StreamingClassifier, train_and_evaluate
+from classify.streaming import get_classes, iter_chunks
+
+POSITIVE = ["great stay", "lovely staff", "clean room", "great view"]
+NEGATIVE = ["dirty room", "rude staff", "noisy night", "awful breakfast"]
+
+
+@pytest.fixture
+def reviews_path(tmp_path) -> str:
+    rng = np.random.default_rng(0)
+    is_positive = rng.random(400) < 0.5
+    reviews = pd.DataFrame(
+        {
+            "review_text": [
+                rng.choice(POSITIVE if positive else NEGATIVE)
+                for positive in is_positive
+            ],
+            # Numeric labels, as read from a rating column
+            "rating": np.where(is_positive, 5, 1),
+        }
+    )
+    reviews.loc[0, "rating"] = None
+    file_path = str(tmp_path / "reviews.csv")
+    reviews.to_csv(file_path, index=False)
+    return file_path
+
+
+def test_chunks_hold_out_the_same_rows(reviews_path):
+    first = list(iter_chunks(reviews_path, "review_text", "rating", 50, 0.2))
+    second = list(iter_chunks(reviews_path, "review_text", "rating", 50, 0.2))
+    assert sum(len(chunk) for chunk, _ in first) == 399
+    for (_, is_test), (_, is_test_again) in zip(first, second):
+        assert np.array_equal(is_test, is_test_again)
+    # Labels match the classes, whatever the column's type
+    classes = get_classes(reviews_path, "rating")
+    assert classes == ["1.0", "5.0"]
+    assert set(first[0][0]["rating"]) <= set(classes)
+
+
+@pytest.mark.parametrize("estimator", ["nb", "sgd"])
+@pytest.mark.parametrize("features", ["counts", "tfidf"])
+def test_numeric_labels_train(reviews_path, estimator, features):
+    evaluation = train_and_evaluate(
+        reviews_path,
+        "review_text",
+        "rating",
+        estimator=estimator,
+        features=features,
+        n_features=2**10,
+        chunk_size=64,
+    )
+    assert evaluation.train_rows + evaluation.test_rows == 399
+    assert evaluation.accuracy > 0.9
+
+
+def test_tfidf_needs_document_counts():
+    classifier = StreamingClassifier(["a", "b"], features="tfidf")
+    with pytest.raises(AssertionError):
+        classifier.transform(pd.Series(["text"]))
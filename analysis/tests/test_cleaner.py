@@ -0,0 +1,50 @@
+import re
+
+import pandas as pd
+import pytest
+
+nltk = pytest.importorskip("nltk")
+try:
+    nltk.corpus.stopwords.words("english")
+    nltk.stem.WordNetLemmatizer().lemmatize("rooms")
+    nltk.tokenize.word_tokenize("rooms")
+except LookupError:
+    pytest.skip("nltk data is not downloaded", allow_module_level=True)
+
+from text.cleaner import Cleaner  # noqa: E402
+
+SAMPLE = [
+    "@john The rooms were clean, the staff was friendly!",
+    "Cannot complain: 10/10 would stay again :)",
+    "We're gonna come back in 2025, the breakfast buffet was AMAZING",
+    "Noisy street... couldn't sleep.   Wanna try another hotel next time",
+    "Gimme a room with a view of the Dragon Bridge, @hotel_staff thanks",
+    "Đà Nẵng is lovely, the pool and the spa were relaxing",
+] * 3
+
+
+def clean_like_notebook(text: str) -> str:
+    """
+    Cleaning steps of the EDA notebook, text by text.
+    """
+    lemmatizer = nltk.stem.WordNetLemmatizer()
+    stopwords = set(nltk.corpus.stopwords.words("english"))
+    text = re.sub(r"@[^\s]+[\s]?", "", text)
+    text = re.sub(r"[^A-Za-z]+", " ", text).lower()
+    tokens = nltk.tokenize.word_tokenize(text)
+    tokens = [w for w in tokens if w not in stopwords]
+    return " ".join(lemmatizer.lemmatize(w) for w in tokens)
+
+
+def test_cleaner_matches_the_notebook():
+    cleaned = Cleaner(processes=1).clean_texts(pd.Series(SAMPLE))
+    assert cleaned.tolist() == [clean_like_notebook(t) for t in SAMPLE]
+
+
+def test_pooled_cleaner_matches_single_process():
+    texts = pd.Series(SAMPLE + [None], index=range(10, 10 + len(SAMPLE) + 1))
+    single = Cleaner(processes=1).clean_texts(texts)
+    # More texts than a chunk, so that they are spread across the workers
+    pooled = Cleaner(processes=2, chunk_size=4).clean_texts(texts)
+    pd.testing.assert_series_equal(pooled, single)
+    assert single.iloc[-1] == ""
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from stats import CorpusStats
+
+
+def make_reviews(texts: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "hotel_name": ["Hanoi Hotel"] * len(texts),
+            "review_timestamp": pd.to_datetime(
+                ["2023-11-02"] * (len(texts) - 1) + [None]
+            ),
+            "review_text_cleaned": texts,
+        }
+    )
+
+
+def test_counts_add_up(tmp_path):
+    with CorpusStats(str(tmp_path / "corpus.stats")) as store:
+        store.update(make_reviews(["clean room", "room view", "room"]))
+        assert store.most_common(1) == [("room", 3)]
+        assert store.get_token_counts(months=["2023-11"]) == {
+            "clean": 1,
+            "room": 2,
+            "view": 1,
+        }
+        lengths = store.get_length_counts("tokens")
+        assert lengths.to_dict() == {1: 1, 2: 2}
+        assert store.get_length_counts("characters").sum() == 3
+
+
+def test_repeated_batches_are_skipped(tmp_path):
+    reviews = make_reviews(["clean room", "room"])
+    with CorpusStats(str(tmp_path / "corpus.stats")) as store:
+        assert store.update(reviews, source="reviews.csv")
+        assert not store.update(reviews, source="reviews.csv")
+        assert store.get_token_counts()["room"] == 2
+        # Other reviews from the same source still count
+        other_reviews = make_reviews(["room", "view"])
+        assert store.update(other_reviews, source="reviews.csv")
+        assert store.get_token_counts()["room"] == 3
+
+
+def test_merge_skips_batches_applied_elsewhere(tmp_path):
+    reviews = make_reviews(["clean room", "room"])
+    other_path = str(tmp_path / "other.stats")
+    with CorpusStats(other_path) as other:
+        other.update(reviews, source="reviews.csv")
+    with CorpusStats(str(tmp_path / "corpus.stats")) as store:
+        store.merge(other_path)
+        assert store.get_token_counts()["room"] == 2
+        assert not store.update(reviews, source="reviews.csv")
+        assert store.get_token_counts()["room"] == 2
+
+
+def test_overlapping_merges_are_rejected(tmp_path):
+    reviews = make_reviews(["clean room", "room"])
+    other_path = str(tmp_path / "other.stats")
+    with CorpusStats(other_path) as other:
+        other.update(reviews, source="reviews.csv")
+    with CorpusStats(str(tmp_path / "corpus.stats")) as store:
+        store.merge(other_path)
+        with pytest.raises(ValueError):
+            store.merge(other_path)
+        assert store.get_token_counts()["room"] == 2
+
+    # Nor can a batch applied here come again from another store
+    with CorpusStats(str(tmp_path / "local.stats")) as store:
+        store.update(reviews, source="reviews.csv")
+        with pytest.raises(ValueError):
+            store.merge(other_path)
+        assert store.get_token_counts()["room"] == 2
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset.loader import (
+    iter_reviews,
+    join_hotels,
+    read_hotels,
+    read_reviews,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+HOTELS_CSV = os.path.join(FIXTURES_DIR, "hotels.csv")
+REVIEWS_CSV = os.path.join(FIXTURES_DIR, "reviews.csv")
+
+
+@pytest.fixture
+def hotels():
+    return read_hotels(HOTELS_CSV)
+
+
+def test_hotels_are_typed_and_deduplicated(hotels):
+    hotels, _ = hotels
+    assert hotels["name"].tolist() == [
+        "Hanoi Pearl",
+        "Dragon View",
+        "Old Quarter Inn",
+        "Riverside Lodge",
+    ]
+    assert hotels["hotel_key"].tolist() == [0, 1, 2, 3]
+    assert hotels.dtypes.to_dict() == {
+        "hotel_key": np.int32,
+        "name": "string[pyarrow]",
+        "address": "string[pyarrow]",
+        "images_count": "Int32",
+        "source": "category",
+    }
+    assert hotels["images_count"].isna().tolist() == [
+        False,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_amenities_are_a_sparse_indicator_matrix(hotels):
+    _, amenities = hotels
+    assert amenities.names == [
+        'Chef\'s "table"',
+        "Free Wi-Fi",
+        "Kids' club",
+        "Pool",
+        "Spa",
+    ]
+    assert amenities.matrix.format == "csr"
+    # Duplicates within a list count once
+    assert amenities.matrix.toarray().tolist() == [
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 1, 1],
+        [0, 0, 0, 0, 0],
+        [1, 0, 0, 0, 1],
+    ]
+    frame = amenities.to_frame()
+    assert frame.columns[0] == 'amenity_Chef\'s "table"'
+    assert all(isinstance(dtype, pd.SparseDtype) for dtype in frame.dtypes)
+
+
+def test_reviews_get_their_hotel_key(hotels):
+    hotels, _ = hotels
+    reviews = read_reviews(REVIEWS_CSV, hotels)
+    assert reviews["hotel_key"].tolist() == [0, 1, 0, -1, 2]
+    assert reviews.dtypes["rating"] == np.float32
+    assert reviews.dtypes["review_text"] == "string[pyarrow]"
+    assert reviews.dtypes["review_timestamp"].kind == "M"
+    assert reviews["trip_type"].cat.categories.tolist() == [
+        "Business",
+        "Vacation",
+    ]
+    assert reviews["trip_companions"].isna().tolist() == [
+        False,
+        False,
+        True,
+        False,
+        False,
+    ]
+    joined = join_hotels(reviews, hotels)
+    assert joined.index.tolist() == [0, 1, 2, 4]
+    assert joined["address"].tolist() == [
+        "12 Hang Bac, Hanoi",
+        "3 Bach Dang, Da Nang",
+        "12 Hang Bac, Hanoi",
+        "5 Ma May, Hanoi",
+    ]
+
+
+def test_review_chunks_add_up_to_the_whole_file(hotels):
+    hotels, _ = hotels
+    chunks = list(iter_reviews(REVIEWS_CSV, chunk_size=2, hotels=hotels))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks), read_reviews(REVIEWS_CSV, hotels)
+    )
+
+
+def test_parquet_round_trip(tmp_path, hotels):
+    hotels, amenities = hotels
+    reviews = read_reviews(REVIEWS_CSV, hotels)
+
+    # Parquet files of the data collection scripts keep amenities as lists
+    hotels_parquet = str(tmp_path / "hotels.parquet")
+    hotels.drop(columns="hotel_key").assign(
+        popular_amenities=[
+            [amenities.names[i] for i in row.indices]
+            for row in amenities.matrix
+        ]
+    ).to_parquet(hotels_parquet)
+    reviews_parquet = str(tmp_path / "reviews.parquet")
+    reviews.drop(columns="hotel_key").to_parquet(reviews_parquet)
+
+    parquet_hotels, parquet_amenities = read_hotels(hotels_parquet)
+    pd.testing.assert_frame_equal(parquet_hotels, hotels)
+    assert parquet_amenities.names == amenities.names
+    assert (parquet_amenities.matrix != amenities.matrix).nnz == 0
+
+    parquet_reviews = read_reviews(reviews_parquet, parquet_hotels)
+    pd.testing.assert_frame_equal(parquet_reviews, reviews)
+    chunks = iter_reviews(reviews_parquet, chunk_size=2, hotels=hotels)
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True), reviews
+    )
@@ -0,0 +1,24 @@
+import sys
+
+from sentiment.cache import SentimentCache, get_text_hash
+
+
+def test_cache_is_keyed_on_model_variant(tmp_path):
+    file_path = str(tmp_path / "sentiment.cache")
+    text_hash = get_text_hash("Lovely stay")
+    with SentimentCache(file_path, "model") as cache:
+        cache.put_many([(text_hash, "positive", 0.9)])
+        assert cache.get_many([text_hash]) == {text_hash: ("positive", 0.9)}
+    with SentimentCache(file_path, "model", quantize=True) as cache:
+        assert cache.get_many([text_hash]) == {}
+    with SentimentCache(file_path, "model", "onnx") as cache:
+        assert cache.get_many([text_hash]) == {}
+    with SentimentCache(file_path, "model", max_length=128) as cache:
+        assert cache.get_many([text_hash]) == {}
+
+
+def test_cache_imports_without_torch():
+    import sentiment
+
+    assert sentiment.SentimentCache is SentimentCache
+    assert "sentiment.scorer" not in sys.modules
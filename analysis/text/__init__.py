@@ -0,0 +1 @@
+from text.cleaner import Cleaner
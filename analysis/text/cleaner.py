@@ -0,0 +1,194 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+import nltk
+import pandas as pd
+
+# User tags, e.g. "@john"
+USERNAME_PATTERN = r"@[^\s]+[\s]?"
+# Digits and any other characters except A-Z, a-z
+NON_LETTERS_PATTERN = r"[^A-Za-z]+"
+# Words that nltk's `word_tokenize` splits in two, e.g. "cannot" into "can"
+# and "not". Once the text is down to lowercase letters and spaces, it is the
+# only thing the tokenizer does besides splitting on whitespace
+CONTRACTIONS_PATTERN = (
+    r"\b(can(?=not\b)|gim(?=me\b)|gon(?=na\b)|got(?=ta\b)"
+    r"|lem(?=me\b)|wan(?=na\b))"
+)
+
+# Cleaner of the current worker process, see `_init_worker`
+_worker_cleaner: "Cleaner | None" = None
+
+
+def _init_worker(lemma_cache_size: int) -> None:
+    global _worker_cleaner
+    _worker_cleaner = Cleaner(processes=1, lemma_cache_size=lemma_cache_size)
+
+
+def _preprocess_chunk(texts: list[str]) -> list[str]:
+    assert _worker_cleaner is not None
+    return [_worker_cleaner.preprocessing(text) for text in texts]
+
+
+def iter_chunks(items: list[Any], chunk_size: int) -> Iterator[list[Any]]:
+    for start in range(0, len(items), chunk_size):
+        yield items[start : start + chunk_size]
+
+
+class Cleaner:
+    """
+    Cleans review texts: removes user tags and everything but letters, then
+    lowers, tokenizes, removes stopwords and lemmatizes them. The regular
+    expressions run on the whole column at once through pandas `str`
+    methods, while tokens are processed in chunks across `processes` worker
+    processes, each caching the lemmas of the words it has seen.
+    Texts of `max_tokens` tokens or more are summarized with spaCy, which is
+    only loaded when such a text comes up.
+    """
+
+    def __init__(
+        self,
+        processes: int | None = None,
+        chunk_size: int = 5000,
+        lemma_cache_size: int = 65536,
+        max_tokens: int = 512,
+        summary_batch_size: int = 32,
+    ) -> None:
+        """
+        `processes` defaults to the number of CPUs, texts are processed in
+        the calling process with `processes=1`.
+        """
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.lemma_cache_size = lemma_cache_size
+        self.max_tokens = max_tokens
+        self.summary_batch_size = summary_batch_size
+        self.lemmatizer = nltk.stem.WordNetLemmatizer()
+        self.list_stopwords = frozenset(nltk.corpus.stopwords.words("english"))
+        # The review vocabulary is small, so most words are looked up in
+        # WordNet only once
+        self._lemmatize_word: Callable[[str], str] = lru_cache(
+            maxsize=lemma_cache_size
+        )(self.lemmatizer.lemmatize)
+        self._nlp: Any = None
+
+    @property
+    def nlp(self) -> Any:
+        if self._nlp is None:
+            # Imported here as spaCy is only needed to summarize long texts
+            import spacy
+
+            # Sentences come from the dependency parser, the other
+            # components would only slow it down
+            self._nlp = spacy.load(
+                "en_core_web_sm", exclude=["ner", "lemmatizer"]
+            )
+        return self._nlp
+
+    def clean(
+        self, data: pd.DataFrame, text_field: str = "review_text"
+    ) -> pd.DataFrame:
+        """
+        Adds the cleaned texts of `text_field` to `data` as
+        `<text_field>_cleaned`. Returns `data`.
+        """
+        data[f"{text_field}_cleaned"] = self.clean_texts(data[text_field])
+        return data
+
+    def clean_texts(self, texts: pd.Series) -> pd.Series:
+        normalized: list[str] = self.normalize(texts).tolist()
+        if self.processes == 1 or len(normalized) <= self.chunk_size:
+            cleaned = [self.preprocessing(text) for text in normalized]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker,
+                initargs=(self.lemma_cache_size,),
+            ) as executor:
+                cleaned = [
+                    text
+                    for chunk in executor.map(
+                        _preprocess_chunk,
+                        iter_chunks(normalized, self.chunk_size),
+                    )
+                    for text in chunk
+                ]
+        self.summarize_long(cleaned)
+        return pd.Series(cleaned, index=texts.index, dtype=object)
+
+    @staticmethod
+    def normalize(texts: pd.Series) -> pd.Series:
+        """
+        Removes user tags and everything but letters, replaced by a single
+        space, and lowers `texts`.
+        """
+        return (
+            texts.fillna("")
+            .astype(str)
+            .str.replace(USERNAME_PATTERN, "", regex=True)
+            .str.replace(NON_LETTERS_PATTERN, " ", regex=True)
+            .str.lower()
+            .str.replace(CONTRACTIONS_PATTERN, r"\1 ", regex=True)
+        )
+
+    def preprocessing(self, text: str) -> str:
+        """
+        Removes stopwords from a normalized text and lemmatizes it.
+        """
+        list_tokens = self.remove_stopwords(text.split())
+        list_tokens = self.lemmatize(list_tokens)
+        return " ".join(list_tokens)
+
+    def tokenize(self, text: str, return_as_str: bool = False) -> Any:
+        """
+        Applies the word tokenizer of nltk, e.g. to raw texts.
+        """
+        res = nltk.tokenize.word_tokenize(text)
+        if return_as_str:
+            return " ".join(res)
+        return res
+
+    def remove_stopwords(self, list_tokens: list[str]) -> list[str]:
+        return [w for w in list_tokens if w not in self.list_stopwords]
+
+    def lemmatize(self, list_tokens: list[str]) -> list[str]:
+        """
+        Converts word tokens to their base forms, e.g. "tokens" to "token".
+        """
+        return [self._lemmatize_word(w) for w in list_tokens]
+
+    def summarize_long(self, texts: list[str], n: int = 20) -> None:
+        """
+        Summarizes in place the cleaned texts of `max_tokens` tokens or more,
+        parsing them together in batches.
+        """
+        long_indices = [
+            i
+            for i, text in enumerate(texts)
+            if len(text.split()) >= self.max_tokens
+        ]
+        if not long_indices:
+            return
+        docs = self.nlp.pipe(
+            (texts[i] for i in long_indices),
+            batch_size=self.summary_batch_size,
+        )
+        for i, doc in zip(long_indices, docs):
+            texts[i] = self._summarize_doc(doc, n)
+
+    def summarize(self, text: str, n: int = 20) -> str:
+        """
+        Summarizes a text into its `n` longest sentences at most, fewer if
+        they exceed `max_tokens` tokens.
+        """
+        return self._summarize_doc(self.nlp(text), n)
+
+    def _summarize_doc(self, doc: Any, n: int) -> str:
+        sentences = [sent.text for sent in doc.sents]
+        sentences.sort(key=lambda x: len(x.split()), reverse=True)
+        while True:
+            summary = " ".join(sentences[:n])
+            if len(summary.split()) <= self.max_tokens:
+                return summary
+            n -= 1
@@ -0,0 +1,108 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import sys
+
+from classify import evaluate_dense_baseline, train_and_evaluate
+from classify.streaming import ESTIMATORS, FEATURES
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Train and evaluate a sentiment classifier on review "
+        "texts streamed from a CSV file, with sparse hashed features",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "input",
+        type=str,
+        help="Path to reviews CSV file with texts and sentiment labels",
+    )
+    arg_parser.add_argument(
+        "--text-field",
+        type=str,
+        help="Column of the texts to classify",
+        default="review_text_cleaned",
+    )
+    arg_parser.add_argument(
+        "--label-field",
+        type=str,
+        help="Column of the labels to learn, e.g. from score_sentiment.py",
+        default="review_text_sentiment",
+    )
+    arg_parser.add_argument(
+        "--estimator",
+        choices=ESTIMATORS,
+        default="nb",
+        help="Multinomial naive Bayes or a logistic regression trained by "
+        "stochastic gradient descent",
+    )
+    arg_parser.add_argument(
+        "--features",
+        choices=FEATURES,
+        default="counts",
+        help="Term counts, or TF-IDF weights at the cost of one more pass "
+        "over the file",
+    )
+    arg_parser.add_argument(
+        "--n-features",
+        type=int,
+        help="Number of hashed features",
+        default=2**20,
+    )
+    arg_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Number of rows read at once",
+        default=10000,
+    )
+    arg_parser.add_argument(
+        "--test-size",
+        type=float,
+        help="Share of the rows held out for testing",
+        default=0.2,
+    )
+    arg_parser.add_argument(
+        "--baseline-rows",
+        type=int,
+        help="Number of rows the dense baseline of the notebook is compared "
+        "on, 0 to skip it, all if negative",
+        default=20000,
+    )
+    args = arg_parser.parse_args()
+
+    input_filename: str = args.input
+    print(f"Reading from {input_filename}", file=sys.stderr)
+
+    evaluation = train_and_evaluate(
+        input_filename,
+        args.text_field,
+        args.label_field,
+        estimator=args.estimator,
+        features=args.features,
+        n_features=args.n_features,
+        chunk_size=args.chunk_size,
+        test_size=args.test_size,
+    )
+    evaluations = [evaluation]
+    if args.baseline_rows:
+        # Run in a process of its own so that its peak memory is not
+        # mistaken for the streaming classifier's
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            evaluations.append(
+                executor.submit(
+                    evaluate_dense_baseline,
+                    input_filename,
+                    args.text_field,
+                    args.label_field,
+                    args.baseline_rows if args.baseline_rows > 0 else None,
+                    args.test_size,
+                ).result()
+            )
+
+    for evaluation in evaluations:
+        print(evaluation.summary())
+        print(evaluation.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import time
+
+from dataset import iter_reviews
+from stats import CorpusStats
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Add word frequencies and length histograms of reviews "
+        "to a corpus statistics store, per hotel and month of review",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "input",
+        type=str,
+        help="Path to reviews file, CSV or Parquet, e.g. a new batch of "
+        "reviews",
+    )
+    arg_parser.add_argument(
+        "--store",
+        type=str,
+        help="Path to the corpus statistics store, created if missing",
+        default="output/corpus.stats",
+    )
+    arg_parser.add_argument(
+        "--fields",
+        nargs="+",
+        help="Text columns to count, e.g. review_text_cleaned from "
+        "clean_reviews.py",
+        default=["review_text_cleaned"],
+    )
+    arg_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Number of reviews read at once",
+        default=100000,
+    )
+    arg_parser.add_argument(
+        "--top",
+        type=int,
+        help="Number of most common words of the whole store to print "
+        "afterwards",
+        default=10,
+    )
+    args = arg_parser.parse_args()
+
+    input_filename: str = args.input
+    fields: list[str] = args.fields
+
+    print(f"Reading from {input_filename}", file=sys.stderr)
+    print(f"Updating {args.store}", file=sys.stderr)
+
+    # Chunks already added from this file, e.g. by an interrupted run, are
+    # skipped as long as the chunk size stays the same
+    source = os.path.abspath(input_filename)
+    reviews: int = 0
+    skipped_reviews: int = 0
+    started = time.perf_counter()
+    with CorpusStats(args.store) as store:
+        for chunk in iter_reviews(input_filename, args.chunk_size):
+            applied = [
+                store.update(chunk, field, source=source) for field in fields
+            ]
+            if any(applied):
+                reviews += len(chunk)
+            else:
+                skipped_reviews += len(chunk)
+        print(
+            f"Added {reviews} review(s) in "
+            f"{time.perf_counter() - started:.1f}s",
+            file=sys.stderr,
+        )
+        if skipped_reviews:
+            print(
+                f"Skipped {skipped_reviews} review(s) added before",
+                file=sys.stderr,
+            )
+        for field in fields:
+            print(f"Most common words of {field}:")
+            for word, count in store.most_common(args.top, field):
+                print(f"{word}\t{count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+from benchmark.report import BenchmarkReport, StageResult
+from benchmark.server import FixtureServer
@@ -0,0 +1,180 @@
+from dataclasses import asdict, dataclass, field
+import json
+import os
+import resource
+import subprocess
+import threading
+from types import TracebackType
+from typing import Any, Self, TextIO
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Linearly interpolated percentile, `q` being in [0, 100].
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_process_tree_rss(root_pid: int) -> int:
+    """
+    Resident set size in bytes of `root_pid` and all its live descendants,
+    e.g. the Playwright driver and every Chromium process, read from
+    `/proc`. Pages shared between processes are counted once per process.
+    Returns 0 where `/proc` is not available.
+    """
+    parents: dict[int, int] = {}
+    rss: dict[int, int] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            # Exited in the meantime
+            continue
+        # The command name may hold spaces, so fields are counted after it
+        fields = stat[stat.rfind(")") + 2 :].split()
+        pid = int(entry)
+        parents[pid] = int(fields[1])
+        rss[pid] = int(fields[21]) * PAGE_SIZE
+
+    children: dict[int, list[int]] = {}
+    for pid, parent in parents.items():
+        children.setdefault(parent, []).append(pid)
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, ()))
+    return total
+
+
+class RssSampler:
+    """
+    Samples the RSS of this process and its descendants every `interval`
+    seconds on a background thread while entered, keeping the peak in MB.
+    """
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self.peak_mb = 0.0
+
+    def _sample(self) -> None:
+        pid = os.getpid()
+        while True:
+            self.peak_mb = max(
+                self.peak_mb, get_process_tree_rss(pid) / 1024 / 1024
+            )
+            if self._stopped.wait(self._interval):
+                return
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self._stopped.set()
+        self._thread.join()
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+@dataclass
+class StageResult:
+    name: str
+    items: int = 0
+    pages: int = 0
+    elapsed: float = 0.0
+    page_latencies: list[float] = field(default_factory=list)
+    # Of the crawler and browser processes together
+    peak_rss_mb: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "items": self.items,
+            "pages": self.pages,
+            "elapsed_s": round(self.elapsed, 3),
+            "items_per_s": round(self.throughput, 3),
+            "p50_page_s": round(percentile(self.page_latencies, 50), 3),
+            "p95_page_s": round(percentile(self.page_latencies, 95), 3),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+@dataclass
+class BenchmarkReport:
+    commit: str
+    options: dict[str, Any]
+    stages: list[StageResult] = field(default_factory=list)
+    # Of the Python process alone, over the whole run
+    peak_rss_mb: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        report = asdict(self)
+        report["stages"] = {
+            stage.name: stage.summary() for stage in self.stages
+        }
+        return report
+
+    def write_json_line(self, f: TextIO) -> None:
+        f.write(json.dumps(self.to_dict()) + "\n")
+
+    def print_table(self, f: TextIO) -> None:
+        print(
+            f"{'stage':<10}{'items':>8}{'items/s':>10}"
+            f"{'p50 (s)':>10}{'p95 (s)':>10}{'RSS (MB)':>10}",
+            file=f,
+        )
+        for stage in self.stages:
+            summary = stage.summary()
+            print(
+                f"{stage.name:<10}{summary['items']:>8}"
+                f"{summary['items_per_s']:>10.2f}"
+                f"{summary['p50_page_s']:>10.3f}"
+                f"{summary['p95_page_s']:>10.3f}"
+                f"{summary['peak_rss_mb']:>10.1f}",
+                file=f,
+            )
+        print(f"peak RSS: {self.peak_rss_mb:.1f} MB (python)", file=f)
@@ -0,0 +1,71 @@
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Self
+from urllib.parse import urlsplit
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves `<path>.html` from the snapshot directory for any request to
+    `<path>`, ignoring the query string, so saved pages keep the URLs they
+    were captured from.
+    """
+
+    def translate_path(self, path: str) -> str:
+        url_path = urlsplit(path).path.rstrip("/") or "/index"
+        return super().translate_path(url_path) + ".html"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class FixtureServer:
+    """
+    Local HTTP server for saved page snapshots, running on a background
+    thread. Binds to a free port unless `port` is given.
+    """
+
+    _server: ThreadingHTTPServer
+    _thread: threading.Thread
+
+    def __init__(self, directory: str, port: int = 0) -> None:
+        directory = os.path.abspath(directory)
+
+        def handler(*args: Any) -> FixtureRequestHandler:
+            return FixtureRequestHandler(*args, directory=directory)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def origin(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def to_local_url(self, url: str, stage: str = "") -> str:
+        """
+        Maps a Google Travel URL onto this server, optionally under a stage
+        prefix when a page is saved once per stage of the crawl.
+        """
+        parts = urlsplit(url)
+        prefix = f"/{stage}" if stage else ""
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.origin}{prefix}{parts.path}{query}"
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,72 @@
+import argparse
+import sys
+from playwright.sync_api import sync_playwright
+
+from crawl.daemon import BrowserDaemon
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Keep a warm browser running for the crawl scripts to "
+        "attach to with --cdp-endpoint, instead of launching their own",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "--port",
+        type=int,
+        help="Remote debugging port scripts connect to",
+        default=9222,
+    )
+    arg_parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to run browser in headless mode",
+    )
+    arg_parser.add_argument(
+        "--recycle-after",
+        type=int,
+        help="Number of page loads after which the browser is restarted "
+        "with a fresh profile, once no script has a page open",
+        default=500,
+    )
+    arg_parser.add_argument(
+        "--page-idle-timeout",
+        type=float,
+        help="Seconds after which a page that loaded nothing is closed, "
+        "e.g. one left open by a script that crashed",
+        default=600,
+    )
+    arg_parser.add_argument(
+        "--warm-url",
+        type=str,
+        help="URL loaded when the browser starts, to warm up its cache and "
+        "connections",
+        default="https://google.com/travel/hotels?hl=en",
+    )
+    arg_parser.add_argument(
+        "--pool-size",
+        type=int,
+        help="Number of blank pages kept open for scripts to claim instead "
+        "of opening their own",
+        default=4,
+    )
+    args = arg_parser.parse_args()
+
+    daemon = BrowserDaemon(
+        port=args.port,
+        is_headless=args.headless,
+        recycle_after=args.recycle_after,
+        page_idle_timeout=args.page_idle_timeout,
+        warm_url=args.warm_url or None,
+        pool_size=args.pool_size,
+    )
+    with sync_playwright() as p:
+        try:
+            daemon.run(p)
+        except KeyboardInterrupt:
+            print("Stopping", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
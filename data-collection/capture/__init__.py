@@ -0,0 +1,4 @@
+from capture.capture import ResponseCapture
+from capture.decode import decode_payload
+from capture.hotel import get_hotel_urls_from_payload
+from capture.review import get_reviews_from_payload
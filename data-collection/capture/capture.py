@@ -0,0 +1,44 @@
+from typing import Any, Protocol
+
+
+class CapturedResponse(Protocol):
+    @property
+    def url(self) -> str: ...
+
+    @property
+    def request(self) -> Any: ...
+
+
+class ResponseCapture:
+    """
+    Collects the responses a page fetches its data from. Meant to be
+    registered with `page.on("response", capture.on_response)`; bodies are
+    read later by the caller, with the sync or async API as appropriate.
+    """
+
+    DATA_URL_PATTERNS: list[str] = [
+        "/batchexecute",
+    ]
+
+    _responses: list[Any]
+
+    def __init__(self) -> None:
+        self._responses = []
+
+    @staticmethod
+    def is_document(response: CapturedResponse) -> bool:
+        return response.request.resource_type == "document"
+
+    def is_data_response(self, response: CapturedResponse) -> bool:
+        return self.is_document(response) or any(
+            pattern in response.url for pattern in self.DATA_URL_PATTERNS
+        )
+
+    def on_response(self, response: CapturedResponse) -> None:
+        if self.is_data_response(response):
+            self._responses.append(response)
+
+    def drain(self) -> list[Any]:
+        responses = self._responses
+        self._responses = []
+        return responses
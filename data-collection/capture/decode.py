@@ -0,0 +1,82 @@
+import json
+import re
+from typing import Any, Iterator
+
+# Google prefixes JSON responses with this line to prevent JSON hijacking
+XSSI_PREFIX = ")]}'"
+
+# Data embedded in the initial HTML document, e.g.
+# AF_initDataCallback({key: 'ds:0', hash: '1', data:[...], sideChannel: {}});
+INIT_DATA_PATTERN = re.compile(
+    r"AF_initDataCallback\(\{key: '[^']*',.*?data:(.*?), "
+    r"sideChannel: \{\}\}\);",
+    re.DOTALL,
+)
+
+
+def decode_batchexecute(text: str) -> list[Any]:
+    """
+    Decodes a `batchexecute` response into the payloads of its RPC results.
+    Every chunk of the response is a JSON envelope on its own line, where each
+    `wrb.fr` entry carries its payload as a JSON-encoded string.
+    """
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX) :]
+
+    payloads: list[Any] = []
+    for line in text.splitlines():
+        if not line.startswith("["):
+            continue
+        try:
+            envelope = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        for entry in envelope:
+            if (
+                isinstance(entry, list)
+                and len(entry) > 2
+                and entry[0] == "wrb.fr"
+                and isinstance(entry[2], str)
+            ):
+                try:
+                    payloads.append(json.loads(entry[2]))
+                except json.JSONDecodeError:
+                    continue
+    return payloads
+
+
+def decode_init_data(html: str) -> list[Any]:
+    payloads: list[Any] = []
+    for match in INIT_DATA_PATTERN.finditer(html):
+        try:
+            payloads.append(json.loads(match.group(1)))
+        except json.JSONDecodeError:
+            continue
+    return payloads
+
+
+def decode_payload(text: str, is_document: bool) -> list[Any]:
+    if is_document:
+        return decode_init_data(text)
+    return decode_batchexecute(text)
+
+
+def iter_lists(tree: Any) -> Iterator[list[Any]]:
+    """
+    Yields every list nested in `tree`, depth first, including `tree` itself.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            yield node
+            stack.extend(reversed(node))
+
+
+def iter_strings(tree: Any) -> Iterator[str]:
+    for node in iter_lists(tree):
+        for item in node:
+            if isinstance(item, str):
+                yield item
+    if isinstance(tree, str):
+        yield tree
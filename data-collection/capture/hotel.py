@@ -0,0 +1,23 @@
+import re
+from typing import Any
+
+from capture.decode import iter_strings
+
+# Links to hotel details pages, either relative or absolute
+HOTEL_URL_PATTERN = re.compile(
+    r"^(?:https://(?:www\.)?google\.com)?/travel/hotels/(?:entity/)?[^?\s]+"
+)
+
+
+def get_hotel_urls_from_payload(payload: Any) -> list[str]:
+    urls: list[str] = []
+    for value in iter_strings(payload):
+        match = HOTEL_URL_PATTERN.match(value)
+        if not match:
+            continue
+        href = value
+        if href.startswith("/"):
+            href = "https://google.com" + href
+        if href not in urls:
+            urls.append(href)
+    return urls
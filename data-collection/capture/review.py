@@ -0,0 +1,146 @@
+import datetime
+import re
+from typing import Any
+
+from capture.decode import iter_lists, iter_strings
+from review import Review
+
+# The review payloads are matched on the shape of their values rather than on
+# positions, which Google changes more often than the value types:
+# a review is a list holding a timestamp in epoch seconds (bare or as a
+# [seconds, nanos] pair), a 1-5 integer rating and, unless only rated, its text
+MIN_EPOCH_SECONDS = 946684800  # 2000-01-01
+MAX_EPOCH_SECONDS = 4102444800  # 2100-01-01
+MIN_RATING, MAX_RATING = 1, 5
+
+TRIP_TYPES = {"Business", "Vacation"}
+TRIP_COMPANIONS = {"Family", "Friends", "Couple", "Solo"}
+# Like the DOM engine, only reviews made on Google itself are kept, rather
+# than those relayed from other providers
+GOOGLE_SOURCE = "Google"
+
+# Strings of a review record that cannot be its text, e.g. the review id or
+# the language of the text
+IDENTIFIER_PATTERN = re.compile(r"^[\w-]{16,}$")
+LANGUAGE_PATTERN = re.compile(r"^[a-z]{2,3}(?:[-_][A-Za-z]{2,4})?$")
+
+
+def _is_epoch_seconds(value: Any) -> bool:
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and MIN_EPOCH_SECONDS <= value <= MAX_EPOCH_SECONDS
+    )
+
+
+def _find_timestamp(node: list[Any]) -> int | None:
+    for item in node:
+        if _is_epoch_seconds(item):
+            return item
+        if (
+            isinstance(item, list)
+            and 1 <= len(item) <= 2
+            and _is_epoch_seconds(item[0])
+        ):
+            return item[0]
+    return None
+
+
+def _find_rating(node: list[Any]) -> int | None:
+    for item in node:
+        if (
+            isinstance(item, int)
+            and not isinstance(item, bool)
+            and MIN_RATING <= item <= MAX_RATING
+        ):
+            return item
+    return None
+
+
+def _is_link(value: str) -> bool:
+    return "://" in value or value.startswith("/")
+
+
+def _is_text(value: Any) -> bool:
+    # Texts may be a single word, so they are told apart from the other
+    # strings of the record by what they are not
+    return (
+        isinstance(value, str)
+        and not _is_link(value)
+        and not IDENTIFIER_PATTERN.match(value)
+        and not LANGUAGE_PATTERN.match(value)
+        and value not in TRIP_TYPES
+        and value not in TRIP_COMPANIONS
+        and value != GOOGLE_SOURCE
+    )
+
+
+def _find_text(node: list[Any]) -> str:
+    # The review text is the longest string held by the record or one of its
+    # own lists, e.g. [text, language]. Lists holding links are the author's
+    # profile or the source's page, and deeper lists are owner replies
+    texts = [item for item in node if _is_text(item)]
+    for child in node:
+        if isinstance(child, list) and not any(
+            isinstance(item, str) and _is_link(item) for item in child
+        ):
+            texts.extend(item for item in child if _is_text(item))
+    # Reviews made of a rating alone have no text
+    return max(texts, key=len) if texts else ""
+
+
+def _is_review_node(node: list[Any]) -> bool:
+    # Longer than a [seconds, nanos] pair, whose nanos may pass for a rating
+    return (
+        len(node) > 2
+        and _find_timestamp(node) is not None
+        and _find_rating(node) is not None
+    )
+
+
+def get_review_from_node(node: list[Any], hotel_name: str) -> Review | None:
+    timestamp = _find_timestamp(node)
+    rating = _find_rating(node)
+    if timestamp is None or rating is None:
+        return None
+    strings = list(iter_strings(node))
+    if GOOGLE_SOURCE not in strings:
+        return None
+
+    r = Review(
+        hotel_name=hotel_name,
+        review_text=_find_text(node).strip(),
+        rating=float(rating),
+        review_timestamp=datetime.datetime.fromtimestamp(timestamp),
+    )
+    for detail in strings:
+        if detail in TRIP_TYPES:
+            r.trip_type = detail
+        elif detail in TRIP_COMPANIONS:
+            r.trip_companions = detail
+    return r
+
+
+def get_reviews_from_payload(payload: Any, hotel_name: str) -> list[Review]:
+    """
+    Returns the reviews made on Google found in `payload`, in order. A
+    review is the innermost list that looks like one, so the lists wrapping
+    a page of reviews are never taken for a review, even when they hold a
+    timestamp and a small integer of their own.
+    """
+    review_nodes = [
+        node for node in iter_lists(payload) if _is_review_node(node)
+    ]
+    review_node_ids = {id(node) for node in review_nodes}
+    reviews: list[Review] = []
+    for node in review_nodes:
+        if any(
+            id(child) in review_node_ids
+            for child in iter_lists(node)
+            if child is not node
+        ):
+            continue
+        review = get_review_from_node(node, hotel_name)
+        if review is not None:
+            reviews.append(review)
+    return reviews
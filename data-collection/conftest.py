@@ -0,0 +1,2 @@
+# Lets tests import the crawl scripts and their packages, as the scripts do
+# when run from this directory
@@ -0,0 +1,18 @@
+from crawl.background import BackgroundWriter
+from crawl.browser import (
+    DEFAULT_CDP_ENDPOINT,
+    POOL_URL,
+    new_page,
+    new_page_async,
+    open_browser_context,
+    open_browser_context_async,
+)
+from crawl.frontier import HotelFrontier, get_hotel_key
+from crawl.journal import CrawlJournal
+from crawl.metrics import HotelProfiler, Metrics
+from crawl.rate import AimdController
+from crawl.resources import (
+    RESOURCE_PROFILES,
+    ResourcePolicy,
+    get_resource_policy,
+)
@@ -0,0 +1,150 @@
+from collections.abc import Sized
+import queue
+import threading
+import time
+from types import TracebackType
+from typing import Any, Callable, Generic, Protocol, Self, TypeVar
+
+T = TypeVar("T")
+T_contra = TypeVar("T_contra", contravariant=True)
+
+
+class Writer(Protocol[T_contra]):
+    def append(self, __record: T_contra) -> None: ...
+
+    def flush(self, fsync: bool = False) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class BackgroundWriter(Generic[T]):
+    """
+    Hands appended records to a wrapped writer on a background thread, so
+    the crawler never waits for the disk. The wrapped writer is flushed once
+    `flush_records` records are pending or `flush_interval` seconds after
+    the first unflushed one, whichever comes first, so a crash loses at most
+    one flush interval of data. At most `max_pending` appends are queued
+    before `append` blocks, pushing back on a crawler outrunning the disk.
+    """
+
+    _APPEND = "append"
+    _CALLBACK = "callback"
+    _FLUSH = "flush"
+    _CLOSE = "close"
+
+    def __init__(
+        self,
+        writer: Writer[T],
+        max_pending: int = 256,
+        flush_records: int = 1000,
+        flush_interval: float = 1.0,
+        fsync: bool = False,
+    ) -> None:
+        self._writer = writer
+        self._flush_records = flush_records
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._queue: queue.Queue[tuple[str, Any]] = queue.Queue(max_pending)
+        self._error: BaseException | None = None
+        self._is_closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="background-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Background writer failed") from self._error
+
+    def append(self, record: T) -> None:
+        self._raise_error()
+        self._queue.put((self._APPEND, record))
+
+    def after_flush(self, callback: Callable[[], None]) -> None:
+        self._raise_error()
+        self._queue.put((self._CALLBACK, callback))
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Blocks until every record appended so far has been flushed.
+        """
+        flushed = threading.Event()
+        self._queue.put((self._FLUSH, (flushed, fsync)))
+        flushed.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._is_closed:
+            return
+        self._queue.put((self._CLOSE, None))
+        self._thread.join()
+        self._writer.close()
+        self._is_closed = True
+        self._raise_error()
+
+    def _run(self) -> None:
+        pending_records = 0
+        pending_callbacks: list[Callable[[], None]] = []
+        deadline: float | None = None
+
+        def flush(fsync: bool) -> None:
+            nonlocal pending_records, pending_callbacks, deadline
+            if self._error is None:
+                try:
+                    self._writer.flush(fsync or self._fsync)
+                    for callback in pending_callbacks:
+                        callback()
+                except BaseException as e:
+                    self._error = e
+            pending_records = 0
+            pending_callbacks = []
+            deadline = None
+
+        while True:
+            timeout = (
+                None
+                if deadline is None
+                else max(deadline - time.monotonic(), 0)
+            )
+            try:
+                kind, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                flush(False)
+                continue
+
+            match kind:
+                case self._APPEND:
+                    if self._error is None:
+                        try:
+                            self._writer.append(payload)
+                        except BaseException as e:
+                            self._error = e
+                    pending_records += (
+                        len(payload) if isinstance(payload, Sized) else 1
+                    )
+                case self._CALLBACK:
+                    pending_callbacks.append(payload)
+                case self._FLUSH:
+                    flushed, fsync = payload
+                    flush(fsync)
+                    flushed.set()
+                    continue
+                case self._CLOSE:
+                    flush(False)
+                    return
+
+            if deadline is None:
+                deadline = time.monotonic() + self._flush_interval
+            if pending_records >= self._flush_records:
+                flush(False)
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
@@ -0,0 +1,106 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from playwright.async_api import (
+    BrowserContext as AsyncBrowserContext,
+    Page as AsyncPage,
+    Playwright as AsyncPlaywright,
+)
+from playwright.sync_api import BrowserContext, Error, Page, Playwright
+
+DEFAULT_CDP_ENDPOINT = "http://localhost:9222"
+# Blank pages the browser daemon keeps open for scripts to claim
+POOL_URL = "about:blank#pool"
+# Moves a pool page off the pool URL, which only one script can do, as the
+# page runs one script at a time
+CLAIM_PAGE_SCRIPT = f"""
+() => {{
+    if (location.href !== "{POOL_URL}") return false;
+    location.hash = "claimed";
+    return true;
+}}
+"""
+
+
+@contextmanager
+def open_browser_context(
+    p: Playwright, is_headless: bool, cdp_endpoint: str | None = None
+) -> Iterator[BrowserContext]:
+    """
+    Launches a new Chromium with a new context, or attaches to the warm
+    context of a running browser daemon (see `browser_daemon.py`) through
+    CDP when `cdp_endpoint` is given, in which case `is_headless` is up to
+    the daemon. Pages opened in the daemon's context must be closed by the
+    caller, as they outlive the connection.
+    """
+    if cdp_endpoint:
+        browser = p.chromium.connect_over_cdp(cdp_endpoint)
+        try:
+            # Only the default context of a browser is shared over CDP
+            yield browser.contexts[0]
+        finally:
+            # Disconnects, leaving the daemon's browser running
+            browser.close()
+        return
+
+    with (
+        p.chromium.launch(headless=is_headless, timeout=5000) as browser,
+        browser.new_context() as context,
+    ):
+        yield context
+
+
+@asynccontextmanager
+async def open_browser_context_async(
+    p: AsyncPlaywright, is_headless: bool, cdp_endpoint: str | None = None
+) -> AsyncIterator[AsyncBrowserContext]:
+    """
+    Same as `open_browser_context`, with the async API.
+    """
+    if cdp_endpoint:
+        browser = await p.chromium.connect_over_cdp(cdp_endpoint)
+        try:
+            yield browser.contexts[0]
+        finally:
+            await browser.close()
+        return
+
+    async with (
+        await p.chromium.launch(headless=is_headless) as browser,
+        await browser.new_context() as context,
+    ):
+        yield context
+
+
+def new_page(context: BrowserContext) -> Page:
+    """
+    Claims one of the blank pages kept open by the browser daemon, if any,
+    or opens a new page in `context`. Claimed pages are closed by the
+    caller like any other, never returned to the pool, so that no route or
+    handler of theirs outlives the script.
+    """
+    for page in context.pages:
+        if page.url != POOL_URL:
+            continue
+        try:
+            if page.evaluate(CLAIM_PAGE_SCRIPT):
+                return page
+        except Error:
+            # Closed or recycled in the meantime
+            continue
+    return context.new_page()
+
+
+async def new_page_async(context: AsyncBrowserContext) -> AsyncPage:
+    """
+    Same as `new_page`, with the async API.
+    """
+    for page in context.pages:
+        if page.url != POOL_URL:
+            continue
+        try:
+            if await page.evaluate(CLAIM_PAGE_SCRIPT):
+                return page
+        except Error:
+            continue
+    return await context.new_page()
@@ -0,0 +1,122 @@
+import sys
+import tempfile
+import time
+
+from playwright.sync_api import BrowserContext, Page, Playwright
+
+from crawl.browser import POOL_URL
+
+
+class BrowserDaemon:
+    """
+    Keeps a Chromium running with a warm default context, i.e. its cookies,
+    HTTP cache and open connections, that crawl scripts attach to over CDP
+    instead of launching a browser of their own.
+    The browser is recycled, with a fresh profile, once `recycle_after` pages
+    have been loaded and no script has a page open, keeping memory bounded.
+    Pages left open by scripts that died are closed after `page_idle_timeout`
+    seconds without sending any request.
+    Up to `pool_size` blank pages are kept open at `POOL_URL` for scripts to
+    claim with `new_page` rather than waiting for a new one, and are neither
+    counted as in use nor closed as idle until claimed.
+    """
+
+    def __init__(
+        self,
+        port: int = 9222,
+        is_headless: bool = True,
+        recycle_after: int = 500,
+        page_idle_timeout: float = 600,
+        warm_url: str | None = None,
+        pool_size: int = 4,
+    ) -> None:
+        self._port = port
+        self._is_headless = is_headless
+        self._recycle_after = recycle_after
+        self._page_idle_timeout = page_idle_timeout
+        self._warm_url = warm_url
+        self._pool_size = pool_size
+        self._page_loads = 0
+        self._last_activity: dict[Page, float] = {}
+        self._pool: set[Page] = set()
+
+    def _on_page(self, page: Page) -> None:
+        self._last_activity[page] = time.monotonic()
+        page.on("load", self._on_load)
+        page.on("request", lambda _: self._on_request(page))
+        page.on("close", self._on_close)
+
+    def _on_load(self, page: Page) -> None:
+        if page not in self._pool:
+            self._page_loads += 1
+
+    def _on_request(self, page: Page) -> None:
+        # Scrolling through reviews fetches data without loading a page
+        if page in self._last_activity:
+            self._last_activity[page] = time.monotonic()
+
+    def _on_close(self, page: Page) -> None:
+        self._last_activity.pop(page, None)
+        self._pool.discard(page)
+
+    def _fill_pool(self, context: BrowserContext) -> None:
+        # Claimed pages have left the pool URL, and are in use from then on
+        for page in list(self._pool):
+            if page.url != POOL_URL:
+                self._pool.discard(page)
+                self._last_activity[page] = time.monotonic()
+        while len(self._pool) < self._pool_size:
+            page = context.new_page()
+            self._last_activity.pop(page, None)
+            self._pool.add(page)
+            page.goto(POOL_URL)
+
+    def _close_idle_pages(self) -> None:
+        now = time.monotonic()
+        for page, last_activity in list(self._last_activity.items()):
+            if now - last_activity >= self._page_idle_timeout:
+                print(f"Closing idle page {page.url}", file=sys.stderr)
+                page.close()
+
+    def _serve(self, context: BrowserContext) -> None:
+        # The daemon's own page keeps the browser alive between scripts and
+        # drives the event loop, which only runs while Playwright is called
+        daemon_page = (
+            context.pages[0] if context.pages else context.new_page()
+        )
+        if self._warm_url:
+            daemon_page.goto(self._warm_url)
+        context.on("page", self._on_page)
+
+        while (
+            self._page_loads < self._recycle_after or self._last_activity
+        ):
+            self._fill_pool(context)
+            daemon_page.wait_for_timeout(1000)
+            self._close_idle_pages()
+
+    def run(self, p: Playwright) -> None:
+        while True:
+            with tempfile.TemporaryDirectory() as user_data_dir:
+                # Pages opened over CDP land in the default context, which
+                # Playwright only exposes for persistent contexts
+                context = p.chromium.launch_persistent_context(
+                    user_data_dir,
+                    headless=self._is_headless,
+                    args=[f"--remote-debugging-port={self._port}"],
+                )
+                print(
+                    f"Listening on http://localhost:{self._port}",
+                    file=sys.stderr,
+                )
+                try:
+                    self._serve(context)
+                finally:
+                    context.close()
+            print(
+                f"Recycling browser after {self._page_loads} page loads",
+                file=sys.stderr,
+            )
+            self._page_loads = 0
+            self._last_activity.clear()
+            self._pool.clear()
@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from types import TracebackType
+from typing import Iterable, Self
+from urllib.parse import urlsplit
+
+ENTITY_PATH_SEGMENT = "/entity/"
+
+
+def get_hotel_key(url: str) -> str:
+    """
+    Returns the entity id of a hotel URL, e.g. `ChcIx...` in
+    `/travel/hotels/Hanoi/entity/ChcIx...?q=...`, which stays the same
+    whatever the search that led to the hotel, unlike the query string or
+    the displayed name. URLs without an entity id are keyed on their path.
+    """
+    path = urlsplit(url).path
+    pos = path.find(ENTITY_PATH_SEGMENT)
+    if pos >= 0:
+        return path[pos + len(ENTITY_PATH_SEGMENT) :].split("/")[0]
+    return path.rstrip("/")
+
+
+class HotelFrontier:
+    """
+    On-disk index of every hotel found by hotel list crawls, keyed on
+    `get_hotel_key`, so that repeated sweeps of the same locations can tell
+    new hotels from ones seen by earlier runs. Hotels are only marked done
+    once written or crawled, so that one whose crawl failed is found again.
+    """
+
+    _connection: sqlite3.Connection
+
+    def __init__(self, file_path: str) -> None:
+        self._connection = sqlite3.connect(file_path, timeout=30)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS hotels (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                location TEXT NOT NULL,
+                first_seen_at REAL NOT NULL,
+                last_seen_at REAL NOT NULL,
+                done_at REAL
+            ) WITHOUT ROWID;
+            """
+        )
+        columns = {
+            row[1]
+            for row in self._connection.execute("PRAGMA table_info(hotels)")
+        }
+        if "done_at" not in columns:
+            # Frontiers of earlier versions, whose hotels were recorded once
+            # found, are taken as done
+            self._connection.executescript(
+                """
+                ALTER TABLE hotels ADD COLUMN done_at REAL;
+                UPDATE hotels SET done_at = last_seen_at;
+                """
+            )
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def get_done_keys(self) -> set[str]:
+        return {
+            row[0]
+            for row in self._connection.execute(
+                "SELECT key FROM hotels WHERE done_at IS NOT NULL"
+            )
+        }
+
+    def add(self, url: str, location: str) -> bool:
+        """
+        Records the hotel at `url` as seen now. Returns whether it is new.
+        """
+        now = time.time()
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO hotels "
+                "(key, url, location, first_seen_at, last_seen_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO NOTHING",
+                (get_hotel_key(url), url, location, now, now),
+            )
+            if cursor.rowcount:
+                return True
+            self._connection.execute(
+                "UPDATE hotels SET last_seen_at = ? WHERE key = ?",
+                (now, get_hotel_key(url)),
+            )
+        return False
+
+    def mark_done(self, urls: Iterable[str]) -> None:
+        """
+        Marks the hotels at `urls`, found before, as written or crawled.
+        """
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE hotels SET done_at = ? WHERE key = ?",
+                ((now, get_hotel_key(url)) for url in urls),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
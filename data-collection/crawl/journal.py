@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+import time
+from types import TracebackType
+from typing import Self
+
+
+class CrawlJournal:
+    """
+    On-disk record of crawl progress, so an interrupted crawl can resume
+    where it stopped instead of starting over. It keeps which hotel URLs are
+    finished and, for each hotel, how many review panels have been written
+    so far and how many reviews they held. Reviews are identified by their
+    position in the hotel's review list, as distinct reviews may well share
+    their text, rating and trip details, e.g. ratings without any text.
+    """
+
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, file_path: str) -> None:
+        # Shard processes may share a journal, so wait for their locks.
+        # Background writers record progress from their own thread, hence the
+        # connection is shared across threads behind a lock
+        self._connection = sqlite3.connect(
+            file_path, timeout=30, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS hotels (
+                url TEXT PRIMARY KEY,
+                finished INTEGER NOT NULL DEFAULT 0,
+                review_cursor INTEGER NOT NULL DEFAULT 0,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def _touch(self, url: str) -> None:
+        self._connection.execute(
+            "INSERT INTO hotels (url, updated_at) VALUES (?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET updated_at = excluded.updated_at",
+            (url, time.time()),
+        )
+
+    def is_finished(self, url: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT finished FROM hotels WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None and bool(row[0])
+
+    def get_review_cursor(self, url: str) -> tuple[int, int]:
+        """
+        Returns how many review panels of the hotel at `url` have been
+        written, and how many reviews they held, or zeros if none.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT review_cursor, review_count FROM hotels WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else (0, 0)
+
+    def record_reviews(self, url: str, cursor: int, count: int) -> None:
+        """
+        Records that the first `cursor` review panels of the hotel at `url`,
+        holding `count` reviews, have been written. Both only ever move
+        forward, so recording the same progress twice is harmless.
+        """
+        with self._lock, self._connection:
+            self._touch(url)
+            self._connection.execute(
+                "UPDATE hotels SET review_cursor = MAX(review_cursor, ?), "
+                "review_count = MAX(review_count, ?) WHERE url = ?",
+                (cursor, count, url),
+            )
+
+    def mark_finished(self, url: str) -> None:
+        with self._lock, self._connection:
+            self._touch(url)
+            self._connection.execute(
+                "UPDATE hotels SET finished = 1 WHERE url = ?", (url,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
@@ -0,0 +1,212 @@
+import bisect
+import cProfile
+from contextlib import contextmanager
+import json
+import os
+import sys
+import threading
+import time
+from typing import Iterator, TextIO
+
+# Upper bounds in seconds, from a single locator call to a full hotel
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One more slot for observations above the last bound (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Counters and per-phase latency histograms of a crawl, e.g. how long
+    `goto`, tab clicks, scrolling, extraction or writes take. They can be
+    exported as a Prometheus textfile or appended as JSON lines.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "crawl",
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self._prefix = prefix
+        self._buckets = buckets
+        self._counters: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            if phase not in self._histograms:
+                self._histograms[phase] = Histogram(self._buckets)
+            self._histograms[phase].observe(seconds)
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """
+        Times the enclosed block as `phase`, counting it as a phase error if
+        it raises. Works around `await` expressions as well.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{phase}_errors")
+            raise
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                metric = f"{self._prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            metric = f"{self._prefix}_phase_seconds"
+            if self._histograms:
+                lines.append(f"# TYPE {metric} histogram")
+            for phase, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{phase="{phase}",le="{bound}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(f'{metric}_sum{{phase="{phase}"}} {histogram.sum}')
+                lines.append(
+                    f'{metric}_count{{phase="{phase}"}} {histogram.count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        with self._lock:
+            return json.dumps(
+                {
+                    "timestamp": time.time(),
+                    "counters": self._counters,
+                    "phases": {
+                        phase: {
+                            "count": histogram.count,
+                            "sum": histogram.sum,
+                            "buckets": dict(
+                                zip(
+                                    [str(b) for b in histogram.buckets]
+                                    + ["+Inf"],
+                                    histogram.counts,
+                                )
+                            ),
+                        }
+                        for phase, histogram in self._histograms.items()
+                    },
+                }
+            )
+
+    def export(self, file_path: str, file_format: str = "prometheus") -> None:
+        """
+        Writes the current metrics to `file_path`. Prometheus textfiles are
+        replaced atomically, as the node exporter may read them at any time,
+        while JSON lines are appended as one snapshot per call.
+        """
+        if file_format == "jsonl":
+            with open(file_path, "a", encoding="utf-8") as f:
+                f.write(self.to_json() + "\n")
+            return
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, file_path)
+
+    def print_summary(self, f: TextIO = sys.stderr) -> None:
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                print(f"{name:<32}{value:>16g}", file=f)
+            for phase, histogram in sorted(self._histograms.items()):
+                mean = histogram.sum / histogram.count if histogram.count else 0
+                print(
+                    f"{phase:<16}{histogram.count:>8} x {mean:8.3f}s "
+                    f"= {histogram.sum:10.3f}s",
+                    file=f,
+                )
+
+
+class HotelProfiler:
+    """
+    Profiles the crawl of single hotels into `<directory>/<name>.prof` with
+    cProfile, or `<name>.html` with pyinstrument if chosen and installed.
+    """
+
+    def __init__(self, directory: str, backend: str = "cprofile") -> None:
+        self._directory = directory
+        self._backend = backend
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        # Only one profiler can be active per thread, so hotels crawled
+        # concurrently are left out while another one is being profiled
+        if not self._lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            if self._backend == "pyinstrument":
+                yield from self._profile_pyinstrument(name)
+            else:
+                yield from self._profile_cprofile(name)
+        finally:
+            self._lock.release()
+
+    def _profile_cprofile(self, name: str) -> Iterator[None]:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(self._directory, f"{name}.prof"))
+
+    def _profile_pyinstrument(self, name: str) -> Iterator[None]:
+        # Optional dependency, only needed for this backend
+        from pyinstrument import Profiler
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(
+                os.path.join(self._directory, f"{name}.html"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(profiler.output_html())
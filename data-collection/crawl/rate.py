@@ -0,0 +1,138 @@
+import asyncio
+import random
+import sys
+import time
+
+SUCCESS = "success"
+# Timed out waiting for the page, a sign of an overloaded link or server
+TIMEOUT = "timeout"
+# Redirected to the CAPTCHA page, or answered with 429
+THROTTLED = "throttled"
+# Any other failure, e.g. an unexpected layout, which says nothing about load
+ERROR = "error"
+
+
+class ThrottledError(Exception):
+    pass
+
+
+def is_throttled(url: str, status: int | None = None) -> bool:
+    return "/sorry/" in url or status == 429
+
+
+class AimdController:
+    """
+    Limits the number of hotels crawled at once between `min_concurrency`
+    and `max_concurrency`, adjusting it with AIMD: the limit grows by
+    `increase` per limit's worth of successes, and is multiplied by
+    `decrease` on a timeout, a throttled request, or page loads getting
+    slower than `latency_tolerance` times the fastest one seen. Decreases
+    happen at most once per smoothed load latency, as failures of requests
+    in flight at the same time stem from the same congestion.
+    Throttling also pauses every crawl for a jittered, exponentially growing
+    backoff, starting at `backoff_base` seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        initial_concurrency: int | None = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3.0,
+        backoff_base: float = 5.0,
+        backoff_cap: float = 300.0,
+    ) -> None:
+        self._max_concurrency = max_concurrency
+        self._min_concurrency = min(min_concurrency, max_concurrency)
+        self._limit = float(initial_concurrency or self._min_concurrency)
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._backoff_base = backoff_base
+        self._backoff_cap = backoff_cap
+        self._in_flight = 0
+        self._throttled_in_row = 0
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._min_latency: float | None = None
+        self._smoothed_latency: float | None = None
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    # Woken up early only if the pause is extended
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), pause)
+                    except TimeoutError:
+                        pass
+                    continue
+                if self._in_flight < self.limit:
+                    break
+                await self._condition.wait()
+            self._in_flight += 1
+
+    async def release(self, outcome: str) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if outcome == SUCCESS:
+                self._throttled_in_row = 0
+                self._set_limit(
+                    self._limit + self._increase / max(self._limit, 1)
+                )
+            elif outcome == TIMEOUT:
+                self._back_off()
+            elif outcome == THROTTLED:
+                self._back_off()
+                self._throttled_in_row += 1
+                delay = random.uniform(
+                    0,
+                    min(
+                        self._backoff_cap,
+                        self._backoff_base * 2**self._throttled_in_row,
+                    ),
+                )
+                print(f"Throttled, pausing for {delay:.1f}s", file=sys.stderr)
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            self._condition.notify_all()
+
+    def observe_latency(self, seconds: float) -> None:
+        """
+        Records how long a page took to load, backing off when loads get
+        much slower than the fastest one, before they start timing out.
+        """
+        if self._min_latency is None or seconds < self._min_latency:
+            self._min_latency = seconds
+        if self._smoothed_latency is None:
+            self._smoothed_latency = seconds
+        else:
+            self._smoothed_latency = (
+                0.875 * self._smoothed_latency + 0.125 * seconds
+            )
+        if self._smoothed_latency > self._latency_tolerance * self._min_latency:
+            self._back_off()
+
+    def _back_off(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self._smoothed_latency or 0):
+            return
+        self._last_decrease = now
+        self._set_limit(self._limit * self._decrease)
+
+    def _set_limit(self, limit: float) -> None:
+        limit = min(max(limit, self._min_concurrency), self._max_concurrency)
+        if int(limit) != self.limit:
+            print(f"Crawling {int(limit)} hotel(s) at once", file=sys.stderr)
+        self._limit = limit
@@ -0,0 +1,155 @@
+from typing import Any
+from urllib.parse import urlsplit
+
+from crawl.metrics import Metrics
+
+# Hosts serving Google Travel itself, its scripts, data and hotel photos.
+# Anything else, e.g. ads or analytics, is third-party
+FIRST_PARTY_DOMAINS: tuple[str, ...] = (
+    "google.com",
+    "gstatic.com",
+    "googleapis.com",
+    "googleusercontent.com",
+    "ggpht.com",
+)
+
+RESOURCE_PROFILES: tuple[str, ...] = ("text-only", "details", "full")
+
+# Map tiles are plain images, fetched for the map next to the result list and
+# the hotel location, which no script reads
+MAP_TILE_URL_PATTERNS: tuple[str, ...] = ("/maps/vt", "/kh/v=", "/maps/api/")
+
+
+# Rough size of a response of each resource type, in bytes, for blocked
+# requests of types no response has been seen of yet, as aborted requests
+# never tell how large they would have been
+ESTIMATED_RESOURCE_BYTES: dict[str, int] = {
+    "image": 30_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+}
+ESTIMATED_OTHER_BYTES = 5_000
+
+
+def is_third_party(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return not any(
+        host == domain or host.endswith(f".{domain}")
+        for domain in FIRST_PARTY_DOMAINS
+    )
+
+
+class ResourcePolicy:
+    """
+    Aborts requests a crawl does not need through `context.route`, counting
+    blocked requests by resource type and loaded bytes into `metrics`, along
+    with the bytes saved by blocking. Blocked requests are counted at the
+    average length of the responses of their type loaded so far, if any,
+    otherwise at `ESTIMATED_RESOURCE_BYTES`.
+    `handle` returns what the route call returns, so it can be passed as a
+    route handler to both the sync and the async API, the latter awaiting it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        blocked_resource_types: frozenset[str] = frozenset(),
+        block_third_party: bool = False,
+        blocked_url_patterns: tuple[str, ...] = (),
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.name = name
+        self._blocked_resource_types = blocked_resource_types
+        self._block_third_party = block_third_party
+        self._blocked_url_patterns = blocked_url_patterns
+        self.metrics = metrics or Metrics()
+        # Total length and number of loaded responses by resource type
+        self._loaded_bytes: dict[str, tuple[int, int]] = {}
+
+    @property
+    def is_routed(self) -> bool:
+        # Routing keeps Chromium from serving requests from its cache, so a
+        # policy blocking nothing is better not installed at all
+        return bool(
+            self._blocked_resource_types
+            or self._block_third_party
+            or self._blocked_url_patterns
+        )
+
+    def is_blocked(self, url: str, resource_type: str) -> bool:
+        if resource_type == "document":
+            return False
+        return (
+            resource_type in self._blocked_resource_types
+            or (self._block_third_party and is_third_party(url))
+            or any(pattern in url for pattern in self._blocked_url_patterns)
+        )
+
+    def handle(self, route: Any) -> Any:
+        request = route.request
+        if self.is_blocked(request.url, request.resource_type):
+            self.metrics.increment("blocked_requests")
+            self.metrics.increment(f"blocked_{request.resource_type}_requests")
+            self.metrics.increment(
+                "blocked_bytes_estimated",
+                self.estimate_bytes(request.resource_type),
+            )
+            return route.abort()
+        return route.continue_()
+
+    def estimate_bytes(self, resource_type: str) -> int:
+        total, count = self._loaded_bytes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return ESTIMATED_RESOURCE_BYTES.get(
+            resource_type, ESTIMATED_OTHER_BYTES
+        )
+
+    def on_response(self, response: Any) -> None:
+        # Chunked responses carry no length and are left out of the count
+        content_length = response.headers.get("content-length")
+        self.metrics.increment("loaded_requests")
+        if content_length and content_length.isdigit():
+            self.metrics.increment("loaded_bytes", int(content_length))
+            resource_type = response.request.resource_type
+            total, count = self._loaded_bytes.get(resource_type, (0, 0))
+            self._loaded_bytes[resource_type] = (
+                total + int(content_length),
+                count + 1,
+            )
+
+
+def get_resource_policy(
+    profile: str, metrics: Metrics | None = None
+) -> ResourcePolicy:
+    """
+    Creates the policy of a named profile:
+    - `text-only` only loads what renders text: no images, media, fonts,
+      map tiles or third-party requests.
+    - `details` also loads images, leaving the photo gallery intact so that
+      its headings counted by `get_hotel_details` render as usual.
+    - `full` loads everything.
+    """
+    match profile:
+        case "text-only":
+            return ResourcePolicy(
+                profile,
+                frozenset({"image", "media", "font"}),
+                block_third_party=True,
+                blocked_url_patterns=MAP_TILE_URL_PATTERNS,
+                metrics=metrics,
+            )
+        case "details":
+            return ResourcePolicy(
+                profile,
+                frozenset({"media", "font"}),
+                block_third_party=True,
+                blocked_url_patterns=MAP_TILE_URL_PATTERNS,
+                metrics=metrics,
+            )
+        case "full":
+            return ResourcePolicy(profile, metrics=metrics)
+        case _:
+            raise ValueError(f"Unknown resource profile {profile}")
@@ -1,21 +1,48 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from functools import partial
+import json
+import os
+import shutil
 import sys
 import time
 import traceback
-from playwright.sync_api import sync_playwright, Page, expect
+from typing import Iterable
+from playwright.sync_api import (
+    sync_playwright,
+    expect,
+    Locator,
+    Page,
+    TimeoutError,
+)
 
+from crawl import (
+    DEFAULT_CDP_ENDPOINT,
+    RESOURCE_PROFILES,
+    CrawlJournal,
+    HotelProfiler,
+    Metrics,
+    get_resource_policy,
+    new_page,
+    open_browser_context,
+)
 from hotel import Hotel
+from hotel.writer import AbstractHotelWriter
+from hotel.writer.background import BackgroundHotelWriter
 from hotel.writer.csv import HotelCsvWriter
 
 
-def get_hotel_details(hotel_page: Page) -> Hotel:
-    hotel_name = hotel_page.get_by_role("heading").first.inner_text()
+# Fields of `Hotel` that can be selected, besides the always extracted name
+DETAIL_FIELDS: tuple[str, ...] = (
+    "address",
+    "popular_amenities",
+    "images_count",
+)
 
-    # About page
-    hotel_page.locator("#details>span").first.click()
-    # Sections in "About page"
-    hotel_info_articles = hotel_page.locator("section")
 
+def get_address(hotel_page: Page, hotel_info_articles: Locator) -> str:
     # About this hotel (usually the first article tag)
     about_panel = hotel_info_articles.filter(
         has=hotel_page.locator("h2.ZSxxwc:has-text('About this hotel')"),
@@ -27,8 +54,12 @@ def get_hotel_details(hotel_page: Page) -> Hotel:
 
     # First matching locator (nth=0): Address
     # Second one: Phone
-    hotel_address = address_contact_info.locator(".GtAk2e").nth(0).inner_text()
+    return address_contact_info.locator(".GtAk2e").nth(0).inner_text()
 
+
+def get_popular_amenities(
+    hotel_page: Page, hotel_info_articles: Locator
+) -> list[str]:
     # amenities_panel = hotel_info_articles.filter(has_text="Amenities").nth(0)
     amenities_panel = hotel_info_articles.filter(
         has=hotel_page.locator("h2.ZSxxwc:has-text('Amenities')"),
@@ -40,16 +71,22 @@ def get_hotel_details(hotel_page: Page) -> Hotel:
         popular_amenities_locator = amenities_panel.locator(".RhdAVb").nth(0)
         expect(popular_amenities_locator).to_be_visible(timeout=1000)
         popular_amenities_list = popular_amenities_locator.locator(".LtjZ2d")
-        popular_amenities = [span.inner_text() for span in popular_amenities_list.all()]
+        popular_amenities = [
+            span.inner_text() for span in popular_amenities_list.all()
+        ]
     except AssertionError as e:
         pass
     except TimeoutError as e:
         traceback.print_exc()
+    return popular_amenities
+
 
+def get_images_count(hotel_page: Page, metrics: Metrics) -> int:
     # Photos page
     photo_count: int = 0
     try:
-        hotel_page.locator("#photos>span").first.click()
+        with metrics.time("photos_tab"):
+            hotel_page.locator("#photos>span").first.click()
 
         try:
             images_by_owner = hotel_page.get_by_label("By owner").nth(0)
@@ -60,30 +97,339 @@ def get_hotel_details(hotel_page: Page) -> Hotel:
             pass
         else:
             photo_categories_locator = hotel_page.locator("h2.qUbkDc")
-            expect(photo_categories_locator.nth(0)).to_be_in_viewport()
-            hotel_page.keyboard.press("End", delay=200)
+            with metrics.time("scroll"):
+                expect(photo_categories_locator.nth(0)).to_be_in_viewport()
+                hotel_page.keyboard.press("End", delay=200)
 
             # Each category has the following format: CATEGORY (number_of_photos)
-            for heading in photo_categories_locator.all():
-                category_with_count = heading.inner_text()
-                open_pos = category_with_count.find("(")
-                close_pos = category_with_count.find(")")
-                category_photos_count_str = category_with_count[
-                    open_pos + 1 : close_pos
-                ]
-                photo_count += int(category_photos_count_str.replace(",", ""), base=10)
+            with metrics.time("extract_photos"):
+                for heading in photo_categories_locator.all():
+                    category_with_count = heading.inner_text()
+                    open_pos = category_with_count.find("(")
+                    close_pos = category_with_count.find(")")
+                    category_photos_count_str = category_with_count[
+                        open_pos + 1 : close_pos
+                    ]
+                    photo_count += int(
+                        category_photos_count_str.replace(",", ""), base=10
+                    )
     except AssertionError | TimeoutError as e:
         traceback.print_exc()
         pass
+    return photo_count
+
 
-    return Hotel(
+def get_hotel_details(
+    hotel_page: Page,
+    metrics: Metrics | None = None,
+    fields: tuple[str, ...] = DETAIL_FIELDS,
+) -> Hotel:
+    """
+    Extracts the name of the opened hotel and the requested `fields`. Tabs
+    holding none of them are never opened, e.g. address-only jobs skip the
+    photos tab and its scrolling altogether.
+    """
+    metrics = metrics or Metrics()
+    hotel = Hotel(
         source="Google",
-        name=hotel_name,
-        address=hotel_address,
-        images_count=photo_count,
-        popular_amenities=popular_amenities,
+        name=hotel_page.get_by_role("heading").first.inner_text(),
     )
 
+    if "address" in fields or "popular_amenities" in fields:
+        # About page
+        with metrics.time("details_tab"):
+            hotel_page.locator("#details>span").first.click()
+        # Sections in "About page"
+        hotel_info_articles = hotel_page.locator("section")
+
+        if "address" in fields:
+            with metrics.time("extract_address"):
+                hotel.address = get_address(hotel_page, hotel_info_articles)
+        if "popular_amenities" in fields:
+            with metrics.time("extract_amenities"):
+                hotel.popular_amenities = get_popular_amenities(
+                    hotel_page, hotel_info_articles
+                )
+
+    if "images_count" in fields:
+        hotel.images_count = get_images_count(hotel_page, metrics)
+
+    return hotel
+
+
+def open_writer(
+    output_filename: str,
+    output_format: str,
+    is_resumed: bool,
+    is_background: bool = True,
+    fsync: bool = False,
+) -> AbstractHotelWriter:
+    writer: AbstractHotelWriter
+    if output_format == "parquet":
+        # Imported here as pyarrow is only needed for Parquet output
+        from hotel.writer.parquet import HotelParquetWriter
+
+        writer = HotelParquetWriter(output_filename)
+    else:
+        writer = HotelCsvWriter(output_filename, "a" if is_resumed else "w")
+    if is_background:
+        return BackgroundHotelWriter(writer, fsync=fsync)
+    return writer
+
+
+def crawl_hotel_details(
+    links: Iterable[str],
+    output_filename: str,
+    is_headless: bool,
+    journal_filename: str | None = None,
+    is_resumed: bool = False,
+    output_format: str = "csv",
+    is_background_writer: bool = True,
+    fsync: bool = False,
+    metrics_filename: str | None = None,
+    metrics_format: str = "prometheus",
+    profile_dirname: str | None = None,
+    profiler_backend: str = "cprofile",
+    resource_profile: str = "details",
+    fields: tuple[str, ...] = DETAIL_FIELDS,
+    cdp_endpoint: str | None = None,
+) -> list[str]:
+    """
+    Crawls the details of every hotel in `links` into `output_filename`.
+    A hotel that fails, e.g. a link that is not a hotel page, is logged and
+    counted, and the crawl moves on to the next one.
+    Returns the links of the hotels that failed.
+    """
+    metrics = Metrics("hotel_details")
+    profiler = (
+        HotelProfiler(profile_dirname, profiler_backend)
+        if profile_dirname
+        else None
+    )
+
+    with (
+        sync_playwright() as p,
+        open_browser_context(p, is_headless, cdp_endpoint) as context,
+        # Closed after the writer, which may still record progress in it
+        (
+            CrawlJournal(journal_filename)
+            if journal_filename
+            else nullcontext()
+        ) as journal,
+        open_writer(
+            output_filename,
+            output_format,
+            is_resumed,
+            is_background_writer,
+            fsync,
+        ) as writer,
+    ):
+        hotel_page = new_page(context)
+        # Installed on the page, as the context may be shared with other
+        # scripts through the browser daemon
+        resource_policy = get_resource_policy(resource_profile, metrics)
+        if resource_policy.is_routed:
+            hotel_page.route("**/*", resource_policy.handle)
+        hotel_page.on("response", resource_policy.on_response)
+
+        failed_links: list[str] = []
+        for i, link in enumerate(links):
+            if journal is not None and journal.is_finished(link):
+                print(f"Skipping finished hotel {link}", file=sys.stderr)
+                metrics.increment("hotels_skipped")
+                continue
+
+            try:
+                with (
+                    profiler.profile(f"hotel-{i}")
+                    if profiler is not None
+                    else nullcontext()
+                ):
+                    with metrics.time("goto"):
+                        hotel_page.goto(link)
+
+                    details = get_hotel_details(hotel_page, metrics, fields)
+                    with metrics.time("append"):
+                        writer.append(details)
+                if journal is not None:
+                    writer.after_flush(partial(journal.mark_finished, link))
+                metrics.increment("hotels")
+            except TimeoutError as e:
+                metrics.increment("hotels_timed_out")
+                print(f"Timed out at {link}: {e}", file=sys.stderr)
+                failed_links.append(link)
+            except Exception as e:
+                metrics.increment("hotels_failed")
+                print(f"Failed at {link}: {e}", file=sys.stderr)
+                failed_links.append(link)
+
+            if metrics_filename:
+                metrics.export(metrics_filename, metrics_format)
+        hotel_page.close()
+
+    metrics.print_summary()
+    return failed_links
+
+
+def split_into_shards(links: list[str], shards: int) -> list[list[str]]:
+    """
+    Splits links into contiguous partitions of near-equal size, so that
+    concatenating the shard outputs in order yields the input order.
+    """
+    size, remainder = divmod(len(links), shards)
+    partitions: list[list[str]] = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < remainder else 0)
+        partitions.append(links[start:end])
+        start = end
+    return partitions
+
+
+def get_shard_filename(output_filename: str, shard: int) -> str:
+    root, ext = os.path.splitext(output_filename)
+    return f"{root}.shard-{shard}{ext}"
+
+
+def merge_shards(
+    shard_filenames: list[str],
+    output_filename: str,
+    append: bool = False,
+    output_format: str = "csv",
+) -> None:
+    if output_format == "parquet":
+        from hotel.writer.parquet import HotelParquetWriter
+
+        HotelParquetWriter.merge(shard_filenames, output_filename)
+        for shard_filename in shard_filenames:
+            os.remove(shard_filename)
+        return
+
+    with open(output_filename, "ab" if append else "wb") as output_file:
+        for shard_filename in shard_filenames:
+            with open(shard_filename, "rb") as shard_file:
+                header = shard_file.readline()
+                if output_file.tell() == 0:
+                    output_file.write(header)
+                shutil.copyfileobj(shard_file, output_file)
+            os.remove(shard_filename)
+
+
+def get_manifest_filename(output_filename: str) -> str:
+    root, _ = os.path.splitext(output_filename)
+    return f"{root}.manifest.json"
+
+
+@dataclass
+class ShardResult:
+    path: str
+    hotels: int
+    # "finished", "merged", or "failed" as a whole with its file left as is
+    status: str = "finished"
+    failed_hotels: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def write_manifest(shards: list[ShardResult], output_filename: str) -> None:
+    manifest = {"shards": [asdict(shard) for shard in shards]}
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def crawl_sharded(
+    links: list[str],
+    output_filename: str,
+    is_headless: bool,
+    shards: int,
+    merge: bool,
+    journal_filename: str | None = None,
+    is_resumed: bool = False,
+    output_format: str = "csv",
+    is_background_writer: bool = True,
+    fsync: bool = False,
+    metrics_filename: str | None = None,
+    metrics_format: str = "prometheus",
+    profile_dirname: str | None = None,
+    profiler_backend: str = "cprofile",
+    resource_profile: str = "details",
+    fields: tuple[str, ...] = DETAIL_FIELDS,
+    cdp_endpoint: str | None = None,
+) -> None:
+    partitions = [
+        partition
+        for partition in split_into_shards(links, shards)
+        if partition
+    ]
+    shard_filenames = [
+        get_shard_filename(output_filename, i) for i in range(len(partitions))
+    ]
+
+    # Each worker process drives its own Chromium through its own playwright
+    # instance, so shards do not contend on a single event loop
+    with ProcessPoolExecutor(max_workers=len(partitions)) as executor:
+        futures = [
+            executor.submit(
+                crawl_hotel_details,
+                partition,
+                shard_filename,
+                is_headless,
+                journal_filename,
+                is_resumed,
+                output_format,
+                is_background_writer,
+                fsync,
+                # Each shard exports its own metrics and profiles, as the
+                # processes share no state
+                (
+                    get_shard_filename(metrics_filename, i)
+                    if metrics_filename
+                    else None
+                ),
+                metrics_format,
+                (
+                    os.path.join(profile_dirname, f"shard-{i}")
+                    if profile_dirname
+                    else None
+                ),
+                profiler_backend,
+                resource_profile,
+                fields,
+                cdp_endpoint,
+            )
+            for i, (partition, shard_filename) in enumerate(
+                zip(partitions, shard_filenames)
+            )
+        ]
+        results: list[ShardResult] = []
+        for future, partition, shard_filename in zip(
+            futures, partitions, shard_filenames
+        ):
+            result = ShardResult(shard_filename, len(partition))
+            try:
+                result.failed_hotels = future.result()
+                print(f"Finished shard {shard_filename}", file=sys.stderr)
+            except Exception as e:
+                # Hotels fail on their own, so this is the shard's browser
+                # or output, and the shards that finished are still merged
+                result.status = "failed"
+                result.error = repr(e)
+                print(f"Failed shard {shard_filename}: {e}", file=sys.stderr)
+            results.append(result)
+
+    if merge:
+        finished = [result for result in results if result.status != "failed"]
+        merge_shards(
+            [result.path for result in finished],
+            output_filename,
+            is_resumed,
+            output_format,
+        )
+        for result in finished:
+            result.status = "merged"
+    manifest_filename = get_manifest_filename(output_filename)
+    write_manifest(results, manifest_filename)
+    print(f"Wrote shard manifest to {manifest_filename}", file=sys.stderr)
+
 
 def main() -> None:
     arg_parser = argparse.ArgumentParser(
@@ -102,36 +448,178 @@ def main() -> None:
         help="Path to output file",
         default=f"output/hotel-details-{int(time.time() * 1000)}.csv",
     )
+    arg_parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output file format",
+    )
+    arg_parser.add_argument(
+        "--background-writer",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to write output on a background thread",
+    )
+    arg_parser.add_argument(
+        "--fsync",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to fsync the output file on every flush",
+    )
     arg_parser.add_argument(
         "--headless",
         action=argparse.BooleanOptionalAction,
         default=True,
         help="Whether to run browser in headless mode",
     )
+    arg_parser.add_argument(
+        "--shards",
+        type=int,
+        help="Number of worker processes, each with its own browser",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--merge",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to merge finished shard outputs into the output file. "
+        "A JSON manifest of the shards, their status and failed hotels is "
+        "written next to it as <output>.manifest.json either way",
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to skip hotels finished by a previous run, as recorded "
+        "in the journal, and append to the output file",
+    )
+    arg_parser.add_argument(
+        "--journal",
+        type=str,
+        help="Path to the crawl journal, defaults to the output file path "
+        "with a .journal extension",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--metrics",
+        type=str,
+        help="Path to export per-phase timings and counters to after every "
+        "hotel, metrics are only printed at the end if not specified",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--metrics-format",
+        choices=["prometheus", "jsonl"],
+        default="prometheus",
+        help="Metrics file format, a Prometheus textfile or JSON lines",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        type=str,
+        help="Directory to write a profile of every hotel crawl to",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="Profiler used by --profile",
+    )
+    arg_parser.add_argument(
+        "--resources",
+        choices=RESOURCE_PROFILES,
+        default="details",
+        help="Resource profile: text-only blocks images, media, fonts, map "
+        "tiles and third-party requests, details keeps images and full "
+        "blocks nothing",
+    )
+    arg_parser.add_argument(
+        "--fields",
+        nargs="+",
+        choices=DETAIL_FIELDS,
+        default=list(DETAIL_FIELDS),
+        help="Hotel fields to extract besides the name, tabs holding none of "
+        "them are skipped and the other columns are left empty",
+    )
+    arg_parser.add_argument(
+        "--cdp-endpoint",
+        type=str,
+        help="Endpoint of a running browser_daemon.py to attach to instead "
+        "of launching a new browser, e.g. " + DEFAULT_CDP_ENDPOINT,
+        default=None,
+    )
     args = arg_parser.parse_args()
 
     input_filename: str = args.input
     output_filename: str = args.output
     is_headless: bool = args.headless
+    shards: int = args.shards
+    merge: bool = args.merge
+    output_format: str = args.format
+    is_background_writer: bool = args.background_writer
+    fsync: bool = args.fsync
+    is_resumed: bool = args.resume
+    if is_resumed and output_format == "parquet":
+        arg_parser.error("--resume cannot append to Parquet output")
+    journal_filename: str = args.journal or f"{output_filename}.journal"
+    metrics_filename: str | None = args.metrics
+    metrics_format: str = args.metrics_format
+    profile_dirname: str | None = args.profile
+    profiler_backend: str = args.profiler
+    resource_profile: str = args.resources
+    fields: tuple[str, ...] = tuple(args.fields)
+    cdp_endpoint: str | None = args.cdp_endpoint
 
     print(f"Running in headless mode: {is_headless}", file=sys.stderr)
     print(f"Reading from {input_filename}", file=sys.stderr)
     print(f"Writing to {output_filename}", file=sys.stderr)
+    print(f"Journaling to {journal_filename}", file=sys.stderr)
 
-    with (
-        sync_playwright() as p,
-        p.chromium.launch(headless=is_headless, timeout=5000) as browser,
-        browser.new_context() as context,
-        open(input_filename, "r", encoding="utf-8") as input_file,
-        HotelCsvWriter(output_filename) as writer,
-    ):
-        hotel_page = context.new_page()
+    if not is_resumed and os.path.exists(journal_filename):
+        os.remove(journal_filename)
 
-        for _, link in enumerate(input_file):
-            hotel_page.goto(link)
+    with open(input_filename, "r", encoding="utf-8") as input_file:
+        links = [link.strip() for link in input_file if link.strip()]
 
-            details = get_hotel_details(hotel_page)
-            writer.append(details)
+    if shards <= 1:
+        crawl_hotel_details(
+            links,
+            output_filename,
+            is_headless,
+            journal_filename,
+            is_resumed,
+            output_format,
+            is_background_writer,
+            fsync,
+            metrics_filename,
+            metrics_format,
+            profile_dirname,
+            profiler_backend,
+            resource_profile,
+            fields,
+            cdp_endpoint,
+        )
+    else:
+        print(f"Splitting into {shards} shards", file=sys.stderr)
+        crawl_sharded(
+            links,
+            output_filename,
+            is_headless,
+            shards,
+            merge,
+            journal_filename,
+            is_resumed,
+            output_format,
+            is_background_writer,
+            fsync,
+            metrics_filename,
+            metrics_format,
+            profile_dirname,
+            profiler_backend,
+            resource_profile,
+            fields,
+            cdp_endpoint,
+        )
 
 
 if __name__ == "__main__":
@@ -1,8 +1,259 @@
 import argparse
 from contextlib import nullcontext
+from dataclasses import dataclass
 import sys
 import traceback
-from playwright.sync_api import sync_playwright, expect
+from typing import Generator, Iterable
+from playwright.sync_api import (
+    sync_playwright,
+    expect,
+    BrowserContext,
+    Error,
+    Page,
+)
+
+from capture import (
+    ResponseCapture,
+    decode_payload,
+    get_hotel_urls_from_payload,
+)
+from crawl import (
+    DEFAULT_CDP_ENDPOINT,
+    RESOURCE_PROFILES,
+    HotelProfiler,
+    HotelFrontier,
+    Metrics,
+    get_hotel_key,
+    get_resource_policy,
+    new_page,
+    open_browser_context,
+)
+
+
+def go_to_next_page(hotel_list_page: Page) -> bool:
+    try:
+        next_page_btn = hotel_list_page.locator(
+            "button[jsname='OCpkoe']"
+        ).first
+        expect(next_page_btn).to_be_visible(timeout=1000)
+        next_page_btn.click()
+    except AssertionError | TimeoutError as e:
+        # Next button may not be found
+        return False
+    return True
+
+
+def get_hotel_urls(
+    hotel_list_page: Page,
+    limit: int,
+    visited_hotels: set[str],
+    metrics: Metrics | None = None,
+) -> Generator[str, None, None]:
+    metrics = metrics or Metrics()
+    processed_hotels: int = 0
+    while processed_hotels < limit:
+        loading_circle = (
+            hotel_list_page.locator(".uIOSxc")
+            .nth(0)
+            .get_by_label("Loading results")
+            .nth(0)
+        )
+        hotels_locator = hotel_list_page.locator(".Zvwhrc")
+        try:
+            with metrics.time("list_wait"):
+                expect(loading_circle).not_to_be_in_viewport()
+        except AssertionError as e:
+            print(e, file=sys.stderr)
+            break
+        try:
+            with metrics.time("list_wait"):
+                expect(hotels_locator.nth(0)).to_be_visible()
+                expect(
+                    hotel_list_page.locator("a.spNMC").nth(0)
+                ).to_be_visible()
+        except AssertionError as e:
+            print(e, file=sys.stderr)
+        else:
+            for hotel in hotels_locator.all():
+                try:
+                    # Timed apart from the yield, which runs the caller
+                    with metrics.time("extract"):
+                        hotel_link = hotel.locator("a.spNMC").nth(0)
+                        expect(hotel_link).to_be_visible(timeout=1000)
+                        href = hotel_link.get_attribute("href")
+                    if not href:
+                        continue
+                    if href.startswith("/"):
+                        href = "https://google.com" + href
+                    # Names are not unique, unlike the entity id in the URL
+                    hotel_key = get_hotel_key(href)
+                    if hotel_key in visited_hotels:
+                        continue
+                    visited_hotels.add(hotel_key)
+                    metrics.increment("hotels")
+                    yield href
+                except AssertionError as e:
+                    # The target location may be not a hotel
+                    continue
+                except TimeoutError as e:
+                    traceback.print_exc()
+                    break
+                processed_hotels += 1
+                if processed_hotels >= limit:
+                    break
+
+        if processed_hotels >= limit:
+            break
+        with metrics.time("next_page"):
+            has_next_page = go_to_next_page(hotel_list_page)
+        if not has_next_page:
+            break
+
+
+def get_hotel_urls_from_network(
+    hotel_list_page: Page,
+    capture: ResponseCapture,
+    limit: int,
+    visited_hotels: set[str],
+    metrics: Metrics | None = None,
+) -> Generator[str, None, None]:
+    """
+    Same as `get_hotel_urls`, but reads hotel links from the responses the
+    result list is rendered from. `capture` must have been listening to the
+    page's responses before the search page was opened.
+    """
+    metrics = metrics or Metrics()
+    processed_hotels: int = 0
+    while processed_hotels < limit:
+        for response in capture.drain():
+            try:
+                text = response.text()
+            except Error:
+                # The body is gone, e.g. after a redirect
+                continue
+            with metrics.time("extract"):
+                hrefs = [
+                    href
+                    for payload in decode_payload(
+                        text, capture.is_document(response)
+                    )
+                    for href in get_hotel_urls_from_payload(payload)
+                ]
+            for href in hrefs:
+                hotel_key = get_hotel_key(href)
+                if hotel_key in visited_hotels:
+                    continue
+                visited_hotels.add(hotel_key)
+                metrics.increment("hotels")
+                yield href
+                processed_hotels += 1
+                if processed_hotels >= limit:
+                    return
+
+        try:
+            with (
+                metrics.time("next_page"),
+                hotel_list_page.expect_response(capture.is_data_response),
+            ):
+                if not go_to_next_page(hotel_list_page):
+                    return
+        except Error as e:
+            # Times out when the next page never fetched new results
+            print(e, file=sys.stderr)
+            return
+
+
+@dataclass
+class HotelListOptions:
+    limit: int
+    engine: str = "dom"
+    # Exported after every location when set
+    metrics_filename: str | None = None
+    metrics_format: str = "prometheus"
+    # Every location is profiled into this directory when set
+    profile_dirname: str | None = None
+    profiler: str = "cprofile"
+    resource_profile: str = "text-only"
+    # Index of hotels found by every run when set
+    frontier_filename: str | None = None
+    # Whether to skip hotels in the frontier
+    only_new: bool = False
+
+
+def crawl_hotel_list(
+    context: BrowserContext,
+    locations: Iterable[str],
+    options: HotelListOptions,
+    visited_hotels: set[str],
+    metrics: Metrics | None = None,
+) -> Generator[str, None, None]:
+    """
+    Yields URLs of up to `limit` hotels by location, searching locations one
+    after another in a single page, skipping hotels whose key is in
+    `visited_hotels`. Found hotels are recorded in the frontier, if any, and
+    with `only_new`, hotels marked done by earlier runs are skipped as well.
+    Marking yielded hotels done once written or crawled is up to the caller.
+    """
+    metrics = metrics or Metrics("hotel_list")
+    profiler = (
+        HotelProfiler(options.profile_dirname, options.profiler)
+        if options.profile_dirname
+        else None
+    )
+    hotel_list_page = new_page(context)
+    # Installed on the page, as the context may be shared with other
+    # scripts through the browser daemon
+    resource_policy = get_resource_policy(options.resource_profile, metrics)
+    if resource_policy.is_routed:
+        hotel_list_page.route("**/*", resource_policy.handle)
+    hotel_list_page.on("response", resource_policy.on_response)
+    capture = ResponseCapture()
+    if options.engine == "network":
+        hotel_list_page.on("response", capture.on_response)
+    frontier = (
+        HotelFrontier(options.frontier_filename)
+        if options.frontier_filename
+        else None
+    )
+    if frontier is not None and options.only_new:
+        # Skipped before counting towards the limit of each location
+        visited_hotels.update(frontier.get_done_keys())
+
+    try:
+        for i, location in enumerate(locations):
+            with (
+                profiler.profile(f"location-{i}")
+                if profiler is not None
+                else nullcontext()
+            ):
+                capture.drain()
+                with metrics.time("goto"):
+                    hotel_list_page.goto(
+                        "https://google.com/travel/search"
+                        f"?q=hotels in {location}&hl=en"
+                    )
+                if options.engine == "network":
+                    hrefs = get_hotel_urls_from_network(
+                        hotel_list_page,
+                        capture,
+                        options.limit,
+                        visited_hotels,
+                        metrics,
+                    )
+                else:
+                    hrefs = get_hotel_urls(
+                        hotel_list_page, options.limit, visited_hotels, metrics
+                    )
+                for href in hrefs:
+                    if frontier is not None and frontier.add(href, location):
+                        metrics.increment("new_hotels")
+                    yield href
+            if options.metrics_filename:
+                metrics.export(options.metrics_filename, options.metrics_format)
+    finally:
+        hotel_list_page.close()
+        if frontier is not None:
+            frontier.close()
 
 
 def main() -> None:
@@ -31,88 +282,112 @@ def main() -> None:
         default=True,
         help="Whether to run browser in headless mode",
     )
+    arg_parser.add_argument(
+        "--engine",
+        choices=["dom", "network"],
+        default="dom",
+        help="Whether to extract hotels from the rendered result list or "
+        "from the responses the page fetches it from",
+    )
+    arg_parser.add_argument(
+        "--metrics",
+        type=str,
+        help="Path to export per-phase timings and counters to after every "
+        "location, metrics are only printed at the end if not specified",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--metrics-format",
+        choices=["prometheus", "jsonl"],
+        default="prometheus",
+        help="Metrics file format, a Prometheus textfile or JSON lines",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        type=str,
+        help="Directory to write a profile of every location crawl to",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="Profiler used by --profile",
+    )
+    arg_parser.add_argument(
+        "--resources",
+        choices=RESOURCE_PROFILES,
+        default="text-only",
+        help="Resource profile: text-only blocks images, media, fonts, map "
+        "tiles and third-party requests, details keeps images and full "
+        "blocks nothing",
+    )
+    arg_parser.add_argument(
+        "--cdp-endpoint",
+        type=str,
+        help="Endpoint of a running browser_daemon.py to attach to instead "
+        "of launching a new browser, e.g. " + DEFAULT_CDP_ENDPOINT,
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--frontier",
+        type=str,
+        help="Path to the index of hotels found across runs, keyed on the "
+        "entity id in their URL",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--only-new",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to only output hotels not written by earlier runs",
+    )
     args = arg_parser.parse_args()
+    if args.only_new and not args.frontier:
+        arg_parser.error("--only-new requires --frontier")
 
     # Extract values
     locations: list[str] = args.locations
-    limit: int = args.limit
     file_name: str = args.output
     is_headless: bool = args.headless
+    options = HotelListOptions(
+        limit=args.limit,
+        engine=args.engine,
+        metrics_filename=args.metrics,
+        metrics_format=args.metrics_format,
+        profile_dirname=args.profile,
+        profiler=args.profiler,
+        resource_profile=args.resources,
+        frontier_filename=args.frontier,
+        only_new=args.only_new,
+    )
 
     visited_hotels: set[str] = set()
+    metrics = Metrics("hotel_list")
 
     with (
         sync_playwright() as p,
-        p.chromium.launch(headless=is_headless, timeout=5000) as browser,
-        browser.new_context() as context,
+        open_browser_context(p, is_headless, args.cdp_endpoint) as context,
         (
             open(file_name, "w", encoding="utf-8")
             if file_name
             else nullcontext(sys.stdout)
         ) as f,
+        (
+            HotelFrontier(args.frontier) if args.frontier else nullcontext()
+        ) as frontier,
     ):
-        hotel_list_page = context.new_page()
-        for location in locations:
-            processed_hotels: int = 0
-            hotel_list_page.goto(
-                f"https://google.com/travel/search?q=hotels in {location}&hl=en"
-            )
-            while processed_hotels < limit:
-                loading_circle = (
-                    hotel_list_page.locator(".uIOSxc")
-                    .nth(0)
-                    .get_by_label("Loading results")
-                    .nth(0)
-                )
-                try:
-                    expect(loading_circle).not_to_be_in_viewport()
-                except AssertionError as e:
-                    print(e, file=sys.stderr)
-                    break
-                hotels_locator = hotel_list_page.locator(".Zvwhrc")
-                try:
-                    expect(hotels_locator.nth(0)).to_be_visible()
-                    expect(
-                        hotel_list_page.locator("a.spNMC").nth(0)
-                    ).to_be_visible()
-                except AssertionError as e:
-                    print(e, file=sys.stderr)
-                else:
-                    for hotel in hotels_locator.all():
-                        try:
-                            hotel_name = hotel.locator("h2").first.inner_text()
-                            if hotel_name in visited_hotels:
-                                # The hotel is likely to have been visited
-                                continue
-                            visited_hotels.add(hotel_name)
-                            hotel_link = hotel.locator("a.spNMC").nth(0)
-                            expect(hotel_link).to_be_visible(timeout=1000)
-                            href = hotel_link.get_attribute("href")
-                            if not href:
-                                continue
-                            if href.startswith("/"):
-                                href = "https://google.com" + href
-                            f.write(f"{href}\n")
-                        except AssertionError as e:
-                            # The target location may be not a hotel
-                            continue
-                        except TimeoutError as e:
-                            traceback.print_exc()
-                            break
-                        processed_hotels += 1
-                        if processed_hotels >= limit:
-                            break
-
-                if processed_hotels < limit:
-                    try:
-                        next_page_btn = hotel_list_page.locator(
-                            "button[jsname='OCpkoe']"
-                        ).first
-                        expect(next_page_btn).to_be_visible(timeout=1000)
-                        next_page_btn.click()
-                    except AssertionError | TimeoutError as e:
-                        # Next button may not be found
-                        break
+        for href in crawl_hotel_list(
+            context, locations, options, visited_hotels, metrics
+        ):
+            with metrics.time("append"):
+                f.write(f"{href}\n")
+            if frontier is not None:
+                # Only done once the URL cannot be lost with the buffer
+                f.flush()
+                frontier.mark_done([href])
+
+    metrics.print_summary()
 
 
 if __name__ == "__main__":
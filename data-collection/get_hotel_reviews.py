@@ -1,146 +1,451 @@
 import argparse
+import asyncio
+from contextlib import nullcontext
+from dataclasses import dataclass
 import datetime
+from functools import partial
+import os
 import sys
 import time
-from typing import Generator
+from typing import AsyncGenerator, AsyncIterable, Iterable, TypedDict
 
-from playwright.sync_api import (
-    sync_playwright,
+from playwright.async_api import (
+    async_playwright,
     expect,
+    BrowserContext,
+    Error,
     Locator,
     Page,
+    TimeoutError,
 )
 
-from review import Review
-from review.writer import ReviewCsvWriter
+from capture import (
+    ResponseCapture,
+    decode_payload,
+    get_reviews_from_payload,
+)
+from crawl import (
+    DEFAULT_CDP_ENDPOINT,
+    RESOURCE_PROFILES,
+    CrawlJournal,
+    HotelProfiler,
+    Metrics,
+    get_resource_policy,
+    new_page_async,
+    open_browser_context_async,
+)
+from crawl.rate import (
+    ERROR,
+    SUCCESS,
+    THROTTLED,
+    TIMEOUT,
+    AimdController,
+    ThrottledError,
+    is_throttled,
+)
+from review import RawReviewBatch, Review, ReviewBatch
+from review.batch import TRIP_COMPANIONS, TRIP_TYPES, to_epoch
+from review.normalize import (
+    parse_rating,
+    parse_review_time,
+    parse_trip_details,
+)
+from review.writer import AbstractReviewWriter, ReviewCsvWriter
+from review.writer.background import BackgroundReviewWriter
+from review.writer.raw import RawReviewCsvWriter
 
 
-def is_crawlable_panel(panel: Locator) -> bool:
+async def is_crawlable_panel(panel: Locator) -> bool:
     """
     Verifies if the comment section is crawlable or not.
     Crawable here means it is not empty and does not contain "Read more" button
     """
-    if len(panel.inner_text()) == 0:
+    if len(await panel.inner_text()) == 0:
         return False
-    readmore_buttons = panel.get_by_role("button").all()
+    readmore_buttons = await panel.get_by_role("button").all()
     return len(readmore_buttons) == 0
 
 
-def get_review_from_panel(panel: Locator, hotel_name: str) -> Review | None:
-    r = Review(hotel_name=hotel_name)
+REVIEW_PANEL_SELECTOR = ".Svr5cf"
+# Panels already extracted in windowed mode are emptied and tagged with this
+# attribute, so only new panels match the selector below
+PRUNED_PANEL_ATTRIBUTE = "data-crawled"
+NEW_REVIEW_PANEL_SELECTOR = (
+    f"{REVIEW_PANEL_SELECTOR}:not([{PRUNED_PANEL_ATTRIBUTE}])"
+)
+
+# Reads every panel matching `selector` from index `start` onwards in a single
+# round trip. The selectors mirror the ones used by `get_review_from_panel`
+EXTRACT_PANELS_SCRIPT = """
+([selector, start]) => Array.from(document.querySelectorAll(selector))
+    .slice(start)
+    .map((panel) => {
+        const text = (selector) => {
+            const elem = panel.querySelector(selector);
+            return elem ? elem.innerText : null;
+        };
+        const reviewText = Array.from(panel.querySelectorAll(".K7oBsc"))
+            .filter((elem) => !elem.querySelector("button, [role='button']"))
+            .map((elem) => elem.innerText.trim())
+            .find((text) => text.length > 0);
+        return {
+            time: text("span.iUtr1"),
+            text: reviewText ?? "",
+            rating: text(".GDWaad"),
+            trip: text(".ThUm5b>span"),
+        };
+    })
+"""
+
+# Empties the first `count` panels matching `selector`. Each panel keeps its
+# height so the scroll position, and thus infinite scrolling, is unaffected
+PRUNE_PANELS_SCRIPT = """
+([selector, attribute, count]) => {
+    const panels = Array.from(document.querySelectorAll(selector));
+    for (const panel of panels.slice(0, count)) {
+        panel.style.height = `${panel.offsetHeight}px`;
+        panel.replaceChildren();
+        panel.setAttribute(attribute, "");
+    }
+}
+"""
+
+# Resolves once more than `start` panels match `selector`, with the time it
+# took in milliseconds (0 when they were already there). Resolves with -1 when
+# neither the DOM nor the network has changed for `quiet` ms, meaning the list
+# has been exhausted, or after `timeout` ms at the latest
+WAIT_FOR_PANELS_SCRIPT = """
+([selector, start, quiet, timeout]) => new Promise((resolve) => {
+    const hasNewPanels = () =>
+        document.querySelectorAll(selector).length > start;
+    if (hasNewPanels()) {
+        resolve(0);
+        return;
+    }
+    const begin = performance.now();
+    let lastActivity = begin;
+    const finish = (result) => {
+        mutationObserver.disconnect();
+        performanceObserver.disconnect();
+        clearInterval(timer);
+        resolve(result);
+    };
+    const mutationObserver = new MutationObserver(() => {
+        lastActivity = performance.now();
+        if (hasNewPanels()) {
+            finish(lastActivity - begin);
+        }
+    });
+    mutationObserver.observe(document.body, { childList: true, subtree: true });
+    const performanceObserver = new PerformanceObserver(() => {
+        lastActivity = performance.now();
+    });
+    performanceObserver.observe({ type: "resource" });
+    const timer = setInterval(() => {
+        const now = performance.now();
+        if (now - lastActivity >= quiet || now - begin >= timeout) {
+            finish(-1);
+        }
+    }, 50);
+})
+"""
+
+
+class AdaptiveWait:
+    """
+    Waits for new review panels to be rendered instead of sleeping for a fixed
+    delay. The quiet period after which the review list is considered
+    exhausted follows the load latency observed so far, estimated the same
+    way as a TCP retransmission timeout (RFC 6298).
+    """
+
+    def __init__(
+        self,
+        initial_quiet_ms: float = 3000,
+        min_quiet_ms: float = 300,
+        timeout_ms: float = 10000,
+    ) -> None:
+        self._initial_quiet_ms = initial_quiet_ms
+        self._min_quiet_ms = min_quiet_ms
+        self._timeout_ms = timeout_ms
+        self._smoothed_ms: float | None = None
+        self._variation_ms: float = 0.0
+
+    @property
+    def quiet_ms(self) -> float:
+        if self._smoothed_ms is None:
+            return self._initial_quiet_ms
+        return min(
+            max(self._smoothed_ms + 4 * self._variation_ms, self._min_quiet_ms),
+            self._timeout_ms,
+        )
+
+    def observe(self, latency_ms: float) -> None:
+        if self._smoothed_ms is None:
+            self._smoothed_ms = latency_ms
+            self._variation_ms = latency_ms / 2
+        else:
+            self._variation_ms = 0.75 * self._variation_ms + 0.25 * abs(
+                self._smoothed_ms - latency_ms
+            )
+            self._smoothed_ms = 0.875 * self._smoothed_ms + 0.125 * latency_ms
+
+    async def wait_for_panels(
+        self, hotel_page: Page, selector: str, start: int
+    ) -> bool:
+        latency_ms: float = await hotel_page.evaluate(
+            WAIT_FOR_PANELS_SCRIPT,
+            [selector, start, self.quiet_ms, self._timeout_ms],
+        )
+        if latency_ms > 0:
+            self.observe(latency_ms)
+        return latency_ms >= 0
+
+
+class PanelRecord(TypedDict):
+    time: str | None
+    text: str
+    rating: str | None
+    trip: str | None
+
+
+@dataclass
+class ReviewCursor:
+    """
+    Progress of the review crawl of a hotel: how many panels, or reviews
+    decoded with the network engine, have been read in order, and how many
+    of them were made on Google and count towards the limit. Panels before
+    `panels` are passed over without being read, e.g. when a crawl resumes
+    from the journal.
+    """
+
+    panels: int = 0
+    reviews: int = 0
+
 
-    review_time_str = panel.locator("span.iUtr1").first.inner_text().strip()
-    # print(f"Review was made {review_time_str}")
-    if "Google" not in review_time_str:
+def parse_review(
+    hotel_name: str,
+    review_time_str: str,
+    review_text: str,
+    rating: str,
+    trip_details_str: str | None,
+    anchor: datetime.datetime | None = None,
+) -> Review | None:
+    """
+    Parses the strings of a review panel, resolving its relative time, e.g.
+    "2 months ago on Google", against `anchor`, which defaults to now.
+    """
+    review_timestamp = parse_review_time(
+        review_time_str, anchor or datetime.datetime.now()
+    )
+    if review_timestamp is None:
         print("Warning: Review was not made on Google, skipping")
         return None
 
-    # Based on this solution on StackOverflow: https://stackoverflow.com/a/12566244
-    amount_str, fmt = review_time_str.split()[:2]
-
-    amount = float(amount_str.replace("an", "1").replace("a", "1"))
-    if amount == 1:
-        fmt = (
-            fmt.replace("second", "seconds")
-            .replace("minute", "minutes")
-            .replace("hour", "hours")
-            .replace("day", "days")
-            .replace("week", "weeks")
-            .replace("month", "months")
-            .replace("year", "years")
-        )
+    trip_type, trip_companions = parse_trip_details(trip_details_str)
+    return Review(
+        hotel_name=hotel_name,
+        review_text=review_text,
+        rating=parse_rating(rating),
+        review_timestamp=review_timestamp,
+        trip_type=TRIP_TYPES[trip_type],
+        trip_companions=TRIP_COMPANIONS[trip_companions],
+    )
+
 
-    match fmt:
-        case "seconds" | "minutes" | "hours" | "days" | "weeks":
-            pass
-        case "months":
-            amount *= 30.0
-            fmt = "days"
-        case "years":
-            amount *= 365.0
-            fmt = "days"
-        case _:
-            amount = 0
-            fmt = "seconds"
-
-    dt = datetime.timedelta(**dict([(fmt, amount)]))
-    r.review_timestamp = datetime.datetime.now() - dt
-
-    review_text_elems = panel.locator(".K7oBsc").all()
+async def get_record_from_panel(panel: Locator) -> PanelRecord:
+    review_time_str = await panel.locator("span.iUtr1").first.inner_text()
+
+    review_text: str = ""
+    review_text_elems = await panel.locator(".K7oBsc").all()
     for elem in review_text_elems:
-        if len(elem.get_by_role("button").all()):
+        if len(await elem.get_by_role("button").all()):
             continue
-        review_text = elem.inner_text().strip()
-        if not len(review_text):
+        text = (await elem.inner_text()).strip()
+        if not len(text):
             continue
-        r.review_text = review_text
+        review_text = text
         break
 
-    rating = panel.locator(".GDWaad").first.inner_text()
-    r.rating = float(rating.split("/")[0])
-
-    # Note that trip details is optional
-    trip_details_locators = panel.locator(".ThUm5b>span").all()
+    rating = await panel.locator(".GDWaad").first.inner_text()
 
+    trip_details_str: str | None = None
+    trip_details_locators = await panel.locator(".ThUm5b>span").all()
     if trip_details_locators:
-        trip_details = trip_details_locators[0].inner_text().split()
-        for detail in trip_details:
-            match detail:
-                case "Business" | "Vacation":
-                    r.trip_type = detail
-                case "Family" | "Friends" | "Couple" | "Solo":
-                    r.trip_companions = detail
+        trip_details_str = await trip_details_locators[0].inner_text()
+
+    return {
+        "time": review_time_str,
+        "text": review_text,
+        "rating": rating,
+        "trip": trip_details_str,
+    }
+
+
+async def get_review_from_panel(
+    panel: Locator, hotel_name: str
+) -> Review | None:
+    record = await get_record_from_panel(panel)
+    return parse_review(
+        hotel_name,
+        record["time"] or "",
+        record["text"],
+        record["rating"] or "",
+        record["trip"],
+    )
+
+
+async def get_records_from_page(
+    hotel_page: Page, selector: str, start: int
+) -> list[PanelRecord] | None:
+    """
+    Extracts all panels matching `selector` from index `start` onwards with
+    one `evaluate` call.
+    Returns their records, or None when the panels no longer match the
+    expected selectors.
+    """
+    records: list[PanelRecord] = await hotel_page.evaluate(
+        EXTRACT_PANELS_SCRIPT, [selector, start]
+    )
+    if any(
+        record["time"] is None or record["rating"] is None
+        for record in records
+    ):
+        return None
+    return records
+
 
-    return r
+def is_google_record(record: PanelRecord) -> bool:
+    return "Google" in (record["time"] or "")
 
 
 # TODO: Choose review source from Google only to reduce clutter by other review providers
-def get_reviews(
-    hotel_page: Page, limit: int
-) -> Generator[list[Review], None, None]:
-    hotel_name: str = hotel_page.locator("h1.FNkAEc.o4k8l").first.inner_text()
-    hotel_page.locator("#reviews>span").first.click()
+async def get_review_records(
+    hotel_page: Page,
+    limit: int,
+    batched: bool = True,
+    windowed: bool = True,
+    adaptive_wait: AdaptiveWait | None = None,
+    metrics: Metrics | None = None,
+    cursor: ReviewCursor | None = None,
+) -> AsyncGenerator[tuple[str, list[PanelRecord]], None]:
+    """
+    Yields the hotel name and the unparsed records of the review panels of
+    the opened hotel page batch by batch as the review list scrolls, until
+    `limit` reviews made on Google have been read. In windowed mode,
+    extracted panels are pruned from the page so each batch only resolves
+    new panels, keeping per-batch cost and renderer memory flat however deep
+    the crawl goes. Without `adaptive_wait`, each scroll falls back to fixed
+    keyboard delays. `cursor` is advanced past each batch before it is
+    yielded.
+    """
+    metrics = metrics or Metrics()
+    cursor = cursor or ReviewCursor()
+    # Panels still have to be scrolled past to load the ones after them
+    skipped_panels = cursor.panels
+    hotel_name: str = await hotel_page.locator(
+        "h1.FNkAEc.o4k8l"
+    ).first.inner_text()
+    with metrics.time("reviews_tab"):
+        await hotel_page.locator("#reviews>span").first.click()
     processed_reviews: int = 0
-    recorded_reviews: int = 0
+
+    panel_selector = (
+        NEW_REVIEW_PANEL_SELECTOR if windowed else REVIEW_PANEL_SELECTOR
+    )
+    review_panels_locator = hotel_page.locator(panel_selector)
 
     while True:
-        review_panels_locator = hotel_page.locator(".Svr5cf")
+        # Pruned panels no longer match the selector, so new panels always
+        # start at the first match
+        start = 0 if windowed else processed_reviews
 
         try:
-            hotel_page.keyboard.press("End", delay=1000)
-            hotel_page.keyboard.press("PageUp", delay=500)
+            has_new_panels = True
+            with metrics.time("scroll"):
+                if adaptive_wait is not None:
+                    await hotel_page.keyboard.press("End")
+                    await hotel_page.keyboard.press("PageUp")
 
-            try:
-                # Maybe we have looked over all reviews
-                expect(
-                    review_panels_locator.nth(processed_reviews)
-                ).to_be_visible(timeout=10000)
-            except AssertionError as e:
-                print("No more reviews (maybe)")
-                print(e)
+                    has_new_panels = await adaptive_wait.wait_for_panels(
+                        hotel_page, panel_selector, start
+                    )
+                else:
+                    await hotel_page.keyboard.press("End", delay=1000)
+                    await hotel_page.keyboard.press("PageUp", delay=500)
+
+                    try:
+                        # Maybe we have looked over all reviews
+                        await expect(
+                            review_panels_locator.nth(start)
+                        ).to_be_visible(timeout=10000)
+                    except AssertionError as e:
+                        print("No more reviews (maybe)")
+                        print(e)
+                        return
+            if not has_new_panels:
+                print("No more reviews")
                 return
 
-            review_panels = review_panels_locator.all()[processed_reviews:]
-            if len(review_panels) == 0:
+            if processed_reviews < skipped_panels:
+                with metrics.time("skip"):
+                    new_panels = await review_panels_locator.count() - start
+                    skipped = min(
+                        new_panels, skipped_panels - processed_reviews
+                    )
+                    if windowed:
+                        await hotel_page.evaluate(
+                            PRUNE_PANELS_SCRIPT,
+                            [panel_selector, PRUNED_PANEL_ATTRIBUTE, skipped],
+                        )
+                processed_reviews += skipped
+                print(f"Skipped {skipped} review(s) written before")
+                if skipped == new_panels:
+                    continue
+                start = 0 if windowed else processed_reviews
+
+            records: list[PanelRecord] | None = None
+            with metrics.time("extract"):
+                if batched:
+                    records = await get_records_from_page(
+                        hotel_page, panel_selector, start
+                    )
+                    if records is None:
+                        print(
+                            "Warning: Batched extraction failed, "
+                            "falling back to locators"
+                        )
+                if records is None:
+                    review_panels = (await review_panels_locator.all())[
+                        start:
+                    ]
+                    records = [
+                        await get_record_from_panel(panel)
+                        for panel in review_panels
+                    ]
+
+            panel_count = len(records)
+            if panel_count == 0:
                 print("No more reviews")
                 return
-            print(f"Found {len(review_panels)} new review(s)")
+            print(f"Found {panel_count} new review(s)")
 
-            all_reviews: list[Review | None] = [
-                get_review_from_panel(panel, hotel_name)
-                for panel in review_panels
-            ]
-            reviews = [review for review in all_reviews if review is not None]
-            recorded_reviews += len(reviews)
-            # print(f"Yielding {len(reviews)} review(s)")
-            yield reviews
+            processed_reviews += panel_count
+            cursor.panels = processed_reviews
+            cursor.reviews += sum(map(is_google_record, records))
+            yield hotel_name, records
 
-            processed_reviews += len(review_panels)
+            if windowed:
+                with metrics.time("prune"):
+                    await hotel_page.evaluate(
+                        PRUNE_PANELS_SCRIPT,
+                        [panel_selector, PRUNED_PANEL_ATTRIBUTE, panel_count],
+                    )
             # print(f"Processed {processed_reviews} review(s)")
             # print(f"Recorded {recorded_reviews} review(s)")
             print("---")
 
-            if recorded_reviews >= limit:
+            if cursor.reviews >= limit:
                 # print("Reached review count limit, stopping.")
                 return
         except AssertionError as e:
@@ -148,6 +453,529 @@ def get_reviews(
             return
 
 
+async def get_reviews(
+    hotel_page: Page,
+    limit: int,
+    batched: bool = True,
+    windowed: bool = True,
+    adaptive_wait: AdaptiveWait | None = None,
+    metrics: Metrics | None = None,
+    cursor: ReviewCursor | None = None,
+    crawled_at: datetime.datetime | None = None,
+) -> AsyncGenerator[list[Review], None]:
+    """
+    Yields reviews of the opened hotel page batch by batch as the review list
+    scrolls, see `get_review_records`. Relative review times are all resolved
+    against `crawled_at`, which defaults to when the first batch is read.
+    """
+    metrics = metrics or Metrics()
+    anchor = crawled_at or datetime.datetime.now()
+    async for hotel_name, records in get_review_records(
+        hotel_page, limit, batched, windowed, adaptive_wait, metrics, cursor
+    ):
+        with metrics.time("parse"):
+            reviews = [
+                review
+                for record in records
+                if (
+                    review := parse_review(
+                        hotel_name,
+                        record["time"] or "",
+                        record["text"],
+                        record["rating"] or "",
+                        record["trip"],
+                        anchor,
+                    )
+                )
+                is not None
+            ]
+        metrics.increment("reviews", len(reviews))
+        yield reviews
+
+
+async def get_raw_reviews(
+    hotel_page: Page,
+    limit: int,
+    crawled_at: datetime.datetime,
+    batched: bool = True,
+    windowed: bool = True,
+    adaptive_wait: AdaptiveWait | None = None,
+    metrics: Metrics | None = None,
+    cursor: ReviewCursor | None = None,
+) -> AsyncGenerator[RawReviewBatch, None]:
+    """
+    Same as `get_reviews`, yielding the strings of the review panels as they
+    are, to be parsed later by `review.normalize` against `crawled_at`.
+    """
+    metrics = metrics or Metrics()
+    crawled_at_epoch = to_epoch(crawled_at)
+    async for hotel_name, records in get_review_records(
+        hotel_page, limit, batched, windowed, adaptive_wait, metrics, cursor
+    ):
+        batch = RawReviewBatch()
+        for record in records:
+            batch.append(
+                hotel_name,
+                record["time"] or "",
+                record["text"],
+                record["rating"] or "",
+                record["trip"],
+                crawled_at_epoch,
+            )
+        metrics.increment("reviews", sum(map(is_google_record, records)))
+        yield batch
+
+
+# Times a hotel is tried again after being throttled before giving up on it
+MAX_THROTTLED_ATTEMPTS = 3
+
+
+@dataclass
+class CrawlPage:
+    """
+    A page crawling hotels one after the other, along with what it carries
+    over from one hotel to the next.
+    """
+
+    page: Page
+    capture: ResponseCapture
+    # Latency is learnt per page
+    adaptive_wait: AdaptiveWait | None = None
+
+
+@dataclass
+class ReviewCrawlOptions:
+    limit: int
+    concurrency: int = 1
+    # Concurrency is adjusted between 1 and this bound when set above it
+    max_concurrency: int | None = None
+    batched: bool = True
+    windowed: bool = True
+    adaptive: bool = True
+    # Quiet periods of the adaptive wait, see `AdaptiveWait`
+    initial_quiet_ms: float = 3000
+    min_quiet_ms: float = 300
+    engine: str = "dom"
+    # Whether reviews are parsed while crawling or written as raw strings,
+    # see `review.normalize`
+    capture: str = "parsed"
+    # Exported after every hotel when set
+    metrics_filename: str | None = None
+    metrics_format: str = "prometheus"
+    # Every hotel is profiled into this directory when set
+    profile_dirname: str | None = None
+    profiler: str = "cprofile"
+    resource_profile: str = "text-only"
+    # Endpoint of a running browser daemon to attach to
+    cdp_endpoint: str | None = None
+
+
+async def get_reviews_from_network(
+    hotel_page: Page,
+    capture: ResponseCapture,
+    limit: int,
+    adaptive_wait: AdaptiveWait | None = None,
+    metrics: Metrics | None = None,
+    cursor: ReviewCursor | None = None,
+) -> AsyncGenerator[list[Review], None]:
+    """
+    Yields reviews decoded from the payloads the page fetches while the
+    review list scrolls, instead of reading them from the rendered panels.
+    `capture` must have been listening to the page's responses before the
+    hotel page was opened. `cursor` counts reviews in the order they are
+    decoded.
+    """
+    metrics = metrics or Metrics()
+    cursor = cursor or ReviewCursor()
+    skipped_reviews = cursor.panels
+    decoded_reviews: int = 0
+    hotel_name: str = await hotel_page.get_by_role(
+        "heading", level=1
+    ).first.inner_text()
+    with metrics.time("reviews_tab"):
+        await hotel_page.locator("#reviews>span").first.click()
+    seen_reviews: set[tuple[str, datetime.datetime | None]] = set()
+
+    while cursor.reviews < limit:
+        reviews: list[Review] = []
+        for response in capture.drain():
+            try:
+                text = await response.text()
+            except Error:
+                # The body is gone, e.g. after a redirect
+                continue
+            with metrics.time("extract"):
+                for payload in decode_payload(
+                    text, capture.is_document(response)
+                ):
+                    for review in get_reviews_from_payload(
+                        payload, hotel_name
+                    ):
+                        key = (review.review_text, review.review_timestamp)
+                        if key in seen_reviews:
+                            continue
+                        seen_reviews.add(key)
+                        decoded_reviews += 1
+                        if decoded_reviews > skipped_reviews:
+                            reviews.append(review)
+
+        if reviews:
+            print(f"Found {len(reviews)} new review(s)")
+            cursor.panels = decoded_reviews
+            cursor.reviews += len(reviews)
+            metrics.increment("reviews", len(reviews))
+            yield reviews
+            print("---")
+            continue
+
+        timeout_ms = adaptive_wait.quiet_ms if adaptive_wait else 10000
+        started = time.perf_counter()
+        try:
+            with metrics.time("scroll"):
+                async with hotel_page.expect_response(
+                    capture.is_data_response, timeout=timeout_ms
+                ):
+                    await hotel_page.keyboard.press("End")
+                    await hotel_page.keyboard.press("PageUp")
+        except TimeoutError:
+            print("No more reviews")
+            return
+        if adaptive_wait is not None:
+            adaptive_wait.observe((time.perf_counter() - started) * 1000)
+
+
+async def iter_links(
+    links: Iterable[str] | AsyncIterable[str],
+) -> AsyncGenerator[str, None]:
+    if isinstance(links, AsyncIterable):
+        async for link in links:
+            if link.strip():
+                yield link.strip()
+    else:
+        for link in links:
+            if link.strip():
+                yield link.strip()
+
+
+async def crawl_reviews(
+    context: BrowserContext,
+    links: Iterable[str] | AsyncIterable[str],
+    writer: AbstractReviewWriter,
+    options: ReviewCrawlOptions,
+    journal: CrawlJournal | None = None,
+    metrics: Metrics | None = None,
+    is_resumed: bool = False,
+) -> list[str]:
+    """
+    Crawls reviews of every hotel in `links` using up to `concurrency` pages
+    of the same browser context at once. Each page takes the next hotel from
+    `links`, so a slow hotel never holds up the others. `links` may be an
+    async iterable, e.g. fed by another stage as it finds hotels.
+    With `max_concurrency`, the number of pages open starts at
+    `concurrency` and follows what the site sustains, see `AimdController`.
+    Throttled hotels are retried up to `MAX_THROTTLED_ATTEMPTS` times.
+    With a `journal`, the progress of every hotel is recorded as it is
+    written. When `is_resumed`, hotels finished by a previous run are
+    skipped, and review panels it already wrote are passed over.
+    With the raw `capture`, `writer` receives `RawReviewBatch`es instead.
+    Returns the links of the hotels that failed, including throttled ones
+    out of attempts.
+    """
+    metrics = metrics or Metrics("hotel_reviews")
+    resource_policy = get_resource_policy(options.resource_profile, metrics)
+    profiler = (
+        HotelProfiler(options.profile_dirname, options.profiler)
+        if options.profile_dirname
+        else None
+    )
+    rate = (
+        AimdController(options.max_concurrency, 1, options.concurrency)
+        if options.max_concurrency
+        and options.max_concurrency > options.concurrency
+        else None
+    )
+    source = iter_links(links)
+    source_lock = asyncio.Lock()
+    retried_links: asyncio.Queue[str] = asyncio.Queue()
+    throttled_attempts: dict[str, int] = {}
+    started_hotels: int = 0
+    processed_hotels: int = 0
+    failed_links: list[str] = []
+    # Relative review times are all resolved against the start of the crawl
+    crawled_at = datetime.datetime.now()
+
+    async def next_link() -> str | None:
+        if not retried_links.empty():
+            return retried_links.get_nowait()
+        # Async generators cannot be advanced by two workers at once
+        async with source_lock:
+            return await anext(source, None)
+
+    def record_progress(link: str, cursor: ReviewCursor) -> None:
+        if journal is not None:
+            writer.after_flush(
+                partial(
+                    journal.record_reviews, link, cursor.panels, cursor.reviews
+                )
+            )
+
+    async def write_reviews(
+        hotel_page: Page,
+        link: str,
+        adaptive_wait: AdaptiveWait | None,
+        capture: ResponseCapture,
+        cursor: ReviewCursor,
+    ) -> None:
+        batches: AsyncGenerator[list[Review], None]
+        if options.engine == "network":
+            batches = get_reviews_from_network(
+                hotel_page,
+                capture,
+                options.limit,
+                adaptive_wait,
+                metrics,
+                cursor,
+            )
+        else:
+            batches = get_reviews(
+                hotel_page,
+                options.limit,
+                options.batched,
+                options.windowed,
+                adaptive_wait,
+                metrics,
+                cursor,
+                crawled_at,
+            )
+        async for reviews in batches:
+            # The event loop runs on a single thread, so batches from
+            # different pages never interleave mid-write
+            # Packed once here, so that reviews queued for a background
+            # writer take little memory
+            with metrics.time("append"):
+                writer.append(ReviewBatch.from_reviews(reviews))
+            record_progress(link, cursor)
+
+    async def write_raw_reviews(
+        hotel_page: Page,
+        link: str,
+        adaptive_wait: AdaptiveWait | None,
+        cursor: ReviewCursor,
+    ) -> None:
+        async for batch in get_raw_reviews(
+            hotel_page,
+            options.limit,
+            crawled_at,
+            options.batched,
+            options.windowed,
+            adaptive_wait,
+            metrics,
+            cursor,
+        ):
+            with metrics.time("append"):
+                writer.append(batch)
+            record_progress(link, cursor)
+
+    # Pages are left open between hotels and handed to the next hotel, but
+    # only opened once a hotel may start, so that no more pages are open
+    # than hotels are crawled at once
+    idle_pages: list[CrawlPage] = []
+
+    async def open_page() -> CrawlPage:
+        hotel_page = await new_page_async(context)
+        # Installed on the page, as the context may be shared with other
+        # scripts through the browser daemon
+        if resource_policy.is_routed:
+            await hotel_page.route("**/*", resource_policy.handle)
+        hotel_page.on("response", resource_policy.on_response)
+        capture = ResponseCapture()
+        if options.engine == "network":
+            hotel_page.on("response", capture.on_response)
+        return CrawlPage(
+            hotel_page,
+            capture,
+            (
+                AdaptiveWait(options.initial_quiet_ms, options.min_quiet_ms)
+                if options.adaptive
+                else None
+            ),
+        )
+
+    async def put_page(crawl_page: CrawlPage) -> None:
+        # Called before the hotel releases its slot. Pages beyond the limit,
+        # e.g. once it has been lowered, are closed rather than kept idle
+        if rate is not None and rate.in_flight + len(idle_pages) > rate.limit:
+            await crawl_page.page.close()
+        else:
+            idle_pages.append(crawl_page)
+
+    async def worker() -> None:
+        nonlocal started_hotels, processed_hotels
+        while (link := await next_link()) is not None:
+            cursor = ReviewCursor()
+            if journal is not None and is_resumed:
+                cursor.panels, cursor.reviews = journal.get_review_cursor(link)
+                if journal.is_finished(link) or cursor.reviews >= options.limit:
+                    print(f"Skipping finished hotel {link}")
+                    metrics.increment("hotels_skipped")
+                    continue
+            if rate is not None:
+                await rate.acquire()
+            started_hotels += 1
+            hotel_started = time.perf_counter()
+            outcome = SUCCESS
+            crawl_page: CrawlPage | None = None
+            try:
+                crawl_page = (
+                    idle_pages.pop() if idle_pages else await open_page()
+                )
+                hotel_page = crawl_page.page
+                with (
+                    profiler.profile(f"hotel-{started_hotels}")
+                    if profiler is not None
+                    else nullcontext()
+                ):
+                    crawl_page.capture.drain()
+                    goto_started = time.perf_counter()
+                    with metrics.time("goto"):
+                        response = await hotel_page.goto(link)
+                    if rate is not None:
+                        rate.observe_latency(time.perf_counter() - goto_started)
+                    status = response.status if response else None
+                    if is_throttled(hotel_page.url, status):
+                        raise ThrottledError(f"Throttled at {link}")
+                    if options.capture == "raw":
+                        await write_raw_reviews(
+                            hotel_page, link, crawl_page.adaptive_wait, cursor
+                        )
+                    else:
+                        await write_reviews(
+                            hotel_page,
+                            link,
+                            crawl_page.adaptive_wait,
+                            crawl_page.capture,
+                            cursor,
+                        )
+                if journal is not None:
+                    writer.after_flush(partial(journal.mark_finished, link))
+                processed_hotels += 1
+                metrics.increment("hotels")
+                print(f"Processed {processed_hotels} hotels\n")
+            except ThrottledError as e:
+                outcome = THROTTLED
+                metrics.increment("hotels_throttled")
+                print(e)
+                attempts = throttled_attempts.get(link, 0) + 1
+                throttled_attempts[link] = attempts
+                if attempts < MAX_THROTTLED_ATTEMPTS:
+                    retried_links.put_nowait(link)
+                else:
+                    failed_links.append(link)
+            except TimeoutError as e:
+                outcome = TIMEOUT
+                metrics.increment("hotels_timed_out")
+                print(e)
+                failed_links.append(link)
+            except Exception as e:
+                outcome = ERROR
+                metrics.increment("hotels_failed")
+                print(e)
+                failed_links.append(link)
+            finally:
+                # Whole hotel, from taking a page to its last batch
+                metrics.observe("hotel", time.perf_counter() - hotel_started)
+                if crawl_page is not None:
+                    await put_page(crawl_page)
+                if rate is not None:
+                    await rate.release(outcome)
+            if options.metrics_filename:
+                metrics.export(options.metrics_filename, options.metrics_format)
+
+    try:
+        await asyncio.gather(
+            *(
+                worker()
+                for _ in range(
+                    max(options.max_concurrency or 0, options.concurrency, 1)
+                )
+            )
+        )
+    finally:
+        for crawl_page in idle_pages:
+            await crawl_page.page.close()
+    metrics.print_summary()
+    return failed_links
+
+
+def open_writer(
+    output_filename: str,
+    output_format: str,
+    is_resumed: bool,
+    is_background: bool = True,
+    fsync: bool = False,
+) -> AbstractReviewWriter:
+    writer: AbstractReviewWriter
+    if output_format == "raw":
+        writer = RawReviewCsvWriter(output_filename, "a" if is_resumed else "w")
+    elif output_format == "parquet":
+        # Imported here as pyarrow is only needed for Parquet output
+        from review.writer.parquet import ReviewParquetWriter
+
+        writer = ReviewParquetWriter(output_filename)
+    else:
+        writer = ReviewCsvWriter(output_filename, "a" if is_resumed else "w")
+    if is_background:
+        return BackgroundReviewWriter(writer, fsync=fsync)
+    return writer
+
+
+async def run(
+    links: Iterable[str] | AsyncIterable[str],
+    output_filename: str,
+    is_headless: bool,
+    options: ReviewCrawlOptions,
+    journal_filename: str | None = None,
+    is_resumed: bool = False,
+    output_format: str = "csv",
+    is_background_writer: bool = True,
+    fsync: bool = False,
+) -> list[str]:
+    """
+    Crawls reviews of every hotel in `links` into `output_filename`, see
+    `crawl_reviews`. Returns the links of the hotels that failed.
+    """
+    async with (
+        async_playwright() as p,
+        open_browser_context_async(
+            p, is_headless, options.cdp_endpoint
+        ) as context,
+    ):
+        with (
+            # Closed after the writer, which may still record progress in it
+            (
+                CrawlJournal(journal_filename)
+                if journal_filename
+                else nullcontext()
+            ) as journal,
+            open_writer(
+                output_filename,
+                output_format,
+                is_resumed,
+                is_background_writer,
+                fsync,
+            ) as writer,
+        ):
+            failed_links = await crawl_reviews(
+                context,
+                links,
+                writer,
+                options,
+                journal,
+                is_resumed=is_resumed,
+            )
+    return failed_links
+
+
 def main() -> None:
     arg_parser = argparse.ArgumentParser(
         description="Get hotel reviews from a list of URLs from Google Travel",
@@ -164,6 +992,32 @@ def main() -> None:
         help="Path to output file, defaults to file containing current time",
         default=f"output/hotel-details-{int(time.time() * 1000)}.csv",
     )
+    arg_parser.add_argument(
+        "--format",
+        choices=["csv", "parquet", "raw"],
+        default="csv",
+        help="Output file format, raw being a CSV file of the review strings "
+        "as captured, to be parsed by normalize_reviews.py",
+    )
+    arg_parser.add_argument(
+        "--capture",
+        choices=["parsed", "raw"],
+        default="parsed",
+        help="Whether to parse reviews while crawling or to capture their "
+        "strings as they are and parse them in batches on the writer",
+    )
+    arg_parser.add_argument(
+        "--background-writer",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to write output on a background thread",
+    )
+    arg_parser.add_argument(
+        "--fsync",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to fsync the output file on every flush",
+    )
     arg_parser.add_argument(
         "--limit", type=int, help="Reviews limit by each hotel", required=True
     )
@@ -173,35 +1027,161 @@ def main() -> None:
         default=True,
         help="Whether to run browser in headless mode",
     )
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Number of hotels crawled at once, each in its own page",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Upper bound above --concurrency, if set, of the number of "
+        "hotels crawled at once, adjusted to page load latency, timeouts "
+        "and throttling",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--engine",
+        choices=["dom", "network"],
+        default="dom",
+        help="Whether to extract reviews from the rendered review panels or "
+        "from the responses the page fetches them from",
+    )
+    arg_parser.add_argument(
+        "--batched",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to extract each batch of review panels in a single "
+        "page.evaluate call instead of one locator call per field",
+    )
+    arg_parser.add_argument(
+        "--windowed",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to prune review panels from the page once extracted",
+    )
+    arg_parser.add_argument(
+        "--adaptive",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to wait for new review panels based on page activity "
+        "and observed latency instead of fixed delays",
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to skip hotels finished by a previous run, as recorded "
+        "in the journal, and append to the output file",
+    )
+    arg_parser.add_argument(
+        "--journal",
+        type=str,
+        help="Path to the crawl journal, defaults to the output file path "
+        "with a .journal extension",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--metrics",
+        type=str,
+        help="Path to export per-phase timings and counters to after every "
+        "hotel, metrics are only printed at the end if not specified",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--metrics-format",
+        choices=["prometheus", "jsonl"],
+        default="prometheus",
+        help="Metrics file format, a Prometheus textfile or JSON lines",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        type=str,
+        help="Directory to write a profile of every hotel crawl to",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="Profiler used by --profile",
+    )
+    arg_parser.add_argument(
+        "--resources",
+        choices=RESOURCE_PROFILES,
+        default="text-only",
+        help="Resource profile: text-only blocks images, media, fonts, map "
+        "tiles and third-party requests, details keeps images and full "
+        "blocks nothing",
+    )
+    arg_parser.add_argument(
+        "--cdp-endpoint",
+        type=str,
+        help="Endpoint of a running browser_daemon.py to attach to instead "
+        "of launching a new browser, e.g. " + DEFAULT_CDP_ENDPOINT,
+        default=None,
+    )
 
     args = arg_parser.parse_args()
 
     input_filename: str = args.input
     output_filename: str = args.output
-    limit: int = args.limit
     is_headless: bool = args.headless
+    output_format: str = args.format
+    is_background_writer: bool = args.background_writer
+    fsync: bool = args.fsync
+    is_resumed: bool = args.resume
+    if is_resumed and output_format == "parquet":
+        arg_parser.error("--resume cannot append to Parquet output")
+    if args.capture == "raw" and args.engine != "dom":
+        arg_parser.error("--capture raw requires --engine dom")
+    if output_format == "raw" and args.capture != "raw":
+        arg_parser.error("--format raw requires --capture raw")
+    journal_filename: str = args.journal or f"{output_filename}.journal"
+    options = ReviewCrawlOptions(
+        limit=args.limit,
+        concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+        batched=args.batched,
+        windowed=args.windowed,
+        adaptive=args.adaptive,
+        engine=args.engine,
+        capture=args.capture,
+        metrics_filename=args.metrics,
+        metrics_format=args.metrics_format,
+        profile_dirname=args.profile,
+        profiler=args.profiler,
+        resource_profile=args.resources,
+        cdp_endpoint=args.cdp_endpoint,
+    )
 
     print(f"Running in headless mode: {is_headless}", file=sys.stderr)
+    print(f"Crawling {options.concurrency} hotel(s) at once", file=sys.stderr)
+    print(f"Using {options.engine} engine", file=sys.stderr)
     print(f"Reading from {input_filename}", file=sys.stderr)
     print(f"Writing to {output_filename}", file=sys.stderr)
+    print(f"Journaling to {journal_filename}", file=sys.stderr)
 
-    with (
-        sync_playwright() as p,
-        p.chromium.launch(headless=is_headless) as browser,
-        browser.new_context() as context,
-        open(input_filename, "r", encoding="utf-8") as input_file,
-        ReviewCsvWriter(output_filename) as writer,
-    ):
-        hotel_page = context.new_page()
-        for line_number, link in enumerate(input_file):
-            try:
-                hotel_page.goto(link)
-                for reviews in get_reviews(hotel_page, limit):
-                    writer.append(reviews)
-                print(f"Processed {line_number + 1} hotels\n")
-            except Exception as e:
-                print(e)
-                continue
+    if not is_resumed and os.path.exists(journal_filename):
+        os.remove(journal_filename)
+
+    with open(input_filename, "r", encoding="utf-8") as input_file:
+        links = input_file.readlines()
+
+    asyncio.run(
+        run(
+            links,
+            output_filename,
+            is_headless,
+            options,
+            journal_filename,
+            is_resumed,
+            output_format,
+            is_background_writer,
+            fsync,
+        )
+    )
 
 
 if __name__ == "__main__":
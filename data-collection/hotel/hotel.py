@@ -6,6 +6,7 @@ class Hotel:
     # The site from which data are collected
     source: str
     name: str
-    address: str
-    images_count: int
-    popular_amenities: list[str]
+    # Left empty when not requested, see `get_hotel_details`
+    address: str | None = None
+    images_count: int | None = None
+    popular_amenities: list[str] | None = None
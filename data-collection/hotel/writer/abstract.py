@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from hotel.hotel import Hotel
 
@@ -7,3 +8,19 @@ class AbstractHotelWriter(ABC):
     @abstractmethod
     def append(self, hotel: Hotel) -> None:
         pass
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Pushes appended records to the underlying storage, and to the disk
+        itself with `fsync`.
+        """
+        pass
+
+    def after_flush(self, callback: Callable[[], None]) -> None:
+        """
+        Runs `callback` once every record appended so far has been flushed,
+        e.g. to mark them as done in the crawl journal so a crash cannot lose
+        them. Writers that flush asynchronously may defer the call.
+        """
+        self.flush()
+        callback()
@@ -0,0 +1,7 @@
+from crawl.background import BackgroundWriter
+from hotel import Hotel
+from hotel.writer import AbstractHotelWriter
+
+
+class BackgroundHotelWriter(BackgroundWriter[Hotel], AbstractHotelWriter):
+    pass
@@ -1,4 +1,5 @@
 import csv
+import os
 import sys
 from types import TracebackType
 from typing import Self, TextIO
@@ -21,16 +22,21 @@ class HotelCsvWriter(AbstractHotelWriter):
             "source",
         ]
 
-    def __init__(self, file_path: str | None = None) -> None:
+    def __init__(self, file_path: str | None = None, mode: str = "w") -> None:
+        """
+        Opens `file_path` for writing, or for appending with `mode="a"`, in
+        which case the header is only written if the file is empty.
+        """
         if file_path is not None:
-            self._f = open(file_path, "w", newline="", encoding="utf-8")
+            self._f = open(file_path, mode, newline="", encoding="utf-8")
             self._file_path = file_path
         else:
             self._f = sys.stdout
             self._file_path = "sys.stdout"
         self._is_closed = False
         self._writer = csv.writer(self._f, quoting=csv.QUOTE_NONNUMERIC)
-        self._writer.writerow(self._get_header_fields())
+        if mode != "a" or self._f.tell() == 0:
+            self._writer.writerow(self._get_header_fields())
 
     def __enter__(self) -> Self:
         return self
@@ -55,6 +61,14 @@ class HotelCsvWriter(AbstractHotelWriter):
             ]
         )
 
+    def flush(self, fsync: bool = False) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        self._f.flush()
+        if fsync and self._f is not sys.stdout:
+            os.fsync(self._f.fileno())
+
     def close(self) -> None:
         if not self._is_closed:
             self._f.close()
@@ -0,0 +1,137 @@
+import sys
+from types import TracebackType
+from typing import Any, Self
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from hotel import Hotel
+from hotel.writer import AbstractHotelWriter
+
+
+class HotelParquetWriter(AbstractHotelWriter):
+    """
+    Writes hotels to a Parquet file, with `popular_amenities` as a native
+    list column. Appended hotels are buffered and written as one row group
+    every `row_group_size` hotels.
+    """
+
+    _writer: pq.ParquetWriter
+    _file_path: str
+    _is_closed: bool = True
+
+    SCHEMA = pa.schema(
+        [
+            ("name", pa.string()),
+            ("address", pa.string()),
+            ("images_count", pa.int32()),
+            (
+                "popular_amenities",
+                pa.list_(pa.dictionary(pa.int16(), pa.string())),
+            ),
+            ("source", pa.dictionary(pa.int8(), pa.string())),
+        ]
+    )
+
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int = 65536,
+        compression: str = "zstd",
+    ) -> None:
+        self._file_path = file_path
+        self._row_group_size = row_group_size
+        self._writer = pq.ParquetWriter(
+            file_path, self.SCHEMA, compression=compression
+        )
+        self._columns = self._get_empty_columns()
+        self._buffered_rows = 0
+        self._is_closed = False
+
+    @classmethod
+    def _get_empty_columns(cls) -> dict[str, list[Any]]:
+        return {name: [] for name in cls.SCHEMA.names}
+
+    @classmethod
+    def merge(
+        cls,
+        file_paths: list[str],
+        output_file_path: str,
+        row_group_size: int = 65536,
+        compression: str = "zstd",
+    ) -> None:
+        """
+        Concatenates Parquet files written by this class, in order, into
+        row groups of `row_group_size` hotels, as if written at once.
+        """
+        with pq.ParquetWriter(
+            output_file_path, cls.SCHEMA, compression=compression
+        ) as writer:
+            # Hotels left over from a file are written with the next one,
+            # so that small files do not each end up as a small row group
+            pending = cls.SCHEMA.empty_table()
+            for file_path in file_paths:
+                pending = pa.concat_tables(
+                    [pending, pq.read_table(file_path, schema=cls.SCHEMA)]
+                )
+                while pending.num_rows >= row_group_size:
+                    writer.write_table(
+                        pending.slice(0, row_group_size),
+                        row_group_size=row_group_size,
+                    )
+                    pending = pending.slice(row_group_size)
+            if pending.num_rows:
+                writer.write_table(pending, row_group_size=row_group_size)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def _warn_closed(self) -> None:
+        print(
+            f"[ParquetHotelWriter] Warning: File {self._file_path} is closed",
+            file=sys.stderr,
+        )
+
+    def append(self, hotel: Hotel) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        self._columns["name"].append(hotel.name)
+        self._columns["address"].append(hotel.address)
+        self._columns["images_count"].append(hotel.images_count)
+        self._columns["popular_amenities"].append(hotel.popular_amenities)
+        self._columns["source"].append(hotel.source)
+        self._buffered_rows += 1
+        if self._buffered_rows >= self._row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self) -> None:
+        if not self._buffered_rows:
+            return
+        self._writer.write_batch(
+            pa.record_batch(self._columns, schema=self.SCHEMA),
+            row_group_size=self._row_group_size,
+        )
+        self._columns = self._get_empty_columns()
+        self._buffered_rows = 0
+
+    def flush(self, fsync: bool = False) -> None:
+        # Row groups only become readable once the footer is written on close,
+        # so writing them early would only fragment the file
+        pass
+
+    def close(self) -> None:
+        if not self._is_closed:
+            self._write_row_group()
+            self._writer.close()
+            self._is_closed = True
+        else:
+            self._warn_closed()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
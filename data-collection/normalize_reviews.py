@@ -0,0 +1,76 @@
+import argparse
+import datetime
+import sys
+import time
+
+from get_hotel_reviews import open_writer
+from review.normalize import normalize
+from review.writer.raw import RawReviewCsvWriter
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Parse reviews captured with get_hotel_reviews.py "
+        "--capture raw --format raw, without crawling them again",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "input",
+        type=str,
+        help="Path to raw reviews file",
+    )
+    arg_parser.add_argument(
+        "--output",
+        type=str,
+        help="Path to output file, defaults to file containing current time",
+        default=f"output/hotel-reviews-{int(time.time() * 1000)}.csv",
+    )
+    arg_parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output file format",
+    )
+    arg_parser.add_argument(
+        "--anchor",
+        type=datetime.datetime.fromisoformat,
+        help="Time to resolve relative review times against, e.g. "
+        "2024-05-01T12:00, instead of when each review was crawled",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of reviews parsed at once",
+        default=65536,
+    )
+    args = arg_parser.parse_args()
+
+    input_filename: str = args.input
+    output_filename: str = args.output
+    anchor: datetime.datetime | None = args.anchor
+
+    print(f"Reading from {input_filename}", file=sys.stderr)
+    print(f"Writing to {output_filename}", file=sys.stderr)
+
+    raw_reviews: int = 0
+    reviews: int = 0
+    with open_writer(
+        output_filename, args.format, is_resumed=False, is_background=False
+    ) as writer:
+        for raw_batch in RawReviewCsvWriter.read(
+            input_filename, args.batch_size
+        ):
+            batch = normalize(raw_batch, anchor)
+            writer.append(batch)
+            raw_reviews += len(raw_batch)
+            reviews += len(batch)
+    print(
+        f"Parsed {reviews} review(s) out of {raw_reviews}, skipping those "
+        "not made on Google",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import queue
+import sys
+import threading
+import time
+from typing import AsyncGenerator, Callable, Generator, Iterable
+from playwright.sync_api import sync_playwright
+
+from crawl import (
+    DEFAULT_CDP_ENDPOINT,
+    HotelFrontier,
+    Metrics,
+    open_browser_context,
+)
+from get_hotel_details import DETAIL_FIELDS, crawl_hotel_details
+from get_hotel_list import HotelListOptions, crawl_hotel_list
+from get_hotel_reviews import ReviewCrawlOptions, run as run_reviews
+
+# Marks the end of the hotel URLs in a stage queue
+END_OF_STREAM = None
+
+
+def put(
+    stage_queue: "queue.Queue[str | None]",
+    item: str | None,
+    stopped: threading.Event,
+) -> bool:
+    """
+    Puts `item` into `stage_queue`, blocking while it is full unless the
+    pipeline is stopped. Returns whether the item was put.
+    """
+    while not stopped.is_set():
+        try:
+            stage_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def iter_queue(
+    stage_queue: "queue.Queue[str | None]", stopped: threading.Event
+) -> Generator[str, None, None]:
+    while not stopped.is_set():
+        try:
+            item = stage_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        if item is END_OF_STREAM:
+            return
+        yield item
+
+
+async def aiter_queue(
+    stage_queue: "queue.Queue[str | None]", stopped: threading.Event
+) -> AsyncGenerator[str, None]:
+    """
+    Same as `iter_queue`, waiting on a thread so that the event loop keeps
+    running the crawls already started.
+    """
+    while not stopped.is_set():
+        try:
+            item = await asyncio.to_thread(stage_queue.get, timeout=1)
+        except queue.Empty:
+            continue
+        if item is END_OF_STREAM:
+            return
+        yield item
+
+
+def feed_stages(
+    hrefs: Iterable[str],
+    stage_queues: "list[queue.Queue[str | None]]",
+    stopped: threading.Event,
+    found_hotels: list[str] | None = None,
+    started: float | None = None,
+) -> None:
+    """
+    Feeds every hotel in `hrefs` to `stage_queues`, and `found_hotels` if
+    given, then ends the stream of each queue, until the pipeline stops.
+    """
+    started = started if started is not None else time.perf_counter()
+    hotels: int = 0
+    try:
+        for href in hrefs:
+            hotels += 1
+            if found_hotels is not None:
+                found_hotels.append(href)
+            if hotels == 1:
+                print(
+                    "Found first hotel after "
+                    f"{time.perf_counter() - started:.1f}s",
+                    file=sys.stderr,
+                )
+            for stage_queue in stage_queues:
+                if not put(stage_queue, href, stopped):
+                    return
+    finally:
+        for stage_queue in stage_queues:
+            put(stage_queue, END_OF_STREAM, stopped)
+
+
+def run_list_stage(
+    locations: list[str],
+    options: HotelListOptions,
+    is_headless: bool,
+    cdp_endpoint: str | None,
+    stage_queues: "list[queue.Queue[str | None]]",
+    stopped: threading.Event,
+    found_hotels: list[str] | None = None,
+) -> None:
+    visited_hotels: set[str] = set()
+    metrics = Metrics("hotel_list")
+    started = time.perf_counter()
+    try:
+        with (
+            sync_playwright() as p,
+            open_browser_context(p, is_headless, cdp_endpoint) as context,
+        ):
+            feed_stages(
+                crawl_hotel_list(
+                    context, locations, options, visited_hotels, metrics
+                ),
+                stage_queues,
+                stopped,
+                found_hotels,
+                started,
+            )
+    finally:
+        metrics.print_summary()
+
+
+# Stages return the links of the hotels they failed, if any
+Stage = Callable[[], list[str] | None]
+
+
+def run_stage(target: Stage, stopped: threading.Event) -> Stage:
+    """
+    Wraps a stage so that its failure stops the others, which would
+    otherwise wait forever on a queue nobody feeds or drains.
+    """
+
+    def wrapper() -> list[str] | None:
+        try:
+            return target()
+        except BaseException:
+            stopped.set()
+            raise
+
+    return wrapper
+
+
+def run_stages(stages: list[Stage], stopped: threading.Event) -> set[str]:
+    """
+    Runs every stage on a thread of its own until all of them are done, and
+    returns the links of the hotels any of them failed. Raises the first
+    stage failure once the other stages have stopped.
+    """
+    # Each stage drives its own browser, through its own playwright
+    # instance, as playwright objects cannot be shared between threads
+    with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+        futures: list[Future[list[str] | None]] = [
+            executor.submit(run_stage(stage, stopped)) for stage in stages
+        ]
+        failed_hotels: set[str] = set()
+        for future in futures:
+            failed_hotels.update(future.result() or ())
+    return failed_hotels
+
+
+def mark_done(
+    frontier_filename: str, found_hotels: list[str], failed_hotels: set[str]
+) -> None:
+    """
+    Marks the hotels found that no stage failed as done in the frontier, so
+    that `--only-new` gives failed ones another chance.
+    """
+    with HotelFrontier(frontier_filename) as frontier:
+        frontier.mark_done(
+            href for href in found_hotels if href not in failed_hotels
+        )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Get hotel details and reviews by locations in a single "
+        "run, crawling hotels as soon as the search results list them",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "locations",
+        nargs="+",
+        help="List of locations",
+    )
+    arg_parser.add_argument(
+        "--limit", type=int, help="Hotel limit by each location", required=True
+    )
+    arg_parser.add_argument(
+        "--reviews-limit",
+        type=int,
+        help="Reviews limit by each hotel",
+        required=True,
+    )
+    timestamp = int(time.time() * 1000)
+    arg_parser.add_argument(
+        "--details-output",
+        type=str,
+        help="Path to hotel details output file, details are not crawled "
+        "if empty",
+        default=f"output/hotel-details-{timestamp}.csv",
+    )
+    arg_parser.add_argument(
+        "--reviews-output",
+        type=str,
+        help="Path to hotel reviews output file, reviews are not crawled "
+        "if empty",
+        default=f"output/hotel-reviews-{timestamp}.csv",
+    )
+    arg_parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output file format",
+    )
+    arg_parser.add_argument(
+        "--fields",
+        nargs="+",
+        choices=DETAIL_FIELDS,
+        default=list(DETAIL_FIELDS),
+        help="Hotel fields to extract besides the name",
+    )
+    arg_parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to run browser in headless mode",
+    )
+    arg_parser.add_argument(
+        "--engine",
+        choices=["dom", "network"],
+        default="dom",
+        help="Whether to extract hotels and reviews from the rendered pages "
+        "or from the responses the pages fetch them from",
+    )
+    arg_parser.add_argument(
+        "--capture",
+        choices=["parsed", "raw"],
+        default="parsed",
+        help="Whether to parse reviews while crawling or to capture their "
+        "strings as they are and parse them in batches on the writer",
+    )
+    arg_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Number of hotels whose reviews are crawled at once",
+        default=1,
+    )
+    arg_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Upper bound above --concurrency, if set, of the number of "
+        "hotels whose reviews are crawled at once",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--frontier",
+        type=str,
+        help="Path to the index of hotels found across runs",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--only-new",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Whether to only crawl hotels not crawled by earlier runs",
+    )
+    arg_parser.add_argument(
+        "--queue-size",
+        type=int,
+        help="Number of hotel URLs each stage may lag behind the hotel list "
+        "before the list stage waits for it",
+        default=100,
+    )
+    arg_parser.add_argument(
+        "--cdp-endpoint",
+        type=str,
+        help="Endpoint of a running browser_daemon.py to attach to instead "
+        "of launching new browsers, e.g. " + DEFAULT_CDP_ENDPOINT,
+        default=None,
+    )
+    args = arg_parser.parse_args()
+
+    locations: list[str] = args.locations
+    details_filename: str = args.details_output
+    reviews_filename: str = args.reviews_output
+    output_format: str = args.format
+    is_headless: bool = args.headless
+    cdp_endpoint: str | None = args.cdp_endpoint
+    if not details_filename and not reviews_filename:
+        arg_parser.error("Nothing to crawl without any output")
+    if args.only_new and not args.frontier:
+        arg_parser.error("--only-new requires --frontier")
+    if args.capture == "raw" and args.engine != "dom":
+        arg_parser.error("--capture raw requires --engine dom")
+
+    print(f"Running in headless mode: {is_headless}", file=sys.stderr)
+    if details_filename:
+        print(f"Writing details to {details_filename}", file=sys.stderr)
+    if reviews_filename:
+        print(f"Writing reviews to {reviews_filename}", file=sys.stderr)
+
+    stopped = threading.Event()
+    details_queue: "queue.Queue[str | None]" = queue.Queue(args.queue_size)
+    reviews_queue: "queue.Queue[str | None]" = queue.Queue(args.queue_size)
+    stage_queues: "list[queue.Queue[str | None]]" = []
+    stages: list[Stage] = []
+    found_hotels: list[str] = []
+
+    if details_filename:
+        stage_queues.append(details_queue)
+        stages.append(
+            lambda: crawl_hotel_details(
+                iter_queue(details_queue, stopped),
+                details_filename,
+                is_headless,
+                output_format=output_format,
+                fields=tuple(args.fields),
+                cdp_endpoint=cdp_endpoint,
+            )
+        )
+    if reviews_filename:
+        stage_queues.append(reviews_queue)
+        review_options = ReviewCrawlOptions(
+            limit=args.reviews_limit,
+            concurrency=args.concurrency,
+            max_concurrency=args.max_concurrency,
+            engine=args.engine,
+            capture=args.capture,
+            cdp_endpoint=cdp_endpoint,
+        )
+        stages.append(
+            lambda: asyncio.run(
+                run_reviews(
+                    aiter_queue(reviews_queue, stopped),
+                    reviews_filename,
+                    is_headless,
+                    review_options,
+                    output_format=output_format,
+                )
+            )
+        )
+    list_options = HotelListOptions(
+        limit=args.limit,
+        engine=args.engine,
+        frontier_filename=args.frontier,
+        only_new=args.only_new,
+    )
+    stages.append(
+        lambda: run_list_stage(
+            locations,
+            list_options,
+            is_headless,
+            cdp_endpoint,
+            stage_queues,
+            stopped,
+            found_hotels,
+        )
+    )
+
+    started = time.perf_counter()
+    failed_hotels = run_stages(stages, stopped)
+    # Only once every stage is through with the hotels, none of them if a
+    # stage crashed
+    if args.frontier:
+        mark_done(args.frontier, found_hotels, failed_hotels)
+    print(
+        f"Finished in {time.perf_counter() - started:.1f}s", file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
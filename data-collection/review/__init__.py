@@ -1 +1,3 @@
 from review.review import Review
+from review.batch import ReviewBatch
+from review.raw import RawReviewBatch
@@ -0,0 +1,102 @@
+from array import array
+import datetime
+import sys
+from typing import Iterable, Iterator, Self
+
+from review.review import Review
+
+# Codes of trip types and companions, 0 being unknown
+TRIP_TYPES: tuple[str | None, ...] = (None, "Business", "Vacation")
+TRIP_COMPANIONS: tuple[str | None, ...] = (
+    None,
+    "Family",
+    "Friends",
+    "Couple",
+    "Solo",
+)
+_TRIP_TYPE_CODES = {trip_type: i for i, trip_type in enumerate(TRIP_TYPES)}
+_TRIP_COMPANION_CODES = {
+    companions: i for i, companions in enumerate(TRIP_COMPANIONS)
+}
+
+# Review timestamps are naive, so they are counted from a naive epoch to keep
+# their wall-clock time whatever the local time zone
+EPOCH = datetime.datetime(1970, 1, 1)
+MISSING_TIMESTAMP = -(2**63)
+
+
+def to_epoch(timestamp: datetime.datetime | None) -> int:
+    if timestamp is None:
+        return MISSING_TIMESTAMP
+    return int((timestamp - EPOCH).total_seconds())
+
+
+def from_epoch(seconds: int) -> datetime.datetime | None:
+    if seconds == MISSING_TIMESTAMP:
+        return None
+    return EPOCH + datetime.timedelta(seconds=seconds)
+
+
+class ReviewBatch:
+    """
+    Reviews stored column by column rather than as one object each: hotel
+    names are interned, so reviews of a hotel share a single string, while
+    ratings, timestamps (seconds since `EPOCH`) and trip details (codes into
+    `TRIP_TYPES` and `TRIP_COMPANIONS`) are packed into typed arrays.
+    """
+
+    __slots__ = (
+        "hotel_names",
+        "review_texts",
+        "ratings",
+        "review_timestamps",
+        "trip_types",
+        "trip_companions",
+    )
+
+    def __init__(self) -> None:
+        self.hotel_names: list[str] = []
+        self.review_texts: list[str] = []
+        self.ratings = array("f")
+        self.review_timestamps = array("q")
+        self.trip_types = bytearray()
+        self.trip_companions = bytearray()
+
+    @classmethod
+    def from_reviews(cls, reviews: Iterable[Review]) -> Self:
+        batch = cls()
+        for review in reviews:
+            batch.append(review)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.review_texts)
+
+    def append(self, review: Review) -> None:
+        self.hotel_names.append(sys.intern(review.hotel_name))
+        self.review_texts.append(review.review_text)
+        self.ratings.append(review.rating)
+        self.review_timestamps.append(to_epoch(review.review_timestamp))
+        self.trip_types.append(_TRIP_TYPE_CODES.get(review.trip_type, 0))
+        self.trip_companions.append(
+            _TRIP_COMPANION_CODES.get(review.trip_companions, 0)
+        )
+
+    def extend(self, batch: "ReviewBatch") -> None:
+        self.hotel_names.extend(batch.hotel_names)
+        self.review_texts.extend(batch.review_texts)
+        self.ratings.extend(batch.ratings)
+        self.review_timestamps.extend(batch.review_timestamps)
+        self.trip_types.extend(batch.trip_types)
+        self.trip_companions.extend(batch.trip_companions)
+
+    def __iter__(self) -> Iterator[Review]:
+        for i in range(len(self)):
+            yield Review(
+                hotel_name=self.hotel_names[i],
+                review_text=self.review_texts[i],
+                rating=self.ratings[i],
+                review_timestamp=from_epoch(self.review_timestamps[i]),
+                trip_type=TRIP_TYPES[self.trip_types[i]],
+                trip_companions=TRIP_COMPANIONS[self.trip_companions[i]],
+            )
@@ -0,0 +1,124 @@
+import calendar
+import datetime
+from functools import lru_cache
+
+from review.batch import (
+    TRIP_COMPANIONS,
+    TRIP_TYPES,
+    ReviewBatch,
+    from_epoch,
+    to_epoch,
+)
+from review.raw import RawReviewBatch
+
+_TIME_UNITS = ("seconds", "minutes", "hours", "days", "weeks")
+
+
+def subtract_months(
+    anchor: datetime.datetime, months: int
+) -> datetime.datetime:
+    """
+    Goes back `months` calendar months, clamping the day to the length of
+    the target month, e.g. 31 March minus a month is 28 or 29 February.
+    """
+    month_index = anchor.year * 12 + anchor.month - 1 - months
+    year, month = divmod(month_index, 12)
+    day = min(anchor.day, calendar.monthrange(year, month + 1)[1])
+    return anchor.replace(year=year, month=month + 1, day=day)
+
+
+def parse_review_time(
+    review_time: str, anchor: datetime.datetime
+) -> datetime.datetime | None:
+    """
+    Resolves a relative review time, e.g. "a month ago on Google", against
+    `anchor`, the time the review was crawled. Returns None for reviews not
+    made on Google.
+    """
+    review_time = review_time.strip()
+    if "Google" not in review_time:
+        return None
+
+    amount_str, unit = review_time.split()[:2]
+    amount = int(amount_str.replace("an", "1").replace("a", "1"))
+    if not unit.endswith("s"):
+        unit += "s"
+
+    if unit in _TIME_UNITS:
+        return anchor - datetime.timedelta(**{unit: amount})
+    if unit == "months":
+        return subtract_months(anchor, amount)
+    if unit == "years":
+        return subtract_months(anchor, amount * 12)
+    return anchor
+
+
+@lru_cache(maxsize=64)
+def parse_rating(rating: str) -> float:
+    # E.g. "4/5"
+    return float(rating.split("/")[0])
+
+
+@lru_cache(maxsize=256)
+def parse_trip_details(trip_details: str | None) -> tuple[int, int]:
+    """
+    Returns the codes of the trip type and companions in `trip_details`,
+    e.g. "Vacation ❘ Family", into `TRIP_TYPES` and `TRIP_COMPANIONS`.
+    """
+    trip_type, trip_companions = 0, 0
+    # Note that trip details is optional
+    for detail in (trip_details or "").split():
+        if detail in TRIP_TYPES:
+            trip_type = TRIP_TYPES.index(detail)
+        elif detail in TRIP_COMPANIONS:
+            trip_companions = TRIP_COMPANIONS.index(detail)
+    return trip_type, trip_companions
+
+
+def normalize(
+    raw: RawReviewBatch, anchor: datetime.datetime | None = None
+) -> ReviewBatch:
+    """
+    Parses a batch of raw reviews, dropping those not made on Google.
+    Relative times are resolved against `anchor` if given, otherwise against
+    when each review was crawled. Each distinct raw string is parsed once
+    per batch, as most reviews share a handful of relative times, ratings
+    and trip details.
+    """
+    batch = ReviewBatch()
+    times: dict[tuple[str, int], int | None] = {}
+    anchor_epoch = to_epoch(anchor) if anchor is not None else None
+
+    for hotel_name, review_time, text, rating, trip_details, crawled_at in zip(
+        raw.hotel_names,
+        raw.review_times,
+        raw.review_texts,
+        raw.ratings,
+        raw.trip_details,
+        raw.crawled_at,
+    ):
+        key = (
+            review_time,
+            anchor_epoch if anchor_epoch is not None else crawled_at,
+        )
+        if key not in times:
+            review_timestamp = parse_review_time(
+                review_time, from_epoch(key[1]) or datetime.datetime.now()
+            )
+            times[key] = (
+                to_epoch(review_timestamp)
+                if review_timestamp is not None
+                else None
+            )
+        seconds = times[key]
+        if seconds is None:
+            continue
+
+        trip_type, trip_companions = parse_trip_details(trip_details)
+        batch.hotel_names.append(hotel_name)
+        batch.review_texts.append(text)
+        batch.ratings.append(parse_rating(rating))
+        batch.review_timestamps.append(seconds)
+        batch.trip_types.append(trip_type)
+        batch.trip_companions.append(trip_companions)
+    return batch
@@ -0,0 +1,57 @@
+from array import array
+import sys
+from typing import Self
+
+
+class RawReviewBatch:
+    """
+    Reviews as read from the review panels, before any parsing, e.g.
+    "2 months ago on Google" or "4/5", along with when they were crawled
+    (seconds since `review.batch.EPOCH`) to resolve relative times against.
+    See `review.normalize` to turn them into a `ReviewBatch`.
+    """
+
+    __slots__ = (
+        "hotel_names",
+        "review_times",
+        "review_texts",
+        "ratings",
+        "trip_details",
+        "crawled_at",
+    )
+
+    def __init__(self) -> None:
+        self.hotel_names: list[str] = []
+        self.review_times: list[str] = []
+        self.review_texts: list[str] = []
+        self.ratings: list[str] = []
+        self.trip_details: list[str | None] = []
+        self.crawled_at = array("q")
+
+    def __len__(self) -> int:
+        return len(self.review_texts)
+
+    def append(
+        self,
+        hotel_name: str,
+        review_time: str,
+        review_text: str,
+        rating: str,
+        trip_details: str | None,
+        crawled_at: int,
+    ) -> None:
+        # Relative times and ratings repeat a lot, so they are interned too
+        self.hotel_names.append(sys.intern(hotel_name))
+        self.review_times.append(sys.intern(review_time))
+        self.review_texts.append(review_text)
+        self.ratings.append(sys.intern(rating))
+        self.trip_details.append(trip_details)
+        self.crawled_at.append(crawled_at)
+
+    def extend(self, batch: Self) -> None:
+        self.hotel_names.extend(batch.hotel_names)
+        self.review_times.extend(batch.review_times)
+        self.review_texts.extend(batch.review_texts)
+        self.ratings.extend(batch.ratings)
+        self.trip_details.extend(batch.trip_details)
+        self.crawled_at.extend(batch.crawled_at)
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Review:
     hotel_name: str = ""
     review_text: str = ""
@@ -1,9 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
-from review import Review
+from review import RawReviewBatch, Review, ReviewBatch
 
 
 class AbstractReviewWriter(ABC):
     @abstractmethod
-    def append(self, reviews: list[Review]) -> None:
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
+        """
+        Writes `reviews`. Raw reviews are normalized first, unless the
+        writer keeps them raw.
+        """
         pass
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Pushes appended records to the underlying storage, and to the disk
+        itself with `fsync`.
+        """
+        pass
+
+    def after_flush(self, callback: Callable[[], None]) -> None:
+        """
+        Runs `callback` once every record appended so far has been flushed,
+        e.g. to mark them as done in the crawl journal so a crash cannot lose
+        them. Writers that flush asynchronously may defer the call.
+        """
+        self.flush()
+        callback()
@@ -0,0 +1,10 @@
+from crawl.background import BackgroundWriter
+from review import RawReviewBatch, Review, ReviewBatch
+from review.writer import AbstractReviewWriter
+
+
+class BackgroundReviewWriter(
+    BackgroundWriter[list[Review] | ReviewBatch | RawReviewBatch],
+    AbstractReviewWriter,
+):
+    pass
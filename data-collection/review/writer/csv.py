@@ -1,10 +1,13 @@
 import csv
+import os
 import sys
 from types import TracebackType
-from typing import Any, Self, TextIO
+from typing import Any, Iterator, Self, TextIO
 
 from review.writer import AbstractReviewWriter
-from review import Review
+from review import RawReviewBatch, Review, ReviewBatch
+from review.batch import TRIP_COMPANIONS, TRIP_TYPES, from_epoch
+from review.normalize import normalize
 
 
 class ReviewCsvWriter(AbstractReviewWriter):
@@ -40,16 +43,21 @@ class ReviewCsvWriter(AbstractReviewWriter):
             review.trip_companions,
         ]
 
-    def __init__(self, file_path: str | None = None) -> None:
+    def __init__(self, file_path: str | None = None, mode: str = "w") -> None:
+        """
+        Opens `file_path` for writing, or for appending with `mode="a"`, in
+        which case the header is only written if the file is empty.
+        """
         if file_path is not None:
-            self._f = open(file_path, "w", newline="", encoding="utf-8")
+            self._f = open(file_path, mode, newline="", encoding="utf-8")
             self._file_path = file_path
         else:
             self._f = sys.stdout
             self._file_path = "sys.stdout"
         self._is_closed = False
         self._writer = csv.writer(self._f, quoting=csv.QUOTE_NONNUMERIC)
-        self._writer.writerow(self._get_header_fields())
+        if mode != "a" or self._f.tell() == 0:
+            self._writer.writerow(self._get_header_fields())
 
     def __enter__(self) -> Self:
         return self
@@ -60,14 +68,50 @@ class ReviewCsvWriter(AbstractReviewWriter):
             file=sys.stderr,
         )
 
-    def append(self, reviews: list[Review]) -> None:
+    @staticmethod
+    def _get_writable_rows(batch: ReviewBatch) -> Iterator[list[Any]]:
+        # Reads the columns directly instead of materializing reviews
+        for hotel_name, text, rating, seconds, trip_type, companions in zip(
+            batch.hotel_names,
+            batch.review_texts,
+            batch.ratings,
+            batch.review_timestamps,
+            batch.trip_types,
+            batch.trip_companions,
+        ):
+            timestamp = from_epoch(seconds)
+            yield [
+                hotel_name,
+                text.replace("\n", ""),
+                round(rating, 1),
+                timestamp.strftime("%Y-%m-%d") if timestamp else "",
+                TRIP_TYPES[trip_type],
+                TRIP_COMPANIONS[companions],
+            ]
+
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
         if self._is_closed:
             self._warn_closed()
             return
+        if isinstance(reviews, RawReviewBatch):
+            reviews = normalize(reviews)
+        if isinstance(reviews, ReviewBatch):
+            self._writer.writerows(self._get_writable_rows(reviews))
+            return
         self._writer.writerows(
             self._get_writable_row(review) for review in reviews
         )
 
+    def flush(self, fsync: bool = False) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        self._f.flush()
+        if fsync and self._f is not sys.stdout:
+            os.fsync(self._f.fileno())
+
     def close(self) -> None:
         if not self._is_closed:
             self._f.close()
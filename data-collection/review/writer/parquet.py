@@ -0,0 +1,146 @@
+import sys
+from types import TracebackType
+from typing import Self
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from review.writer import AbstractReviewWriter
+from review import RawReviewBatch, Review, ReviewBatch
+from review.batch import MISSING_TIMESTAMP, TRIP_COMPANIONS, TRIP_TYPES
+from review.normalize import normalize
+
+
+class ReviewParquetWriter(AbstractReviewWriter):
+    """
+    Writes reviews to a Parquet file. Appended reviews are buffered and
+    written as one row group every `row_group_size` reviews, with the
+    low-cardinality columns dictionary-encoded.
+    """
+
+    _writer: pq.ParquetWriter
+    _file_path: str
+    _is_closed: bool = True
+
+    SCHEMA = pa.schema(
+        [
+            ("hotel_name", pa.dictionary(pa.int32(), pa.string())),
+            ("review_text", pa.string()),
+            ("rating", pa.float32()),
+            ("review_timestamp", pa.timestamp("s")),
+            ("trip_type", pa.dictionary(pa.int8(), pa.string())),
+            ("trip_companions", pa.dictionary(pa.int8(), pa.string())),
+        ]
+    )
+
+    def __init__(
+        self,
+        file_path: str,
+        row_group_size: int = 65536,
+        compression: str = "zstd",
+    ) -> None:
+        self._file_path = file_path
+        self._row_group_size = row_group_size
+        self._writer = pq.ParquetWriter(
+            file_path, self.SCHEMA, compression=compression
+        )
+        self._batch = ReviewBatch()
+        self._is_closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def _warn_closed(self) -> None:
+        print(
+            f"[ParquetReviewWriter] Warning: File {self._file_path} is closed",
+            file=sys.stderr,
+        )
+
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        if isinstance(reviews, RawReviewBatch):
+            reviews = normalize(reviews)
+        if isinstance(reviews, ReviewBatch):
+            self._batch.extend(reviews)
+        else:
+            for review in reviews:
+                self._batch.append(review)
+        if len(self._batch) >= self._row_group_size:
+            self._write_row_group()
+
+    @staticmethod
+    def _get_codes_array(
+        codes: bytearray, values: tuple[str | None, ...]
+    ) -> pa.DictionaryArray:
+        # Code 0 stands for a missing value, which the dictionary leaves out
+        indices = pa.Array.from_buffers(
+            pa.int8(), len(codes), [None, pa.py_buffer(codes)]
+        )
+        indices = pc.if_else(
+            pc.equal(indices, 0), None, pc.subtract(indices, 1)
+        ).cast(pa.int8())
+        return pa.DictionaryArray.from_arrays(
+            indices, pa.array(values[1:], pa.string())
+        )
+
+    def _to_record_batch(self, batch: ReviewBatch) -> pa.RecordBatch:
+        # Typed arrays are handed to Arrow as they are, without a copy
+        ratings = pa.Array.from_buffers(
+            pa.float32(), len(batch), [None, pa.py_buffer(batch.ratings)]
+        )
+        timestamps = pa.Array.from_buffers(
+            pa.int64(),
+            len(batch),
+            [None, pa.py_buffer(batch.review_timestamps)],
+        )
+        timestamps = pc.if_else(
+            pc.equal(timestamps, MISSING_TIMESTAMP), None, timestamps
+        )
+        return pa.record_batch(
+            [
+                pa.array(batch.hotel_names, pa.string()).dictionary_encode(),
+                pc.replace_substring(
+                    pa.array(batch.review_texts, pa.string()), "\n", ""
+                ),
+                pc.round(ratings, 1),
+                timestamps.cast(pa.timestamp("s")),
+                self._get_codes_array(batch.trip_types, TRIP_TYPES),
+                self._get_codes_array(batch.trip_companions, TRIP_COMPANIONS),
+            ],
+            schema=self.SCHEMA,
+        )
+
+    def _write_row_group(self) -> None:
+        if not len(self._batch):
+            return
+        self._writer.write_batch(
+            self._to_record_batch(self._batch),
+            row_group_size=self._row_group_size,
+        )
+        self._batch = ReviewBatch()
+
+    def flush(self, fsync: bool = False) -> None:
+        # Row groups only become readable once the footer is written on close,
+        # so writing them early would only fragment the file
+        pass
+
+    def close(self) -> None:
+        if not self._is_closed:
+            self._write_row_group()
+            self._writer.close()
+            self._is_closed = True
+        else:
+            self._warn_closed()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
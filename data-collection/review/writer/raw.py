@@ -0,0 +1,125 @@
+import csv
+import os
+import sys
+from types import TracebackType
+from typing import Iterator, Self, TextIO
+
+from review.writer import AbstractReviewWriter
+from review import RawReviewBatch, Review, ReviewBatch
+
+
+class RawReviewCsvWriter(AbstractReviewWriter):
+    """
+    Writes raw reviews to a CSV file with their strings as captured, so that
+    they can be parsed again, see `normalize_reviews.py`, without crawling
+    them again.
+    """
+
+    _f: TextIO
+    _file_path: str
+    _is_closed: bool = True
+
+    @staticmethod
+    def _get_header_fields() -> list[str]:
+        return [
+            "hotel_name",
+            "review_time",
+            "review_text",
+            "rating",
+            "trip_details",
+            "crawled_at",
+        ]
+
+    def __init__(self, file_path: str | None = None, mode: str = "w") -> None:
+        """
+        Opens `file_path` for writing, or for appending with `mode="a"`, in
+        which case the header is only written if the file is empty.
+        """
+        if file_path is not None:
+            self._f = open(file_path, mode, newline="", encoding="utf-8")
+            self._file_path = file_path
+        else:
+            self._f = sys.stdout
+            self._file_path = "sys.stdout"
+        self._is_closed = False
+        self._writer = csv.writer(self._f)
+        if mode != "a" or self._f.tell() == 0:
+            self._writer.writerow(self._get_header_fields())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def _warn_closed(self) -> None:
+        print(
+            f"[RawReviewCsvWriter] Warning: File {self._file_path} is closed",
+            file=sys.stderr,
+        )
+
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        if not isinstance(reviews, RawReviewBatch):
+            raise TypeError("Only raw reviews can be written as raw")
+        # Newlines are kept, the csv module quotes them
+        self._writer.writerows(
+            zip(
+                reviews.hotel_names,
+                reviews.review_times,
+                reviews.review_texts,
+                reviews.ratings,
+                (trip or "" for trip in reviews.trip_details),
+                reviews.crawled_at,
+            )
+        )
+
+    @classmethod
+    def read(
+        cls, file_path: str, batch_size: int = 65536
+    ) -> Iterator[RawReviewBatch]:
+        """
+        Reads back a file written by this writer, `batch_size` reviews at
+        a time.
+        """
+        with open(file_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            batch = RawReviewBatch()
+            for row in reader:
+                batch.append(
+                    row["hotel_name"],
+                    row["review_time"],
+                    row["review_text"],
+                    row["rating"],
+                    row["trip_details"] or None,
+                    int(row["crawled_at"]),
+                )
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = RawReviewBatch()
+            if len(batch):
+                yield batch
+
+    def flush(self, fsync: bool = False) -> None:
+        if self._is_closed:
+            self._warn_closed()
+            return
+        self._f.flush()
+        if fsync and self._f is not sys.stdout:
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if not self._is_closed:
+            self._f.close()
+            self._is_closed = True
+        else:
+            self._warn_closed()
+
+    def __exit__(
+        self,
+        __exc_type: type[BaseException] | None,
+        __exc_value: BaseException | None,
+        __traceback: TracebackType | None,
+    ) -> bool | None:
+        self.close()
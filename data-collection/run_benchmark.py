@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import (
+    async_playwright,
+    BrowserContext as AsyncBrowserContext,
+)
+from playwright.sync_api import sync_playwright, expect, BrowserContext, Page
+
+from benchmark import BenchmarkReport, FixtureServer, StageResult
+from benchmark.report import RssSampler, get_commit, get_peak_rss_mb
+from crawl import Metrics
+from get_hotel_details import get_hotel_details
+from get_hotel_list import get_hotel_urls
+from get_hotel_reviews import (
+    AdaptiveWait,
+    ReviewCrawlOptions,
+    crawl_reviews,
+    get_reviews,
+)
+from review import RawReviewBatch, Review, ReviewBatch
+from review.writer import AbstractReviewWriter
+
+HOTELS_FILENAME = "hotels.txt"
+# Snapshots hold every panel they were saved with and never load more, so the
+# quiet period that ends each hotel's review list is pure waiting offline
+OFFLINE_QUIET_MS = 100
+
+# Scripts are stripped from saved pages so the snapshot stays as captured
+# instead of being re-rendered, or emptied, by the page's own code
+STRIP_SCRIPTS_SCRIPT = """
+() => document.querySelectorAll("script").forEach((elem) => elem.remove())
+"""
+# Without scripts the next page button would do nothing when clicked, so it
+# is removed for the hotel list to end on the saved page
+STRIP_NEXT_PAGE_SCRIPT = """
+() => document
+    .querySelectorAll("button[jsname='OCpkoe']")
+    .forEach((elem) => elem.remove())
+"""
+
+
+class CountingReviewWriter(AbstractReviewWriter):
+    """
+    Discards reviews, only counting them, so that the benchmark measures the
+    scrapers rather than the disk.
+    """
+
+    count: int = 0
+
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
+        self.count += len(reviews)
+
+
+class StageMetrics(Metrics):
+    """
+    Also keeps how long each hotel took, as crawled by `crawl_reviews`, for
+    the stage's page latency percentiles.
+    """
+
+    def __init__(self, stage: StageResult) -> None:
+        super().__init__("benchmark")
+        self._stage = stage
+
+    def observe(self, phase: str, seconds: float) -> None:
+        super().observe(phase, seconds)
+        if phase == "hotel":
+            self._stage.page_latencies.append(seconds)
+            self._stage.pages += 1
+
+
+def get_snapshot_path(snapshots_dir: str, stage: str, url: str) -> str:
+    url_path = urlsplit(url).path.strip("/")
+    return os.path.join(snapshots_dir, stage, f"{url_path}.html")
+
+
+def save_snapshot(content: str, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def keep_offline(context: BrowserContext, origin: str) -> None:
+    # Anything not served by the fixture server, e.g. fonts or analytics, is
+    # aborted to keep runs deterministic and offline
+    context.route(
+        "**/*",
+        lambda route: (
+            route.continue_()
+            if route.request.url.startswith(origin)
+            else route.abort()
+        ),
+    )
+
+
+async def keep_offline_async(context: AsyncBrowserContext, origin: str) -> None:
+    # The async API awaits the coroutine returned by the handler
+    await context.route(
+        "**/*",
+        lambda route: (
+            route.continue_()
+            if route.request.url.startswith(origin)
+            else route.abort()
+        ),
+    )
+
+
+def get_search_url(location: str) -> str:
+    return f"https://google.com/travel/search?q=hotels in {location}&hl=en"
+
+
+def record_sync_stages(
+    snapshots_dir: str, location: str, limit: int, is_headless: bool
+) -> list[str]:
+    with (
+        sync_playwright() as p,
+        p.chromium.launch(headless=is_headless, timeout=5000) as browser,
+        browser.new_context() as context,
+    ):
+        page = context.new_page()
+        search_url = get_search_url(location)
+        page.goto(search_url)
+        expect(page.locator(".Zvwhrc").nth(0)).to_be_visible()
+        # Only the first result page is saved, which must hold `limit` hotels
+        hotel_urls = list(get_hotel_urls(page, limit, set()))
+        page.goto(search_url)
+        expect(page.locator(".Zvwhrc").nth(0)).to_be_visible()
+        page.evaluate(STRIP_SCRIPTS_SCRIPT)
+        page.evaluate(STRIP_NEXT_PAGE_SCRIPT)
+        save_snapshot(
+            page.content(), get_snapshot_path(snapshots_dir, "list", search_url)
+        )
+
+        for url in hotel_urls:
+            page.goto(url)
+            get_hotel_details(page)
+            page.evaluate(STRIP_SCRIPTS_SCRIPT)
+            save_snapshot(
+                page.content(), get_snapshot_path(snapshots_dir, "details", url)
+            )
+    return hotel_urls
+
+
+async def record_reviews_stage(
+    snapshots_dir: str, hotel_urls: list[str], limit: int, is_headless: bool
+) -> None:
+    async with (
+        async_playwright() as p,
+        await p.chromium.launch(headless=is_headless) as browser,
+        await browser.new_context() as context,
+    ):
+        page = await context.new_page()
+        for url in hotel_urls:
+            await page.goto(url)
+            # Panels are kept in the page so that they can be saved
+            async for _ in get_reviews(
+                page, limit, windowed=False, adaptive_wait=AdaptiveWait()
+            ):
+                pass
+            await page.evaluate(STRIP_SCRIPTS_SCRIPT)
+            save_snapshot(
+                await page.content(),
+                get_snapshot_path(snapshots_dir, "reviews", url),
+            )
+
+
+def record(args: argparse.Namespace) -> None:
+    hotel_urls = record_sync_stages(
+        args.snapshots, args.location, args.limit, args.headless
+    )
+    asyncio.run(
+        record_reviews_stage(
+            args.snapshots, hotel_urls, args.reviews_limit, args.headless
+        )
+    )
+    with open(
+        os.path.join(args.snapshots, HOTELS_FILENAME), "w", encoding="utf-8"
+    ) as f:
+        f.writelines(f"{url}\n" for url in hotel_urls)
+    print(f"Saved snapshots of {len(hotel_urls)} hotels", file=sys.stderr)
+
+
+def run_sync_stages(
+    server: FixtureServer,
+    hotel_urls: list[str],
+    location: str,
+    limit: int,
+    is_headless: bool,
+) -> list[StageResult]:
+    list_stage = StageResult("list")
+    details_stage = StageResult("details")
+
+    with (
+        sync_playwright() as p,
+        p.chromium.launch(headless=is_headless, timeout=5000) as browser,
+        browser.new_context() as context,
+    ):
+        keep_offline(context, server.origin)
+        page: Page = context.new_page()
+
+        with RssSampler() as sampler:
+            started = time.perf_counter()
+            page.goto(server.to_local_url(get_search_url(location), "list"))
+            list_stage.items = len(list(get_hotel_urls(page, limit, set())))
+            list_stage.elapsed = time.perf_counter() - started
+        list_stage.pages = 1
+        list_stage.page_latencies.append(list_stage.elapsed)
+        list_stage.peak_rss_mb = sampler.peak_mb
+
+        with RssSampler() as sampler:
+            started = time.perf_counter()
+            for url in hotel_urls:
+                page_started = time.perf_counter()
+                page.goto(server.to_local_url(url, "details"))
+                get_hotel_details(page)
+                details_stage.page_latencies.append(
+                    time.perf_counter() - page_started
+                )
+                details_stage.items += 1
+                details_stage.pages += 1
+            details_stage.elapsed = time.perf_counter() - started
+        details_stage.peak_rss_mb = sampler.peak_mb
+
+    return [list_stage, details_stage]
+
+
+async def run_reviews_stage(
+    server: FixtureServer,
+    hotel_urls: list[str],
+    limit: int,
+    concurrency: int,
+    is_headless: bool,
+    quiet_ms: float = OFFLINE_QUIET_MS,
+) -> StageResult:
+    reviews_stage = StageResult("reviews")
+    writer = CountingReviewWriter()
+
+    async with (
+        async_playwright() as p,
+        await p.chromium.launch(headless=is_headless) as browser,
+        await browser.new_context() as context,
+    ):
+        await keep_offline_async(context, server.origin)
+        options = ReviewCrawlOptions(
+            limit=limit,
+            concurrency=max(concurrency, 1),
+            initial_quiet_ms=quiet_ms,
+            min_quiet_ms=quiet_ms,
+            # Snapshots are served from a local, thus third-party, origin
+            # which the other profiles would block
+            resource_profile="full",
+        )
+        with RssSampler() as sampler:
+            started = time.perf_counter()
+            await crawl_reviews(
+                context,
+                [server.to_local_url(url, "reviews") for url in hotel_urls],
+                writer,
+                options,
+                metrics=StageMetrics(reviews_stage),
+            )
+            reviews_stage.elapsed = time.perf_counter() - started
+        reviews_stage.peak_rss_mb = sampler.peak_mb
+
+    reviews_stage.items = writer.count
+    return reviews_stage
+
+
+def run(args: argparse.Namespace) -> None:
+    with open(
+        os.path.join(args.snapshots, HOTELS_FILENAME), "r", encoding="utf-8"
+    ) as f:
+        hotel_urls = [url.strip() for url in f if url.strip()]
+
+    options: dict[str, Any] = {
+        "snapshots": args.snapshots,
+        "hotels": len(hotel_urls),
+        "limit": args.limit,
+        "reviews_limit": args.reviews_limit,
+        "concurrency": args.concurrency,
+        "quiet_ms": args.quiet_ms,
+    }
+    report = BenchmarkReport(commit=get_commit(), options=options)
+
+    with FixtureServer(args.snapshots) as server:
+        report.stages.extend(
+            run_sync_stages(
+                server, hotel_urls, args.location, args.limit, args.headless
+            )
+        )
+        report.stages.append(
+            asyncio.run(
+                run_reviews_stage(
+                    server,
+                    hotel_urls,
+                    args.reviews_limit,
+                    args.concurrency,
+                    args.headless,
+                    args.quiet_ms,
+                )
+            )
+        )
+    report.peak_rss_mb = get_peak_rss_mb()
+
+    report.print_table(sys.stderr)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            report.write_json_line(f)
+    else:
+        print(json.dumps(report.to_dict(), indent=4))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark the scrapers offline against saved snapshots "
+        "of Google Travel pages served from a local HTTP server",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    arg_parser.add_argument(
+        "--snapshots",
+        type=str,
+        help="Path to the snapshot directory",
+        default="benchmark/snapshots",
+    )
+    arg_parser.add_argument(
+        "--location",
+        type=str,
+        help="Location searched for the hotel list",
+        default="Hanoi",
+    )
+    arg_parser.add_argument(
+        "--limit", type=int, help="Number of hotels", default=10
+    )
+    arg_parser.add_argument(
+        "--reviews-limit",
+        type=int,
+        help="Reviews limit by each hotel",
+        default=100,
+    )
+    arg_parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Whether to run browser in headless mode",
+    )
+    subparsers = arg_parser.add_subparsers(required=True)
+
+    record_parser = subparsers.add_parser(
+        "record",
+        help="Save snapshots of live pages into the snapshot directory",
+    )
+    record_parser.set_defaults(func=record)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run the scrapers against the saved snapshots"
+    )
+    run_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Number of hotels crawled at once by the reviews stage",
+        default=1,
+    )
+    run_parser.add_argument(
+        "--quiet-ms",
+        type=float,
+        help="Milliseconds without any change after which a hotel's review "
+        "list is considered exhausted. Snapshots never load more reviews, so "
+        "this is waited once per hotel and counted in its page latency",
+        default=OFFLINE_QUIET_MS,
+    )
+    run_parser.add_argument(
+        "--output",
+        type=str,
+        help="File to append results to as JSON lines, so that runs can be "
+        "compared across commits, defaults to console if not specified",
+        default="",
+    )
+    run_parser.set_defaults(func=run)
+
+    args = arg_parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
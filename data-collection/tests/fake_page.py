@@ -0,0 +1,186 @@
+from typing import Any
+
+from get_hotel_reviews import (
+    EXTRACT_PANELS_SCRIPT,
+    NEW_REVIEW_PANEL_SELECTOR,
+    PRUNE_PANELS_SCRIPT,
+    WAIT_FOR_PANELS_SCRIPT,
+    PanelRecord,
+)
+
+
+def make_record(
+    time: str = "2 days ago on Google",
+    text: str = "",
+    rating: str = "5/5",
+    trip: str | None = None,
+) -> PanelRecord:
+    return {"time": time, "text": text, "rating": rating, "trip": trip}
+
+
+class FakeLocator:
+    def __init__(self, page: "FakePage", selector: str) -> None:
+        self._page = page
+        self._selector = selector
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self
+
+    async def inner_text(self) -> str:
+        return self._page.hotel_name
+
+    async def click(self) -> None:
+        pass
+
+    async def count(self) -> int:
+        return self._page.count(self._selector)
+
+
+class FakeKeyboard:
+    def __init__(self, page: "FakePage") -> None:
+        self._page = page
+
+    async def press(self, key: str, delay: float = 0) -> None:
+        if key == "End":
+            self._page.scroll()
+
+
+class FakeResponse:
+    status = 200
+
+
+class FakePage:
+    """
+    Stands in for a hotel page whose review list loads `page_size` more
+    panels of `records` every time it is scrolled to the end, answering the
+    scripts `get_review_records` evaluates.
+    """
+
+    def __init__(
+        self,
+        records: list[PanelRecord],
+        page_size: int = 10,
+        hotel_name: str = "Hotel",
+    ) -> None:
+        self.records = records
+        self.page_size = page_size
+        self.hotel_name = hotel_name
+        self.url = "about:blank"
+        self.keyboard = FakeKeyboard(self)
+        self.loaded = 0
+        self.pruned = 0
+        self.extracted = 0
+        self.is_closed = False
+
+    def scroll(self) -> None:
+        self.loaded = min(self.loaded + self.page_size, len(self.records))
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(self, selector)
+
+    def count(self, selector: str) -> int:
+        if selector == NEW_REVIEW_PANEL_SELECTOR:
+            return self.loaded - self.pruned
+        return self.loaded
+
+    async def evaluate(self, script: str, args: list[Any]) -> Any:
+        if script == WAIT_FOR_PANELS_SCRIPT:
+            selector, start = args[:2]
+            return 0 if self.count(selector) > start else -1
+        if script == EXTRACT_PANELS_SCRIPT:
+            selector, start = args
+            first = self.pruned if selector == NEW_REVIEW_PANEL_SELECTOR else 0
+            records = self.records[first : self.loaded][start:]
+            self.extracted += len(records)
+            return [dict(record) for record in records]
+        if script == PRUNE_PANELS_SCRIPT:
+            self.pruned += args[2]
+            return None
+        raise AssertionError("Unexpected script")
+
+    async def goto(self, url: str) -> FakeResponse:
+        self.url = url
+        self.loaded = 0
+        self.pruned = 0
+        return FakeResponse()
+
+    async def route(self, *args: Any) -> None:
+        pass
+
+    def on(self, *args: Any) -> None:
+        pass
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+class FakeContext:
+    """
+    Opens `FakePage`s whose review lists all hold `records`, keeping track
+    of how many are open at once.
+    """
+
+    def __init__(self, records: list[PanelRecord], page_size: int = 10) -> None:
+        self.records = records
+        self.page_size = page_size
+        self.pages: list[FakePage] = []
+        self.max_open_pages = 0
+
+    @property
+    def open_pages(self) -> int:
+        return sum(not page.is_closed for page in self.pages)
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self.records, self.page_size)
+        self.pages.append(page)
+        self.max_open_pages = max(self.max_open_pages, self.open_pages)
+        return page
+
+
+class FakeDetailsLocator:
+    def __init__(self, page: "FakeDetailsPage", selector: str) -> None:
+        self._page = page
+        self._selector = selector
+
+    @property
+    def first(self) -> "FakeDetailsLocator":
+        return self
+
+    def nth(self, index: int) -> "FakeDetailsLocator":
+        return self
+
+    def filter(self, **kwargs: Any) -> "FakeDetailsLocator":
+        return self
+
+    def locator(self, selector: str) -> "FakeDetailsLocator":
+        return FakeDetailsLocator(self._page, selector)
+
+    def inner_text(self) -> str:
+        return self._page.texts[self._selector]
+
+    def click(self) -> None:
+        self._page.clicked.append(self._selector)
+
+    def all(self) -> list["FakeDetailsLocator"]:
+        return []
+
+
+class FakeDetailsPage:
+    """
+    Stands in for a hotel page as `get_hotel_details` reads it, answering
+    inner texts by selector and keeping track of the tabs clicked.
+    """
+
+    def __init__(self, name: str = "Hotel", address: str = "Address") -> None:
+        self.texts = {"heading": name, ".GtAk2e": address}
+        self.clicked: list[str] = []
+
+    def locator(self, selector: str) -> FakeDetailsLocator:
+        return FakeDetailsLocator(self, selector)
+
+    def get_by_role(self, role: str) -> FakeDetailsLocator:
+        return FakeDetailsLocator(self, role)
+
+    def get_by_label(self, label: str) -> FakeDetailsLocator:
+        return FakeDetailsLocator(self, label)
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Callable
+
+import pytest
+
+from crawl.background import BackgroundWriter
+
+
+class RecordingWriter:
+    """
+    Records every call made by the background thread, optionally holding
+    appends until `gate` is set.
+    """
+
+    def __init__(self, error: BaseException | None = None) -> None:
+        self.events: list[tuple] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = error
+        self.is_closed = False
+
+    def append(self, record: int) -> None:
+        self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        self.events.append(("append", record))
+
+    def flush(self, fsync: bool = False) -> None:
+        self.events.append(("flush", fsync))
+
+    def close(self) -> None:
+        self.is_closed = True
+
+    @property
+    def flushes(self) -> int:
+        return sum(event[0] == "flush" for event in self.events)
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_flushes_once_enough_records_are_pending():
+    writer = RecordingWriter()
+    with BackgroundWriter(writer, flush_records=3, flush_interval=60) as bw:
+        for record in range(5):
+            bw.append(record)
+        assert wait_until(lambda: writer.flushes == 1)
+        time.sleep(0.1)
+        # The last two records wait for the next flush
+        assert writer.flushes == 1
+        assert writer.events[3] == ("flush", False)
+    assert writer.flushes == 2
+    assert writer.is_closed
+
+
+def test_flushes_after_the_interval():
+    writer = RecordingWriter()
+    with BackgroundWriter(
+        writer, flush_records=1000, flush_interval=0.05
+    ) as bw:
+        bw.append(1)
+        assert wait_until(lambda: writer.flushes == 1, timeout=2)
+        assert writer.events == [("append", 1), ("flush", False)]
+
+
+def test_append_blocks_while_the_queue_is_full():
+    writer = RecordingWriter()
+    writer.gate.clear()
+    with BackgroundWriter(writer, max_pending=2) as bw:
+        # One record held by the writer, two queued and one blocked
+        appending = threading.Thread(
+            target=lambda: [bw.append(record) for record in range(4)]
+        )
+        appending.start()
+        time.sleep(0.2)
+        assert appending.is_alive()
+        writer.gate.set()
+        appending.join(timeout=5)
+        assert not appending.is_alive()
+    assert [event[1] for event in writer.events[:4]] == [0, 1, 2, 3]
+
+
+def test_callbacks_run_after_the_records_before_them_are_flushed():
+    writer = RecordingWriter()
+    with BackgroundWriter(writer, flush_records=1000, flush_interval=60) as bw:
+        bw.append(1)
+        bw.after_flush(lambda: writer.events.append(("callback", 1)))
+        bw.append(2)
+        bw.after_flush(lambda: writer.events.append(("callback", 2)))
+        bw.flush(fsync=True)
+        assert writer.events == [
+            ("append", 1),
+            ("append", 2),
+            ("flush", True),
+            ("callback", 1),
+            ("callback", 2),
+        ]
+        bw.after_flush(lambda: writer.events.append(("callback", 3)))
+        time.sleep(0.1)
+        assert writer.events[-1] == ("callback", 2)
+    assert writer.events[-2:] == [("flush", False), ("callback", 3)]
+
+
+def test_writer_errors_are_raised_on_close():
+    writer = RecordingWriter(OSError("Disk full"))
+    bw = BackgroundWriter(writer)
+    bw.after_flush(lambda: writer.events.append(("callback", 1)))
+    bw.append(1)
+    with pytest.raises(RuntimeError) as exc_info:
+        bw.close()
+    assert isinstance(exc_info.value.__cause__, OSError)
+    # Nothing written is reported as flushed
+    assert ("callback", 1) not in writer.events
+    assert writer.is_closed
+    with pytest.raises(RuntimeError):
+        bw.append(2)
@@ -0,0 +1,137 @@
+import argparse
+import io
+import json
+import os
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pytest
+
+import asyncio
+import subprocess
+import sys
+
+from benchmark import BenchmarkReport, FixtureServer, StageResult
+from benchmark.report import RssSampler, get_process_tree_rss, percentile
+from fake_page import FakeContext, make_record
+from get_hotel_reviews import ReviewCrawlOptions, crawl_reviews
+from run_benchmark import (
+    HOTELS_FILENAME,
+    CountingReviewWriter,
+    StageMetrics,
+    get_search_url,
+    get_snapshot_path,
+)
+
+SNAPSHOTS_DIR = os.path.join(
+    os.path.dirname(__file__), "fixtures", "benchmark"
+)
+
+
+def get_hotel_urls() -> list[str]:
+    with open(os.path.join(SNAPSHOTS_DIR, HOTELS_FILENAME)) as f:
+        return [url.strip() for url in f if url.strip()]
+
+
+def is_chromium_installed() -> bool:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return os.path.exists(p.chromium.executable_path)
+
+
+def test_fixture_serves_every_stage():
+    pages = [("list", get_search_url("Hanoi"))] + [
+        (stage, url)
+        for url in get_hotel_urls()
+        for stage in ("details", "reviews")
+    ]
+    with FixtureServer(SNAPSHOTS_DIR) as server:
+        for stage, url in pages:
+            path = get_snapshot_path(SNAPSHOTS_DIR, stage, url)
+            assert os.path.exists(path)
+            # Browsers escape the spaces of the search query themselves
+            local_url = quote(server.to_local_url(url, stage), safe=":/?=&")
+            with urlopen(local_url) as response:
+                assert response.status == 200
+
+
+def test_report_round_trip():
+    stage = StageResult("reviews", items=20, pages=2, elapsed=4.0)
+    stage.page_latencies.extend([1.0, 3.0])
+    stage.peak_rss_mb = 512.0
+    report = BenchmarkReport("abc1234", {"hotels": 2}, [stage], 64.0)
+    f = io.StringIO()
+    report.write_json_line(f)
+    line = json.loads(f.getvalue())
+    assert line["stages"]["reviews"]["items_per_s"] == 5.0
+    assert line["stages"]["reviews"]["p50_page_s"] == 2.0
+    assert line["stages"]["reviews"]["peak_rss_mb"] == 512.0
+    assert percentile([1.0, 3.0], 95) == pytest.approx(2.9)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="No /proc")
+def test_rss_sampler_counts_live_children():
+    # A child holding 100 MB, alive while sampled
+    child = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; data = b'x' * 100 * 2**20; print(flush=True); "
+            "sys.stdin.read()",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        assert child.stdout is not None
+        child.stdout.readline()
+        assert get_process_tree_rss(child.pid) >= 100 * 2**20
+        with RssSampler(interval=0.01) as sampler:
+            pass
+    finally:
+        child.communicate(b"")
+    assert sampler.peak_mb >= 100
+
+
+def test_reviews_stage_times_every_hotel():
+    # The reviews stage drives `crawl_reviews` itself, timed per hotel
+    stage = StageResult("reviews")
+    writer = CountingReviewWriter()
+    links = [f"https://hotel/{i}" for i in range(3)]
+    asyncio.run(
+        crawl_reviews(
+            FakeContext([make_record() for _ in range(4)]),  # type: ignore
+            links,
+            writer,
+            ReviewCrawlOptions(limit=10, concurrency=2),
+            metrics=StageMetrics(stage),
+        )
+    )
+    assert stage.pages == len(stage.page_latencies) == 3
+    assert writer.count == 12
+
+
+def test_benchmark_runs_offline(tmp_path):
+    if not is_chromium_installed():
+        pytest.skip("Chromium is not installed")
+    from run_benchmark import run
+
+    output = tmp_path / "results.jsonl"
+    run(
+        argparse.Namespace(
+            snapshots=SNAPSHOTS_DIR,
+            location="Hanoi",
+            limit=2,
+            reviews_limit=100,
+            headless=True,
+            concurrency=2,
+            quiet_ms=100,
+            output=str(output),
+        )
+    )
+    stages = json.loads(output.read_text())["stages"]
+    assert stages["list"]["items"] == 2
+    assert stages["details"]["items"] == 2
+    # Reviews not made on Google are left out
+    assert stages["reviews"]["items"] == 18
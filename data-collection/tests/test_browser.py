@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any
+
+from crawl.browser import CLAIM_PAGE_SCRIPT, POOL_URL, new_page_async
+
+
+class PoolPage:
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    async def evaluate(self, script: str) -> bool:
+        assert script == CLAIM_PAGE_SCRIPT
+        if self.url != POOL_URL:
+            return False
+        self.url = "about:blank#claimed"
+        return True
+
+
+class PoolContext:
+    def __init__(self, pages: list[PoolPage]) -> None:
+        self.pages = pages
+        self.opened = 0
+
+    async def new_page(self) -> PoolPage:
+        self.opened += 1
+        page = PoolPage("about:blank")
+        self.pages.append(page)
+        return page
+
+
+def claim(context: PoolContext) -> Any:
+    return asyncio.run(new_page_async(context))  # type: ignore
+
+
+def test_pool_pages_are_claimed_once():
+    busy = PoolPage("https://hotel/1")
+    pooled = PoolPage(POOL_URL)
+    context = PoolContext([busy, pooled])
+    assert claim(context) is pooled
+    # The only pool page is taken, so the next caller opens its own
+    page = claim(context)
+    assert page is not pooled and page is not busy
+    assert context.opened == 1
@@ -0,0 +1,98 @@
+import datetime
+import os
+
+from capture import (
+    decode_payload,
+    get_hotel_urls_from_payload,
+    get_reviews_from_payload,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(file_name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as f:
+        return f.read()
+
+
+def get_reviews(file_name: str, is_document: bool) -> list:
+    return [
+        review
+        for payload in decode_payload(read_fixture(file_name), is_document)
+        for review in get_reviews_from_payload(payload, "Hotel Riverside")
+    ]
+
+
+def test_batchexecute_reviews():
+    reviews = get_reviews("reviews-batchexecute.txt", is_document=False)
+    assert [
+        (review.review_text, review.rating, review.review_timestamp)
+        for review in reviews
+    ] == [
+        (
+            "Lovely stay, the staff were very kind.",
+            5.0,
+            datetime.datetime.fromtimestamp(1696000000),
+        ),
+        ("Great", 4.0, datetime.datetime.fromtimestamp(1695000000)),
+        ("", 3.0, datetime.datetime.fromtimestamp(1694000000)),
+        ("", 3.0, datetime.datetime.fromtimestamp(1692000000)),
+    ]
+    assert all(review.hotel_name == "Hotel Riverside" for review in reviews)
+    assert (reviews[0].trip_type, reviews[0].trip_companions) == (
+        "Vacation",
+        "Family",
+    )
+    assert (reviews[1].trip_type, reviews[1].trip_companions) == (
+        "Business",
+        "Solo",
+    )
+    assert reviews[2].trip_type is None
+
+
+def test_init_data_reviews():
+    reviews = get_reviews("hotel-page.html", is_document=True)
+    assert [review.review_text for review in reviews] == [
+        "Lovely stay, the staff were very kind.",
+        "Great",
+    ]
+
+
+def test_init_data_hotel_urls():
+    payloads = decode_payload(read_fixture("hotel-page.html"), True)
+    assert get_hotel_urls_from_payload(payloads[0]) == [
+        "https://google.com/travel/hotels/entity/"
+        "ChcIq7WYyM3Rxp6DARoKL2cvMXRkMjVjZBAB"
+    ]
+
+
+def test_page_wrapper_is_not_a_review():
+    # The wrapper holds a timestamp and a small integer of its own
+    review = [
+        "ChZDSUhNMG9nS0VJQ0FnSURyOXFmN1J3EAE",
+        [1696000000, 0],
+        4,
+        ["Clean", "en"],
+        ["Google"],
+    ]
+    payload = [[review], "CAESY0NBRVFGQm9rQ2hRS0RB", 1696500000, 3]
+    reviews = get_reviews_from_payload(payload, "Hotel")
+    assert [(r.review_text, r.rating) for r in reviews] == [("Clean", 4.0)]
+
+
+def test_reviews_from_other_providers_are_dropped():
+    payload = [
+        [
+            "ChZDSUhNMG9nS0VJQ0FnSURyOXFmN1J3EAE",
+            [1696000000, 0],
+            2,
+            ["Noisy rooms", "en"],
+            ["Tripadvisor", "https://www.tripadvisor.com/Hotel_Review"],
+        ]
+    ]
+    assert get_reviews_from_payload(payload, "Hotel") == []
+
+
+def test_malformed_lines_are_skipped():
+    text = ")]}'\n\n12\n[[\"wrb.fr\",\n5\nnot json\n"
+    assert decode_payload(text, False) == []
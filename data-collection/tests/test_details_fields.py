@@ -0,0 +1,97 @@
+import csv
+
+import pytest
+
+import get_hotel_details
+from crawl import Metrics
+from fake_page import FakeDetailsPage
+from hotel.writer.csv import HotelCsvWriter
+
+DETAILS_TAB = "#details>span"
+PHOTOS_TAB = "#photos>span"
+
+
+class HiddenExpectation:
+    """
+    Stands in for playwright's `expect`, which only takes real locators,
+    with nothing ever becoming visible.
+    """
+
+    def __init__(self, locator: object) -> None:
+        pass
+
+    def to_be_visible(self, timeout: float | None = None) -> None:
+        raise AssertionError("Not visible")
+
+
+@pytest.fixture(autouse=True)
+def hide_everything(monkeypatch) -> None:
+    monkeypatch.setattr(get_hotel_details, "expect", HiddenExpectation)
+
+
+@pytest.mark.parametrize(
+    "fields, tabs",
+    [
+        ((), []),
+        (("address",), [DETAILS_TAB]),
+        (("address", "popular_amenities"), [DETAILS_TAB]),
+        (("images_count",), [PHOTOS_TAB]),
+        (get_hotel_details.DETAIL_FIELDS, [DETAILS_TAB, PHOTOS_TAB]),
+    ],
+)
+def test_only_tabs_of_the_requested_fields_are_opened(fields, tabs):
+    page = FakeDetailsPage()
+    metrics = Metrics()
+    get_hotel_details.get_hotel_details(page, metrics, fields)  # type: ignore
+    assert page.clicked == tabs
+    timed_phases = metrics.to_json()
+    assert ('"photos_tab"' in timed_phases) == (PHOTOS_TAB in tabs)
+
+
+def test_unrequested_columns_are_left_empty(tmp_path):
+    page = FakeDetailsPage("Hanoi Pearl", "12 Hang Bac, Hanoi")
+    hotel = get_hotel_details.get_hotel_details(
+        page, fields=("address",)  # type: ignore
+    )
+    assert hotel.popular_amenities is None
+    assert hotel.images_count is None
+
+    output_filename = str(tmp_path / "details.csv")
+    with HotelCsvWriter(output_filename) as writer:
+        writer.append(hotel)
+    with open(output_filename, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [
+        {
+            "name": "Hanoi Pearl",
+            "address": "12 Hang Bac, Hanoi",
+            "images_count": "",
+            "popular_amenities": "",
+            "source": "Google",
+        }
+    ]
+
+
+def test_fields_are_parsed_from_the_command_line(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        get_hotel_details,
+        "crawl_hotel_details",
+        lambda *args: calls.append(args),
+    )
+    input_filename = tmp_path / "hotels.txt"
+    input_filename.write_text("https://hotel/1\n")
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "get_hotel_details.py",
+            str(input_filename),
+            "--output",
+            str(tmp_path / "details.csv"),
+            "--fields",
+            "address",
+            "images_count",
+        ],
+    )
+    get_hotel_details.main()
+    assert calls[0][13] == ("address", "images_count")
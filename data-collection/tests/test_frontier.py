@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from crawl import HotelFrontier
+from crawl.frontier import get_hotel_key
+from pipeline import mark_done
+
+HOTEL_URL = "https://www.google.com/travel/hotels/Hanoi/entity/ChcIx1"
+
+
+@pytest.mark.parametrize(
+    "url, key",
+    [
+        (HOTEL_URL, "ChcIx1"),
+        (HOTEL_URL + "?q=hotels+in+Hanoi&ts=CAE", "ChcIx1"),
+        (HOTEL_URL + "/reviews?hl=en", "ChcIx1"),
+        (
+            "https://www.google.com/travel/hotels/Da%20Nang/",
+            "/travel/hotels/Da%20Nang",
+        ),
+    ],
+)
+def test_hotel_key_normalization(url, key):
+    assert get_hotel_key(url) == key
+
+
+def test_frontier_dedups_on_hotel_key(tmp_path):
+    with HotelFrontier(str(tmp_path / "hotels.frontier")) as frontier:
+        assert frontier.add(HOTEL_URL + "?q=Hanoi", "Hanoi")
+        assert not frontier.add(HOTEL_URL + "?q=hotels", "Hanoi")
+        assert not frontier.add(HOTEL_URL, "Ha Noi")
+
+
+def test_frontier_only_keeps_done_hotels(tmp_path):
+    frontier_filename = str(tmp_path / "hotels.frontier")
+    with HotelFrontier(frontier_filename) as frontier:
+        frontier.add(HOTEL_URL, "Hanoi")
+        frontier.add(HOTEL_URL + "2", "Hanoi")
+        assert frontier.get_done_keys() == set()
+        frontier.mark_done([HOTEL_URL + "?q=Hanoi"])
+
+    with HotelFrontier(frontier_filename) as frontier:
+        assert frontier.get_done_keys() == {"ChcIx1"}
+        assert not frontier.add(HOTEL_URL + "2", "Hanoi")
+
+
+def test_pipeline_leaves_failed_hotels_undone(tmp_path):
+    frontier_filename = str(tmp_path / "hotels.frontier")
+    found_hotels = [HOTEL_URL, HOTEL_URL + "2"]
+    with HotelFrontier(frontier_filename) as frontier:
+        for href in found_hotels:
+            frontier.add(href, "Hanoi")
+
+    mark_done(frontier_filename, found_hotels, {HOTEL_URL + "2"})
+
+    with HotelFrontier(frontier_filename) as frontier:
+        assert frontier.get_done_keys() == {"ChcIx1"}
+
+
+def test_frontier_migrates_hotels_found_before_as_done(tmp_path):
+    frontier_filename = str(tmp_path / "hotels.frontier")
+    connection = sqlite3.connect(frontier_filename)
+    connection.executescript(
+        """
+        CREATE TABLE hotels (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            location TEXT NOT NULL,
+            first_seen_at REAL NOT NULL,
+            last_seen_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        INSERT INTO hotels VALUES ('ChcIx1', 'https://hotel', 'Hanoi', 1, 2);
+        """
+    )
+    connection.close()
+
+    with HotelFrontier(frontier_filename) as frontier:
+        assert frontier.get_done_keys() == {"ChcIx1"}
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from crawl import CrawlJournal
+from fake_page import FakePage, make_record
+from get_hotel_reviews import AdaptiveWait, ReviewCursor, get_reviews
+
+
+def collect_reviews(
+    page: FakePage, limit: int, cursor: ReviewCursor, windowed: bool = True
+) -> list:
+    async def collect() -> list:
+        reviews = []
+        async for batch in get_reviews(
+            page,
+            limit,
+            windowed=windowed,
+            adaptive_wait=AdaptiveWait(),
+            cursor=cursor,
+        ):
+            reviews.extend(batch)
+        return reviews
+
+    return asyncio.run(collect())
+
+
+def test_review_cursor_defaults_to_zero(tmp_path):
+    with CrawlJournal(str(tmp_path / "crawl.journal")) as journal:
+        assert journal.get_review_cursor("https://hotel") == (0, 0)
+        assert not journal.is_finished("https://hotel")
+
+
+def test_review_cursor_only_moves_forward(tmp_path):
+    with CrawlJournal(str(tmp_path / "crawl.journal")) as journal:
+        journal.record_reviews("https://hotel", 20, 18)
+        journal.record_reviews("https://hotel", 20, 18)
+        journal.record_reviews("https://hotel", 10, 9)
+        assert journal.get_review_cursor("https://hotel") == (20, 18)
+        journal.mark_finished("https://hotel")
+        assert journal.is_finished("https://hotel")
+
+
+def test_journal_persists_across_runs(tmp_path):
+    file_path = str(tmp_path / "crawl.journal")
+    with CrawlJournal(file_path) as journal:
+        journal.record_reviews("https://hotel", 5, 5)
+    with CrawlJournal(file_path) as journal:
+        assert journal.get_review_cursor("https://hotel") == (5, 5)
+
+
+def test_identical_reviews_are_all_kept():
+    # Ratings without text are indistinguishable by content alone
+    page = FakePage([make_record() for _ in range(25)])
+    reviews = collect_reviews(page, 100, ReviewCursor())
+    assert len(reviews) == 25
+
+
+@pytest.mark.parametrize("windowed", [True, False])
+def test_resumed_crawl_passes_over_written_panels(windowed):
+    records = [make_record(text=f"Review {i}") for i in range(25)]
+    page = FakePage(records)
+    cursor = ReviewCursor(panels=12, reviews=12)
+    reviews = collect_reviews(page, 100, cursor, windowed)
+    assert [review.review_text for review in reviews] == [
+        f"Review {i}" for i in range(12, 25)
+    ]
+    assert page.extracted == 13
+    assert cursor == ReviewCursor(panels=25, reviews=25)
+
+
+def test_limit_counts_reviews_written_before():
+    records = [make_record(text=f"Review {i}") for i in range(40)]
+    cursor = ReviewCursor(panels=10, reviews=10)
+    reviews = collect_reviews(FakePage(records), 20, cursor)
+    assert [review.review_text for review in reviews] == [
+        f"Review {i}" for i in range(10, 20)
+    ]
@@ -0,0 +1,82 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from crawl import Metrics
+from crawl.metrics import HotelProfiler
+
+
+def make_metrics() -> Metrics:
+    metrics = Metrics("hotel_reviews", buckets=(0.1, 1.0))
+    metrics.increment("hotels")
+    metrics.increment("hotels")
+    metrics.increment("reviews", 20)
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        metrics.observe("goto", seconds)
+    return metrics
+
+
+def test_prometheus_exposition_format():
+    assert make_metrics().to_prometheus().splitlines() == [
+        "# TYPE hotel_reviews_hotels_total counter",
+        "hotel_reviews_hotels_total 2",
+        "# TYPE hotel_reviews_reviews_total counter",
+        "hotel_reviews_reviews_total 20",
+        "# TYPE hotel_reviews_phase_seconds histogram",
+        'hotel_reviews_phase_seconds_bucket{phase="goto",le="0.1"} 1',
+        'hotel_reviews_phase_seconds_bucket{phase="goto",le="1.0"} 3',
+        'hotel_reviews_phase_seconds_bucket{phase="goto",le="+Inf"} 4',
+        'hotel_reviews_phase_seconds_sum{phase="goto"} 4.05',
+        'hotel_reviews_phase_seconds_count{phase="goto"} 4',
+    ]
+
+
+def test_timed_errors_are_counted():
+    metrics = Metrics("crawl", buckets=(1.0,))
+    with pytest.raises(TimeoutError):
+        with metrics.time("goto"):
+            raise TimeoutError()
+    text = metrics.to_prometheus()
+    assert "crawl_goto_errors_total 1\n" in text
+    assert 'crawl_phase_seconds_count{phase="goto"} 1\n' in text
+
+
+def test_prometheus_export_replaces_the_textfile(tmp_path):
+    file_path = str(tmp_path / "crawl.prom")
+    metrics = make_metrics()
+    metrics.export(file_path)
+    metrics.increment("hotels")
+    metrics.export(file_path)
+    with open(file_path, encoding="utf-8") as f:
+        assert "hotel_reviews_hotels_total 3\n" in f.read()
+    assert os.listdir(tmp_path) == ["crawl.prom"]
+
+
+def test_jsonl_export_appends_a_snapshot_per_hotel(tmp_path):
+    file_path = str(tmp_path / "crawl.jsonl")
+    metrics = make_metrics()
+    metrics.export(file_path, "jsonl")
+    metrics.increment("hotels")
+    metrics.export(file_path, "jsonl")
+    with open(file_path, encoding="utf-8") as f:
+        snapshots = [json.loads(line) for line in f]
+    assert [s["counters"]["hotels"] for s in snapshots] == [2, 3]
+    assert snapshots[0]["timestamp"] <= snapshots[1]["timestamp"]
+    assert snapshots[1]["phases"]["goto"] == {
+        "count": 4,
+        "sum": pytest.approx(4.05),
+        "buckets": {"0.1": 1, "1.0": 2, "+Inf": 1},
+    }
+
+
+def test_hotel_profiler_writes_one_profile_at_a_time(tmp_path):
+    profiler = HotelProfiler(str(tmp_path / "profiles"))
+    with profiler.profile("hotel-1"):
+        # Another hotel crawled meanwhile is left out
+        with profiler.profile("hotel-2"):
+            sum(range(1000))
+    assert os.listdir(tmp_path / "profiles") == ["hotel-1.prof"]
+    stats = pstats.Stats(str(tmp_path / "profiles" / "hotel-1.prof"))
+    assert stats.total_calls > 0
@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+
+from fake_page import FakePage, make_record
+from get_hotel_reviews import AdaptiveWait, get_reviews
+from review.batch import from_epoch, to_epoch
+from review.normalize import normalize, parse_review_time, subtract_months
+from review.raw import RawReviewBatch
+
+ANCHOR = datetime.datetime(2024, 3, 31, 12, 0)
+
+
+def test_subtract_months_clamps_day():
+    assert subtract_months(ANCHOR, 1) == datetime.datetime(2024, 2, 29, 12, 0)
+    assert subtract_months(ANCHOR, 13) == datetime.datetime(2023, 2, 28, 12, 0)
+    assert subtract_months(ANCHOR, 3) == datetime.datetime(2023, 12, 31, 12, 0)
+
+
+def test_parse_review_time():
+    assert parse_review_time("a day ago on Google", ANCHOR) == (
+        datetime.datetime(2024, 3, 30, 12, 0)
+    )
+    assert parse_review_time("2 weeks ago on Google", ANCHOR) == (
+        datetime.datetime(2024, 3, 17, 12, 0)
+    )
+    assert parse_review_time("a year ago on Google", ANCHOR) == (
+        datetime.datetime(2023, 3, 31, 12, 0)
+    )
+    assert parse_review_time("a month ago on Tripadvisor", ANCHOR) is None
+
+
+def test_normalize_resolves_times_per_crawl():
+    raw = RawReviewBatch()
+    earlier = ANCHOR - datetime.timedelta(days=1)
+    for review_time, crawled_at in (
+        ("a day ago on Google", ANCHOR),
+        ("a day ago on Google", earlier),
+        ("a day ago on Agoda", ANCHOR),
+    ):
+        raw.append("Hotel", review_time, "", "4/5", None, to_epoch(crawled_at))
+    raw.append(
+        "Hotel", "a month ago on Google", "", "3/5", "Vacation ❘ Family", 0
+    )
+
+    batch = normalize(raw)
+    assert [from_epoch(seconds) for seconds in batch.review_timestamps] == [
+        ANCHOR - datetime.timedelta(days=1),
+        ANCHOR - datetime.timedelta(days=2),
+        datetime.datetime(1969, 12, 1),
+    ]
+    assert list(batch.ratings) == [4, 4, 3]
+
+    # With an anchor, every review is resolved against it
+    batch = normalize(raw, ANCHOR)
+    assert {from_epoch(seconds) for seconds in batch.review_timestamps[:2]} == {
+        ANCHOR - datetime.timedelta(days=1)
+    }
+
+
+def test_parsed_reviews_share_crawl_anchor():
+    page = FakePage([make_record() for _ in range(25)], page_size=10)
+
+    async def collect() -> list:
+        reviews = []
+        async for batch in get_reviews(
+            page, 25, adaptive_wait=AdaptiveWait(), crawled_at=ANCHOR
+        ):
+            reviews.extend(batch)
+        return reviews
+
+    reviews = asyncio.run(collect())
+    assert len(reviews) == 25
+    # Every batch is resolved against the start of the crawl, not its own
+    # time, so identical relative times give identical dates
+    assert {review.review_timestamp for review in reviews} == {
+        ANCHOR - datetime.timedelta(days=2)
+    }
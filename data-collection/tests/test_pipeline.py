@@ -0,0 +1,107 @@
+import asyncio
+import queue
+import threading
+import time
+
+import pytest
+
+from fake_page import FakeContext, FakePage, FakeResponse, make_record
+from get_hotel_reviews import ReviewCrawlOptions, crawl_reviews
+from pipeline import aiter_queue, feed_stages, iter_queue, run_stages
+from run_benchmark import CountingReviewWriter
+
+HOTEL_URLS = [f"https://hotel/{i}" for i in range(5)]
+FAILED_URL = "https://hotel/failed"
+
+
+class FailingPage(FakePage):
+    async def goto(self, url: str) -> FakeResponse:
+        if url == FAILED_URL:
+            raise TimeoutError(f"Timed out at {url}")
+        return await super().goto(url)
+
+
+class FailingContext(FakeContext):
+    async def new_page(self) -> FakePage:
+        page = FailingPage(self.records, self.page_size)
+        self.pages.append(page)
+        return page
+
+
+def reviews_stage(
+    reviews_queue: "queue.Queue[str | None]",
+    stopped: threading.Event,
+    writer: CountingReviewWriter,
+):
+    return lambda: asyncio.run(
+        crawl_reviews(
+            FailingContext([make_record() for _ in range(4)]),  # type: ignore
+            aiter_queue(reviews_queue, stopped),
+            writer,
+            ReviewCrawlOptions(limit=10, concurrency=2),
+        )
+    )
+
+
+def test_stages_get_every_hotel_found():
+    stopped = threading.Event()
+    details_queue: "queue.Queue[str | None]" = queue.Queue(1)
+    reviews_queue: "queue.Queue[str | None]" = queue.Queue(1)
+    found_hotels: list[str] = []
+    detailed_hotels: list[str] = []
+    writer = CountingReviewWriter()
+
+    failed_hotels = run_stages(
+        [
+            lambda: detailed_hotels.extend(iter_queue(details_queue, stopped)),
+            reviews_stage(reviews_queue, stopped, writer),
+            lambda: feed_stages(
+                HOTEL_URLS + [FAILED_URL],
+                [details_queue, reviews_queue],
+                stopped,
+                found_hotels,
+            ),
+        ],
+        stopped,
+    )
+
+    assert found_hotels == detailed_hotels == HOTEL_URLS + [FAILED_URL]
+    assert writer.count == 4 * len(HOTEL_URLS)
+    # Left out of the frontier, to be crawled again
+    assert failed_hotels == {FAILED_URL}
+    assert not stopped.is_set()
+
+
+def test_stage_failure_stops_stages_on_a_full_queue():
+    stopped = threading.Event()
+    details_queue: "queue.Queue[str | None]" = queue.Queue(1)
+    reviews_queue: "queue.Queue[str | None]" = queue.Queue(1)
+    found_hotels: list[str] = []
+    writer = CountingReviewWriter()
+
+    def details_stage() -> None:
+        # Crashes once the hotel list stage is blocked on its queue
+        while not details_queue.full():
+            time.sleep(0.01)
+        raise RuntimeError("Browser crashed")
+
+    with pytest.raises(RuntimeError, match="Browser crashed"):
+        run_stages(
+            [
+                details_stage,
+                reviews_stage(reviews_queue, stopped, writer),
+                lambda: feed_stages(
+                    HOTEL_URLS,
+                    [details_queue, reviews_queue],
+                    stopped,
+                    found_hotels,
+                ),
+            ],
+            stopped,
+        )
+
+    assert stopped.is_set()
+    # The hotel list stage gave up on the queue nobody drains any more,
+    # rather than blocking the pipeline forever
+    assert details_queue.full()
+    assert len(found_hotels) < len(HOTEL_URLS)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from crawl.rate import (
+    ERROR,
+    SUCCESS,
+    THROTTLED,
+    TIMEOUT,
+    AimdController,
+    is_throttled,
+)
+
+
+def release(rate: AimdController, outcomes: list[str]) -> None:
+    async def run() -> None:
+        for outcome in outcomes:
+            await rate.acquire()
+            await rate.release(outcome)
+
+    asyncio.run(run())
+
+
+def test_limit_grows_by_about_one_per_limit_of_successes():
+    rate = AimdController(10, initial_concurrency=2)
+    release(rate, [SUCCESS] * 2)
+    assert rate.limit == 2
+    release(rate, [SUCCESS])
+    assert rate.limit == 3
+    release(rate, [SUCCESS] * 3)
+    assert rate.limit == 4
+    assert rate.in_flight == 0
+
+
+@pytest.mark.parametrize("outcome", [TIMEOUT, THROTTLED])
+def test_limit_halves_on_overload(outcome):
+    rate = AimdController(16, initial_concurrency=8, backoff_base=0)
+    release(rate, [outcome])
+    assert rate.limit == 4
+    release(rate, [outcome])
+    assert rate.limit == 2
+
+
+def test_other_errors_leave_the_limit_alone():
+    rate = AimdController(16, initial_concurrency=8)
+    release(rate, [ERROR] * 3)
+    assert rate.limit == 8
+
+
+def test_limit_is_clamped():
+    rate = AimdController(4, min_concurrency=2, initial_concurrency=3)
+    release(rate, [SUCCESS] * 20)
+    assert rate.limit == 4
+    release(rate, [TIMEOUT] * 5)
+    assert rate.limit == 2
+
+
+def test_decreases_at_most_once_per_load_latency():
+    rate = AimdController(16, initial_concurrency=8)
+    rate.observe_latency(60)
+    release(rate, [TIMEOUT] * 3)
+    assert rate.limit == 4
+
+
+def test_slow_loads_decrease_the_limit():
+    rate = AimdController(16, initial_concurrency=8, latency_tolerance=3)
+    rate.observe_latency(0.001)
+    assert rate.limit == 8
+    for _ in range(10):
+        rate.observe_latency(1)
+    assert rate.limit < 8
+
+
+def test_acquire_waits_for_the_limit():
+    async def run() -> None:
+        rate = AimdController(4, initial_concurrency=2)
+        await rate.acquire()
+        await rate.acquire()
+        waiting = asyncio.create_task(rate.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        await rate.release(ERROR)
+        await asyncio.wait_for(waiting, 1)
+        assert rate.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_is_throttled():
+    assert is_throttled("https://www.google.com/sorry/index?continue=x")
+    assert is_throttled("https://www.google.com/travel/hotels", 429)
+    assert not is_throttled("https://www.google.com/travel/hotels", 200)
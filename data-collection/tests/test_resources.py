@@ -0,0 +1,53 @@
+import json
+from types import SimpleNamespace
+
+from crawl import Metrics, get_resource_policy
+from crawl.resources import ESTIMATED_RESOURCE_BYTES
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str) -> None:
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.aborted = False
+
+    def abort(self) -> None:
+        self.aborted = True
+
+    def continue_(self) -> None:
+        pass
+
+
+def make_response(resource_type: str, content_length: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        headers={"content-length": str(content_length)},
+        request=SimpleNamespace(resource_type=resource_type),
+    )
+
+
+def get_counters(metrics: Metrics) -> dict[str, float]:
+    return json.loads(metrics.to_json())["counters"]
+
+
+def test_blocked_bytes_are_estimated():
+    metrics = Metrics()
+    policy = get_resource_policy("details", metrics)
+    route = FakeRoute("https://www.google.com/font.woff2", "font")
+    policy.handle(route)
+    assert route.aborted
+    # No font was loaded, so the rough size of the type is used
+    assert get_counters(metrics)["blocked_bytes_estimated"] == (
+        ESTIMATED_RESOURCE_BYTES["font"]
+    )
+
+
+def test_blocked_bytes_follow_loaded_responses():
+    metrics = Metrics()
+    policy = get_resource_policy("text-only", metrics)
+    policy.on_response(make_response("script", 1000))
+    policy.on_response(make_response("script", 3000))
+    # Third-party scripts are blocked, and counted as long as loaded ones
+    policy.handle(FakeRoute("https://ads.example.com/tag.js", "script"))
+    counters = get_counters(metrics)
+    assert counters["loaded_bytes"] == 4000
+    assert counters["blocked_bytes_estimated"] == 2000
+    assert counters["blocked_requests"] == 1
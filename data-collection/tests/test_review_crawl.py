@@ -0,0 +1,45 @@
+import asyncio
+
+from fake_page import FakeContext, make_record
+from get_hotel_reviews import ReviewCrawlOptions, crawl_reviews
+from review import RawReviewBatch, Review, ReviewBatch
+from review.writer import AbstractReviewWriter
+
+
+class ListReviewWriter(AbstractReviewWriter):
+    def __init__(self) -> None:
+        self.reviews: list[Review] = []
+
+    def append(
+        self, reviews: list[Review] | ReviewBatch | RawReviewBatch
+    ) -> None:
+        assert isinstance(reviews, ReviewBatch)
+        self.reviews.extend(reviews)
+
+
+def crawl(
+    context: FakeContext, links: list[str], options: ReviewCrawlOptions
+) -> ListReviewWriter:
+    writer = ListReviewWriter()
+    asyncio.run(crawl_reviews(context, links, writer, options))  # type: ignore
+    return writer
+
+
+def test_pages_follow_concurrency_limit():
+    context = FakeContext([make_record() for _ in range(5)])
+    options = ReviewCrawlOptions(limit=10, concurrency=1, max_concurrency=8)
+    writer = crawl(context, ["https://hotel/1"], options)
+    # A single hotel never needs more than one page, whatever the bound
+    assert len(context.pages) == 1
+    assert len(writer.reviews) == 5
+    assert context.open_pages == 0
+
+
+def test_pages_are_reused_across_hotels():
+    context = FakeContext([make_record() for _ in range(3)])
+    links = [f"https://hotel/{i}" for i in range(6)]
+    options = ReviewCrawlOptions(limit=10, concurrency=2)
+    writer = crawl(context, links, options)
+    assert len(writer.reviews) == 18
+    assert len(context.pages) <= 2
+    assert context.open_pages == 0
@@ -0,0 +1,94 @@
+import json
+import os
+from concurrent.futures import Future
+
+import get_hotel_details
+from get_hotel_details import crawl_sharded, split_into_shards
+
+
+class InlineExecutor:
+    """
+    Runs submitted calls right away, so shards can be tested without
+    worker processes.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        pass
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def fake_crawl(links: list[str], output_filename: str, *args) -> list[str]:
+    if "https://broken" in links:
+        with open(output_filename, "w", encoding="utf-8") as f:
+            f.write("name\nPartial\n")
+        raise RuntimeError("Browser crashed")
+    with open(output_filename, "w", encoding="utf-8") as f:
+        f.write("name\n")
+        f.writelines(f"{link}\n" for link in links if link != "https://bad")
+    return [link for link in links if link == "https://bad"]
+
+
+def use_inline_shards(monkeypatch) -> None:
+    monkeypatch.setattr(
+        get_hotel_details, "ProcessPoolExecutor", InlineExecutor
+    )
+    monkeypatch.setattr(get_hotel_details, "crawl_hotel_details", fake_crawl)
+
+
+def test_split_into_shards_keeps_order():
+    links = [f"https://hotel/{i}" for i in range(7)]
+    partitions = split_into_shards(links, 3)
+    assert [len(partition) for partition in partitions] == [3, 2, 2]
+    assert sum(partitions, []) == links
+
+
+def test_finished_shards_are_merged_despite_failures(tmp_path, monkeypatch):
+    use_inline_shards(monkeypatch)
+    output_filename = str(tmp_path / "hotels.csv")
+    links = ["https://a", "https://bad", "https://broken", "https://c"]
+
+    crawl_sharded(links, output_filename, True, 3, merge=True)
+
+    with open(output_filename, encoding="utf-8") as f:
+        assert f.read() == "name\nhttps://a\nhttps://c\n"
+    with open(str(tmp_path / "hotels.manifest.json"), encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    assert [shard["status"] for shard in shards] == [
+        "merged",
+        "failed",
+        "merged",
+    ]
+    assert shards[0]["failed_hotels"] == ["https://bad"]
+    assert "Browser crashed" in shards[1]["error"]
+    # Left as is for a later run to pick up
+    assert os.path.exists(shards[1]["path"])
+    assert not os.path.exists(shards[0]["path"])
+
+
+def test_manifest_is_written_apart_without_merge(tmp_path, monkeypatch):
+    use_inline_shards(monkeypatch)
+    output_filename = str(tmp_path / "hotels.csv")
+
+    crawl_sharded(["https://a", "https://c"], output_filename, True, 2, False)
+
+    # Nothing is merged, so nothing stands at the CSV output path
+    assert not os.path.exists(output_filename)
+    with open(str(tmp_path / "hotels.manifest.json"), encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    assert [(shard["hotels"], shard["status"]) for shard in shards] == [
+        (1, "finished"),
+        (1, "finished"),
+    ]
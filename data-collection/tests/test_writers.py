@@ -0,0 +1,188 @@
+import csv
+import datetime
+
+import pytest
+
+from hotel import Hotel
+from hotel.writer.csv import HotelCsvWriter
+from review import RawReviewBatch, Review, ReviewBatch
+from review.writer.csv import ReviewCsvWriter
+from review.writer.raw import RawReviewCsvWriter
+
+REVIEWS = [
+    Review(
+        "Hanoi Hotel",
+        "Clean room,\nfriendly staff",
+        4.0,
+        datetime.datetime(2024, 3, 1, 12, 30),
+        "Vacation",
+        "Family",
+    ),
+    Review("Hanoi Hotel", "", 5.0, None, None, None),
+    Review(
+        "Da Nang Hotel",
+        "Great view",
+        3.0,
+        datetime.datetime(2023, 12, 31),
+        "Business",
+        "Solo",
+    ),
+]
+HOTELS = [
+    Hotel("Google", "Hanoi Hotel", "1 Trang Tien", 12, ["Pool", "Kids' club"]),
+    Hotel("Google", "Da Nang Hotel"),
+]
+
+
+def read_csv(file_path: str) -> list[dict[str, str]]:
+    with open(file_path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def get_expected_rows() -> list[dict[str, object]]:
+    return [
+        {
+            "hotel_name": review.hotel_name,
+            "review_text": review.review_text.replace("\n", ""),
+            "rating": review.rating,
+            "review_timestamp": review.review_timestamp,
+            "trip_type": review.trip_type,
+            "trip_companions": review.trip_companions,
+        }
+        for review in REVIEWS
+    ]
+
+
+def test_review_csv_round_trip(tmp_path):
+    # Lists of reviews and packed batches are written the same way
+    for i, reviews in enumerate((REVIEWS, ReviewBatch.from_reviews(REVIEWS))):
+        file_path = str(tmp_path / f"reviews-{i}.csv")
+        with ReviewCsvWriter(file_path) as writer:
+            writer.append(reviews)
+        rows = read_csv(file_path)
+        assert [row["hotel_name"] for row in rows] == [
+            review.hotel_name for review in REVIEWS
+        ]
+        assert rows[0]["review_text"] == "Clean room,friendly staff"
+        assert rows[0]["review_timestamp"] == "2024-03-01"
+        assert rows[1]["review_timestamp"] == ""
+        assert [float(row["rating"]) for row in rows] == [4.0, 5.0, 3.0]
+        assert [row["trip_companions"] for row in rows] == [
+            "Family",
+            "",
+            "Solo",
+        ]
+
+
+def test_review_csv_appends_without_header(tmp_path):
+    file_path = str(tmp_path / "reviews.csv")
+    with ReviewCsvWriter(file_path) as writer:
+        writer.append(REVIEWS[:1])
+    with ReviewCsvWriter(file_path, "a") as writer:
+        writer.append(REVIEWS[1:])
+    assert len(read_csv(file_path)) == len(REVIEWS)
+
+
+def test_review_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from review.writer.parquet import ReviewParquetWriter
+
+    file_path = str(tmp_path / "reviews.parquet")
+    # Small row groups, so that reviews span several of them
+    with ReviewParquetWriter(file_path, row_group_size=2) as writer:
+        writer.append(REVIEWS[:1])
+        writer.append(ReviewBatch.from_reviews(REVIEWS[1:]))
+    parquet_file = pq.ParquetFile(file_path)
+    assert parquet_file.metadata.num_row_groups == 2
+    # Unlike CSV files, timestamps keep their time of day
+    assert parquet_file.read().to_pylist() == get_expected_rows()
+
+
+def test_raw_review_round_trip(tmp_path):
+    raw = RawReviewBatch()
+    # Newlines are kept, unlike in parsed reviews
+    raw.append("Hanoi", "a day ago on Google", "Line\nbreak", "4/5", None, 1)
+    raw.append("Hanoi", "a week ago on Google", "", "5/5", "Vacation ❘ Solo", 2)
+    raw.append("Da Nang", "a year ago on Agoda", "Ok", "3/5", None, 3)
+    file_path = str(tmp_path / "raw-reviews.csv")
+    with RawReviewCsvWriter(file_path) as writer:
+        writer.append(raw)
+        with pytest.raises(TypeError):
+            writer.append(REVIEWS)
+
+    batches = list(RawReviewCsvWriter.read(file_path, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    read = RawReviewBatch()
+    for batch in batches:
+        read.extend(batch)
+    for field in RawReviewBatch.__slots__:
+        assert getattr(read, field) == getattr(raw, field)
+
+
+def test_hotel_csv_round_trip(tmp_path):
+    file_path = str(tmp_path / "hotels.csv")
+    with HotelCsvWriter(file_path) as writer:
+        for hotel in HOTELS:
+            writer.append(hotel)
+    rows = read_csv(file_path)
+    assert rows[0] == {
+        "name": "Hanoi Hotel",
+        "address": "1 Trang Tien",
+        "images_count": "12",
+        "popular_amenities": "['Pool', \"Kids' club\"]",
+        "source": "Google",
+    }
+    assert rows[1]["address"] == ""
+
+
+def test_hotel_parquet_round_trip_and_merge(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from hotel.writer.parquet import HotelParquetWriter
+
+    shard_paths = []
+    for i, hotel in enumerate(HOTELS):
+        shard_path = str(tmp_path / f"hotels-{i}.parquet")
+        with HotelParquetWriter(shard_path) as writer:
+            writer.append(hotel)
+        shard_paths.append(shard_path)
+    file_path = str(tmp_path / "hotels.parquet")
+    HotelParquetWriter.merge(shard_paths, file_path)
+
+    rows = pq.read_table(file_path).to_pylist()
+    assert rows == [
+        {
+            "name": hotel.name,
+            "address": hotel.address,
+            "images_count": hotel.images_count,
+            "popular_amenities": hotel.popular_amenities,
+            "source": hotel.source,
+        }
+        for hotel in HOTELS
+    ]
+
+
+def test_hotel_parquet_merge_regroups_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from hotel.writer.parquet import HotelParquetWriter
+
+    shard_paths = []
+    for i in range(3):
+        shard_path = str(tmp_path / f"hotels-{i}.parquet")
+        with HotelParquetWriter(shard_path, compression="snappy") as writer:
+            for hotel in HOTELS:
+                writer.append(hotel)
+        shard_paths.append(shard_path)
+    file_path = str(tmp_path / "hotels.parquet")
+    HotelParquetWriter.merge(
+        shard_paths, file_path, row_group_size=4, compression="gzip"
+    )
+
+    metadata = pq.ParquetFile(file_path).metadata
+    assert [
+        metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+    ] == [4, 2]
+    assert metadata.row_group(0).column(0).compression == "GZIP"
+    rows = pq.read_table(file_path).to_pylist()
+    assert [row["name"] for row in rows] == [
+        hotel.name for hotel in HOTELS
+    ] * 3